@@ -0,0 +1,34 @@
+"""Add composite indexes for analytics queries
+
+Revision ID: add_analytics_indexes
+Revises: add_product_listing_indexes
+Create Date: 2026-10-18 09:15:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_analytics_indexes'
+down_revision: Union[str, None] = 'add_product_listing_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add (user_id, created_at) and join indexes used by the analytics endpoints."""
+    op.create_index('ix_behaviors_user_id_created_at', 'behaviors', ['user_id', 'created_at'], unique=False)
+    op.create_index('ix_mood_states_user_id_created_at', 'mood_states', ['user_id', 'created_at'], unique=False)
+    op.create_index('ix_shopping_lists_user_id', 'shopping_lists', ['user_id'], unique=False)
+    op.create_index('ix_shopping_list_items_shopping_list_id', 'shopping_list_items', ['shopping_list_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Remove analytics indexes."""
+    op.drop_index('ix_shopping_list_items_shopping_list_id', table_name='shopping_list_items')
+    op.drop_index('ix_shopping_lists_user_id', table_name='shopping_lists')
+    op.drop_index('ix_mood_states_user_id_created_at', table_name='mood_states')
+    op.drop_index('ix_behaviors_user_id_created_at', table_name='behaviors')
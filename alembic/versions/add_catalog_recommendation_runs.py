@@ -0,0 +1,40 @@
+"""Add catalog recommendation runs table
+
+Revision ID: add_catalog_recommendation_runs
+Revises: add_recommendation_store
+Create Date: 2026-10-18 16:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_catalog_recommendation_runs'
+down_revision: Union[str, None] = 'add_recommendation_store'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Record precompute runs so readers only see completed ones."""
+    op.create_table(
+        'catalog_recommendation_runs',
+        sa.Column('run_id', sa.String(), nullable=False),
+        sa.Column('k', sa.Integer(), nullable=False),
+        sa.Column('customers', sa.Integer(), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=False),
+        sa.Column('completed_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('run_id')
+    )
+    op.create_index(op.f('ix_catalog_recommendation_runs_completed_at'), 'catalog_recommendation_runs', ['completed_at'], unique=False)
+    # Rows written before runs were recorded belong to no completed run
+    op.execute("DELETE FROM catalog_recommendation_staging")
+
+
+def downgrade() -> None:
+    """Drop the precompute runs table."""
+    op.drop_index(op.f('ix_catalog_recommendation_runs_completed_at'), table_name='catalog_recommendation_runs')
+    op.drop_table('catalog_recommendation_runs')
@@ -0,0 +1,42 @@
+"""Add catalog recommendation staging table
+
+Revision ID: add_catalog_recommendation_staging
+Revises: add_catalog_subcategory
+Create Date: 2026-10-18 13:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_catalog_recommendation_staging'
+down_revision: Union[str, None] = 'add_catalog_subcategory'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create the table the offline precompute job writes into."""
+    op.create_table(
+        'catalog_recommendation_staging',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('run_id', sa.String(), nullable=False),
+        sa.Column('customer_id', sa.String(), nullable=False),
+        sa.Column('rank', sa.Integer(), nullable=False),
+        sa.Column('product_id', sa.String(), nullable=False),
+        sa.Column('score', sa.Float(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_catalog_recommendation_staging_run_id'), 'catalog_recommendation_staging', ['run_id'], unique=False)
+    op.create_index('ix_catalog_recommendation_staging_customer_id_rank', 'catalog_recommendation_staging', ['customer_id', 'rank'], unique=False)
+
+
+def downgrade() -> None:
+    """Drop the precompute staging table."""
+    op.drop_index('ix_catalog_recommendation_staging_customer_id_rank', table_name='catalog_recommendation_staging')
+    op.drop_index(op.f('ix_catalog_recommendation_staging_run_id'), table_name='catalog_recommendation_staging')
+    op.drop_table('catalog_recommendation_staging')
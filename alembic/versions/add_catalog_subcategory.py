@@ -0,0 +1,30 @@
+"""Add subcategory to catalog products
+
+Revision ID: add_catalog_subcategory
+Revises: add_customer_dataset_tables
+Create Date: 2026-10-18 12:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_catalog_subcategory'
+down_revision: Union[str, None] = 'add_customer_dataset_tables'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add catalog_products.subcategory, which Similar_Product_List refers to."""
+    op.add_column('catalog_products', sa.Column('subcategory', sa.String(), nullable=True))
+    op.create_index(op.f('ix_catalog_products_subcategory'), 'catalog_products', ['subcategory'], unique=False)
+
+
+def downgrade() -> None:
+    """Remove catalog_products.subcategory."""
+    op.drop_index(op.f('ix_catalog_products_subcategory'), table_name='catalog_products')
+    op.drop_column('catalog_products', 'subcategory')
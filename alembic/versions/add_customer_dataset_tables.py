@@ -0,0 +1,106 @@
+"""Add customer dataset tables to the shared database
+
+Revision ID: add_customer_dataset_tables
+Revises: add_trending_index
+Create Date: 2026-10-18 11:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_customer_dataset_tables'
+down_revision: Union[str, None] = 'add_trending_index'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create customers, catalog_products, customer_interactions and ingestion_checkpoints."""
+    op.create_table('customers',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('customer_id', sa.String(), nullable=True),
+        sa.Column('age', sa.Integer(), nullable=True),
+        sa.Column('gender', sa.String(), nullable=True),
+        sa.Column('location', sa.String(), nullable=True),
+        sa.Column('browsing_history', sa.JSON(), nullable=True),
+        sa.Column('purchase_history', sa.JSON(), nullable=True),
+        sa.Column('customer_segment', sa.String(), nullable=True),
+        sa.Column('avg_order_value', sa.Float(), nullable=True),
+        sa.Column('purchase_count', sa.Integer(), nullable=True),
+        sa.Column('current_mood', sa.String(), nullable=True),
+        sa.Column('persona_traits', sa.JSON(), nullable=True),
+        sa.Column('psychographic_profile', sa.Text(), nullable=True),
+        sa.Column('interaction_history', sa.JSON(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_customers_id'), 'customers', ['id'], unique=False)
+    op.create_index(op.f('ix_customers_customer_id'), 'customers', ['customer_id'], unique=True)
+
+    op.create_table('catalog_products',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('product_id', sa.String(), nullable=True),
+        sa.Column('category', sa.String(), nullable=True),
+        sa.Column('price', sa.Float(), nullable=True),
+        sa.Column('brand', sa.String(), nullable=True),
+        sa.Column('average_rating', sa.Float(), nullable=True),
+        sa.Column('product_rating', sa.Float(), nullable=True),
+        sa.Column('review_sentiment_score', sa.Float(), nullable=True),
+        sa.Column('holiday', sa.String(), nullable=True),
+        sa.Column('season', sa.String(), nullable=True),
+        sa.Column('geographical_location', sa.String(), nullable=True),
+        sa.Column('similar_products', sa.JSON(), nullable=True),
+        sa.Column('probability_of_recommendation', sa.Float(), nullable=True),
+        sa.Column('ai_description', sa.Text(), nullable=True),
+        sa.Column('psychographic_tags', sa.JSON(), nullable=True),
+        sa.Column('mood_tags', sa.JSON(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_catalog_products_id'), 'catalog_products', ['id'], unique=False)
+    op.create_index(op.f('ix_catalog_products_product_id'), 'catalog_products', ['product_id'], unique=True)
+
+    op.create_table('customer_interactions',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('customer_id', sa.String(), nullable=False),
+        sa.Column('action_type', sa.String(), nullable=False),
+        sa.Column('product_id', sa.String(), nullable=True),
+        sa.Column('category', sa.String(), nullable=True),
+        sa.Column('price', sa.Float(), nullable=True),
+        sa.Column('details', sa.JSON(), nullable=True),
+        sa.Column('ts', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_customer_interactions_customer_id_ts', 'customer_interactions', ['customer_id', 'ts'], unique=False)
+
+    op.create_table('ingestion_checkpoints',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('source', sa.String(), nullable=True),
+        sa.Column('rows_loaded', sa.Integer(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_ingestion_checkpoints_id'), 'ingestion_checkpoints', ['id'], unique=False)
+    op.create_index(op.f('ix_ingestion_checkpoints_source'), 'ingestion_checkpoints', ['source'], unique=True)
+
+
+def downgrade() -> None:
+    """Drop customer dataset tables."""
+    op.drop_index(op.f('ix_ingestion_checkpoints_source'), table_name='ingestion_checkpoints')
+    op.drop_index(op.f('ix_ingestion_checkpoints_id'), table_name='ingestion_checkpoints')
+    op.drop_table('ingestion_checkpoints')
+    op.drop_index('ix_customer_interactions_customer_id_ts', table_name='customer_interactions')
+    op.drop_table('customer_interactions')
+    op.drop_index(op.f('ix_catalog_products_product_id'), table_name='catalog_products')
+    op.drop_index(op.f('ix_catalog_products_id'), table_name='catalog_products')
+    op.drop_table('catalog_products')
+    op.drop_index(op.f('ix_customers_customer_id'), table_name='customers')
+    op.drop_index(op.f('ix_customers_id'), table_name='customers')
+    op.drop_table('customers')
@@ -0,0 +1,30 @@
+"""Add product listing indexes for keyset pagination
+
+Revision ID: add_product_listing_indexes
+Revises: add_product_ranking_columns
+Create Date: 2026-10-18 09:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_product_listing_indexes'
+down_revision: Union[str, None] = 'add_product_ranking_columns'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add price and category + price indexes used by GET /products/."""
+    op.create_index('ix_products_price', 'products', ['price'], unique=False)
+    op.create_index('ix_products_category_price', 'products', ['category', 'price'], unique=False)
+
+
+def downgrade() -> None:
+    """Remove product listing indexes."""
+    op.drop_index('ix_products_category_price', table_name='products')
+    op.drop_index('ix_products_price', table_name='products')
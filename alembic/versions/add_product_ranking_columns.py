@@ -0,0 +1,32 @@
+"""Add ranking columns to products table
+
+Revision ID: add_product_ranking_columns
+Revises: add_users_table
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_product_ranking_columns'
+down_revision: Union[str, None] = 'add_users_table'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add rating and recommendation probability columns used for candidate ranking."""
+    op.add_column('products', sa.Column('average_rating', sa.Float(), nullable=True))
+    op.add_column('products', sa.Column('probability_of_recommendation', sa.Float(), nullable=True))
+    op.create_index('ix_products_category', 'products', ['category'], unique=False)
+
+
+def downgrade() -> None:
+    """Remove candidate ranking columns from products table."""
+    op.drop_index('ix_products_category', table_name='products')
+    op.drop_column('products', 'probability_of_recommendation')
+    op.drop_column('products', 'average_rating')
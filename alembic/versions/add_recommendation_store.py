@@ -0,0 +1,30 @@
+"""Add recommendation context and serving index
+
+Revision ID: add_recommendation_store
+Revises: add_catalog_recommendation_staging
+Create Date: 2026-10-18 14:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_recommendation_store'
+down_revision: Union[str, None] = 'add_catalog_recommendation_staging'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Store recommendation context and index a user's newest generation."""
+    op.add_column('recommendations', sa.Column('context', sa.JSON(), nullable=True))
+    op.create_index('ix_recommendations_user_id_created_at', 'recommendations', ['user_id', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Remove the recommendation context column and serving index."""
+    op.drop_index('ix_recommendations_user_id_created_at', table_name='recommendations')
+    op.drop_column('recommendations', 'context')
@@ -0,0 +1,73 @@
+"""Add per-user analytics rollup tables
+
+Revision ID: add_rollup_tables
+Revises: add_analytics_indexes
+Create Date: 2026-10-18 10:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_rollup_tables'
+down_revision: Union[str, None] = 'add_analytics_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create the rollup tables and fill them from existing history."""
+    op.create_table('user_daily_activity',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('behavior_count', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('user_id', 'day')
+    )
+    op.create_table('user_category_quantities',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('category', sa.String(), nullable=False),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('user_id', 'category')
+    )
+    op.create_table('user_daily_moods',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('intensity_sum', sa.Float(), nullable=False),
+        sa.Column('mood_count', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('user_id', 'day')
+    )
+
+    op.execute(
+        "INSERT INTO user_daily_activity (user_id, day, behavior_count) "
+        "SELECT user_id, date(created_at), count(id) FROM behaviors "
+        "WHERE user_id IS NOT NULL AND created_at IS NOT NULL "
+        "GROUP BY user_id, date(created_at)"
+    )
+    op.execute(
+        "INSERT INTO user_category_quantities (user_id, category, quantity) "
+        "SELECT shopping_lists.user_id, products.category, sum(coalesce(shopping_list_items.quantity, 1)) "
+        "FROM shopping_list_items "
+        "JOIN shopping_lists ON shopping_list_items.shopping_list_id = shopping_lists.id "
+        "JOIN products ON shopping_list_items.product_id = products.id "
+        "WHERE shopping_lists.user_id IS NOT NULL AND products.category IS NOT NULL "
+        "GROUP BY shopping_lists.user_id, products.category"
+    )
+    op.execute(
+        "INSERT INTO user_daily_moods (user_id, day, intensity_sum, mood_count) "
+        "SELECT user_id, date(created_at), sum(intensity), count(id) FROM mood_states "
+        "WHERE user_id IS NOT NULL AND created_at IS NOT NULL "
+        "GROUP BY user_id, date(created_at)"
+    )
+
+
+def downgrade() -> None:
+    """Drop the rollup tables."""
+    op.drop_table('user_daily_moods')
+    op.drop_table('user_category_quantities')
+    op.drop_table('user_daily_activity')
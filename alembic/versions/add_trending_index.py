@@ -0,0 +1,28 @@
+"""Add behaviors (created_at, product_id) index for the trending leaderboard
+
+Revision ID: add_trending_index
+Revises: add_rollup_tables
+Create Date: 2026-10-18 10:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_trending_index'
+down_revision: Union[str, None] = 'add_rollup_tables'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Cover the time-window scan of the trending aggregate."""
+    op.create_index('ix_behaviors_created_at_product_id', 'behaviors', ['created_at', 'product_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Remove the trending index."""
+    op.drop_index('ix_behaviors_created_at_product_id', table_name='behaviors')
@@ -1,81 +1,87 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import func, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
 from typing import Optional
 from datetime import datetime
 
-from app.core.database import get_db
-from app.models.customer import Customer
-from app.schemas.behavior import BehaviorRequest, BehaviorResponse
+from backend.database.database import get_write_db
+from backend.app.models.models import Customer, CustomerInteraction
+from backend.app.schemas.behavior import BehaviorRequest, BehaviorResponse
+from backend.app.services.customer_profile import customer_profiles
 
 router = APIRouter()
 
 @router.post("/submit_behavior", response_model=BehaviorResponse)
 async def submit_behavior(
     request: BehaviorRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_write_db)
 ):
     """
     Track and store customer behavior for learning and personalization.
     """
     try:
-        # Get customer data
-        customer = db.query(Customer).filter(
-            Customer.customer_id == request.customer_id
-        ).first()
+        # Running aggregates are updated in SQL, without loading the customer row
+        values = {"updated_at": datetime.utcnow()}
+        updated_fields = ["customer_interactions"]
+        if request.action_type == "purchase":
+            count = func.coalesce(Customer.purchase_count, 0)
+            values["purchase_count"] = count + 1
+            updated_fields.append("purchase_count")
+            if request.price:
+                values["avg_order_value"] = (
+                    func.coalesce(Customer.avg_order_value, 0) * count + request.price
+                ) / (count + 1)
+                updated_fields.append("avg_order_value")
         
-        if not customer:
+        result = await db.execute(
+            update(Customer)
+            .where(Customer.customer_id == request.customer_id)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 0:
             raise HTTPException(status_code=404, detail="Customer not found")
         
-        # Update customer's interaction history
-        interaction = {
-            "timestamp": datetime.utcnow().isoformat(),
-            "action_type": request.action_type,
-            "product_id": request.product_id,
-            "details": request.details
-        }
-        
-        # Get current interaction history
-        current_history = customer.interaction_history or []
-        current_history.append(interaction)
+        # Append the event to the interaction log
+        db.add(CustomerInteraction(
+            customer_id=request.customer_id,
+            action_type=request.action_type,
+            product_id=request.product_id,
+            category=request.category,
+            price=request.price,
+            details=request.details
+        ))
         
-        # Update customer record
-        customer.interaction_history = current_history
-        
-        # Update browsing history if it's a view action
-        if request.action_type == "view":
-            current_browsing = customer.browsing_history or {}
+        # Update browsing history if it's a view action; the category set stays small
+        if request.action_type == "view" and request.category:
+            current_browsing = await db.scalar(select(Customer.browsing_history).filter(
+                Customer.customer_id == request.customer_id
+            )) or {}
             categories = current_browsing.get("categories", [])
-            if request.category and request.category not in categories:
-                categories.append(request.category)
-            current_browsing["categories"] = categories
-            customer.browsing_history = current_browsing
-        
-        # Update purchase history if it's a purchase action
-        if request.action_type == "purchase":
-            current_purchases = customer.purchase_history or []
-            current_purchases.append({
-                "product_id": request.product_id,
-                "timestamp": datetime.utcnow().isoformat(),
-                "price": request.price
-            })
-            customer.purchase_history = current_purchases
-            
-            # Update average order value
-            if request.price:
-                total_purchases = len(current_purchases)
-                current_avg = customer.avg_order_value or 0
-                new_avg = ((current_avg * (total_purchases - 1)) + request.price) / total_purchases
-                customer.avg_order_value = new_avg
+            if request.category not in categories:
+                # Assign a new object so the JSON change is always persisted
+                await db.execute(
+                    update(Customer)
+                    .where(Customer.customer_id == request.customer_id)
+                    .values(browsing_history=dict(current_browsing, categories=categories + [request.category]))
+                    .execution_options(synchronize_session=False)
+                )
+                updated_fields.append("browsing_history")
         
         # Save changes
-        db.commit()
+        await db.commit()
+        customer_profiles.invalidate(request.customer_id)
         
         return BehaviorResponse(
             status="success",
             message="Behavior tracked successfully",
-            updated_fields=["interaction_history", "browsing_history", "purchase_history", "avg_order_value"]
+            updated_fields=updated_fields
         )
         
+    except HTTPException:
+        await db.rollback()
+        raise
     except Exception as e:
-        db.rollback()
-        raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=str(e))
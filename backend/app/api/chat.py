@@ -1,13 +1,19 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 import google.generativeai as genai
 import os
+import asyncio
+import json
+import time
 from dotenv import load_dotenv
 
-from app.core.database import get_db
-from app.models.customer import Customer
-from app.schemas.chat import ChatRequest, ChatResponse
+from backend.database.database import get_db
+from backend.app.core.metrics import metrics
+from backend.app.schemas.chat import ChatRequest, ChatResponse
+from backend.app.services.llm_client import get_llm_client
+from backend.app.services.customer_profile import customer_profiles, render_profile
 
 router = APIRouter()
 
@@ -16,56 +22,101 @@ load_dotenv()
 
 # Configure Gemini API
 genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-model = genai.GenerativeModel('gemini-pro')
+llm_client = get_llm_client('gemini-pro')
+
+SUGGESTED_ACTIONS = ["browse_products", "view_recommendations"]  # Example actions
+
+async def build_chat_prompt(request: ChatRequest, db: AsyncSession) -> str:
+    """Context-aware assistant prompt for a customer query."""
+    # Compact, cached snapshot instead of the full customer row
+    customer_context = ""
+    if request.customer_id:
+        profile = await customer_profiles.get(db, request.customer_id)
+        if profile:
+            customer_context = render_profile(profile)
+    
+    # Prepare context-aware prompt for Gemini
+    return f"""
+    You are a helpful shopping assistant for SmartCart. 
+    {customer_context}
+    
+    Customer Query: {request.message}
+    
+    Please provide a helpful, personalized response that:
+    1. Addresses the customer's specific question
+    2. Takes into account their profile and preferences
+    3. Suggests relevant products if appropriate
+    4. Maintains a friendly and professional tone
+    """
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
 
 @router.post("/chat", response_model=ChatResponse)
 async def chat_with_assistant(
     request: ChatRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Handle customer queries through the conversational shopping assistant.
     """
     try:
-        # Get customer data if customer_id is provided
-        customer_context = ""
-        if request.customer_id:
-            customer = db.query(Customer).filter(
-                Customer.customer_id == request.customer_id
-            ).first()
-            
-            if customer:
-                customer_context = f"""
-                Customer Profile:
-                - Age: {customer.age}
-                - Gender: {customer.gender}
-                - Location: {customer.location}
-                - Customer Segment: {customer.customer_segment}
-                - Current Mood: {customer.current_mood}
-                - Recent Purchases: {customer.purchase_history}
-                """
-        
-        # Prepare context-aware prompt for Gemini
-        prompt = f"""
-        You are a helpful shopping assistant for SmartCart. 
-        {customer_context}
-        
-        Customer Query: {request.message}
-        
-        Please provide a helpful, personalized response that:
-        1. Addresses the customer's specific question
-        2. Takes into account their profile and preferences
-        3. Suggests relevant products if appropriate
-        4. Maintains a friendly and professional tone
-        """
+        prompt = await build_chat_prompt(request, db)
         
         # Generate response using Gemini
-        response = model.generate_content(prompt)
+        response_text = await llm_client.generate(prompt)
         
         return ChatResponse(
-            response=response.text,
-            suggested_actions=["browse_products", "view_recommendations"]  # Example actions
+            response=response_text,
+            suggested_actions=SUGGESTED_ACTIONS
         )
         
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Timed out waiting for the AI model")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/chat/stream")
+async def stream_chat_with_assistant(
+    request: ChatRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Stream the assistant's reply as server-sent events while it is generated.
+
+    Emits "token" events with text as it arrives, then one "done" event with
+    the suggested actions (or an "error" event). If the client disconnects,
+    the response task is cancelled and the upstream model call with it.
+    """
+    try:
+        prompt = await build_chat_prompt(request, db)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    async def events():
+        started = time.perf_counter()
+        first_token = True
+        metrics.incr("chat.streams")
+        try:
+            async for text in llm_client.stream(prompt):
+                if not text:
+                    continue
+                if first_token:
+                    metrics.observe("chat.time_to_first_token_seconds", time.perf_counter() - started)
+                    first_token = False
+                yield _sse("token", {"text": text})
+            metrics.observe("chat.stream_duration_seconds", time.perf_counter() - started)
+            yield _sse("done", {"suggested_actions": SUGGESTED_ACTIONS})
+        except asyncio.CancelledError:
+            metrics.incr("chat.streams_cancelled")
+            raise
+        except asyncio.TimeoutError:
+            yield _sse("error", {"detail": "Timed out waiting for the AI model"})
+        except Exception as e:
+            yield _sse("error", {"detail": str(e)})
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
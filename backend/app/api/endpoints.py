@@ -1,13 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status, WebSocket
+from fastapi import APIRouter, Depends, HTTPException, status, WebSocket, WebSocketDisconnect, Query, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import tuple_
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
-from typing import List, Dict
-from backend.database.database import get_db
+from typing import List, Dict, Optional
+from backend.database.database import get_db, get_write_db, async_session
 from backend.app.core.security import (
-    get_current_active_user, create_access_token, get_password_hash,
-    verify_password, authenticate_user
+    get_current_active_user, resolve_principal,
+    create_access_token, get_password_hash, verify_password, authenticate_user
 )
 from backend.app.models.models import User, Product, ShoppingList, ShoppingListItem, Recommendation, Persona, MoodState, Behavior
 from backend.app.schemas.schemas import (
@@ -19,14 +22,30 @@ from backend.app.schemas.schemas import (
     MoodStateCreate, MoodState as MoodStateSchema,
     PersonaCreate, Persona as PersonaSchema,
     RecommendationCreate, Recommendation as RecommendationSchema,
-    Token, TokenData,
+    Token, Update,
     ShoppingPatterns, MoodTrends, CategoryDistribution, RecommendationPerformance,
-    UserResponse
+    UserResponse, Principal
 )
+from backend.app.core.metrics import metrics
+from backend.app.core.pagination import encode_cursor, decode_cursor
 from backend.app.services.genai_service import GenAIService
 from backend.app.services.agents import PersonaAgent, MoodAgent, BehaviorAgent, AgentCollaboration
+from backend.app.services.candidate_service import CandidateGenerator
+from backend.app.services.event_buffer import behavior_buffer
+from backend.app.services.realtime import update_hub
+from backend.app.services.analytics import analytics_service
+from backend.app.services.activity import recommendation_rows, behavior_rows
+from backend.app.services.user_context import (
+    load_persona, load_latest_mood, load_recent_behaviors, load_shopping_list
+)
+from backend.app.services.rollups import record_list_item, record_mood
+from backend.app.services.trending import trending_service
+from backend.app.services.similarity_index import PRODUCTS_INDEX, get_similarity_index
+from backend.app.services.recommendation_store import recommendation_store
+from backend.app.services.single_flight import request_key, single_flight
 from datetime import timedelta, datetime
 import os
+import json
 import asyncio
 
 # Initialize services
@@ -35,6 +54,7 @@ persona_agent = PersonaAgent()
 mood_agent = MoodAgent()
 behavior_agent = BehaviorAgent()
 agent_collaboration = AgentCollaboration()
+candidate_generator = CandidateGenerator()
 
 router = APIRouter()
 
@@ -72,7 +92,7 @@ async def login_for_access_token(
 
 # User endpoints
 @router.post("/users/", response_model=UserResponse)
-async def create_user(user: UserCreate, db: AsyncSession = Depends(get_db)):
+async def create_user(user: UserCreate, db: AsyncSession = Depends(get_write_db)):
     try:
         # Check if user exists
         result = await db.execute(select(User).filter(User.email == user.email))
@@ -114,40 +134,98 @@ async def create_user(user: UserCreate, db: AsyncSession = Depends(get_db)):
 
 @router.get("/users/me/", response_model=UserResponse)
 async def read_users_me(
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
-    # Load all relationships for the current user
-    query = select(User).where(User.id == current_user.id).options(
-        selectinload(User.shopping_lists),
-        selectinload(User.behaviors),
-        selectinload(User.mood_states),
-        selectinload(User.personas),
-        selectinload(User.recommendations)
-    )
-    result = await db.execute(query)
+    # UserResponse only exposes profile columns, so no relationships are loaded
+    result = await db.execute(select(User).where(User.id == current_user.id))
     user = result.scalars().first()
     return user
 
 # Product endpoints
 @router.post("/products/", response_model=ProductSchema)
-async def create_product(product: ProductCreate, db: AsyncSession = Depends(get_db)):
+async def create_product(product: ProductCreate, db: AsyncSession = Depends(get_write_db)):
     db_product = Product(**product.dict())
     db.add(db_product)
     await db.commit()
     await db.refresh(db_product)
     return db_product
 
+PRODUCT_FIELDS = {column.name for column in Product.__table__.columns}
+PRODUCT_SORT_KEYS = {"id": ("id",), "price": ("price", "id")}
+
 @router.get("/products/", response_model=List[ProductSchema])
-async def read_products(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(Product).offset(skip).limit(limit))
-    products = result.scalars().all()
-    return products
+async def read_products(
+    response: Response,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header"),
+    sort: str = Query("id", pattern="^(id|price)$"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return"),
+    category: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    skip: int = Query(0, ge=0, deprecated=True),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    List products with keyset pagination.
+
+    Pass the X-Next-Cursor response header back as `cursor` to fetch the next
+    page; deep pages cost the same as the first because they seek on the
+    (price, id) / (id) index instead of skipping rows.
+    """
+    sort_columns = [getattr(Product, name) for name in PRODUCT_SORT_KEYS[sort]]
+    
+    if fields:
+        requested = [name.strip() for name in fields.split(",") if name.strip()]
+        unknown = set(requested) - PRODUCT_FIELDS
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+        # The sort key is always selected so the next cursor can be built
+        selected = list(dict.fromkeys(["id", *requested, *PRODUCT_SORT_KEYS[sort]]))
+        query = select(*[getattr(Product, name) for name in selected])
+    else:
+        query = select(Product)
+    
+    if category is not None:
+        query = query.filter(Product.category == category)
+    if min_price is not None:
+        query = query.filter(Product.price >= min_price)
+    if max_price is not None:
+        query = query.filter(Product.price <= max_price)
+    
+    if cursor:
+        position = decode_cursor(cursor)
+        try:
+            after = tuple(position[name] for name in PRODUCT_SORT_KEYS[sort])
+        except KeyError:
+            raise HTTPException(status_code=400, detail="Cursor does not match sort order")
+        query = query.filter(tuple_(*sort_columns) > after)
+    elif skip:
+        query = query.offset(skip)
+    
+    result = await db.execute(query.order_by(*sort_columns).limit(limit))
+    page = result.all() if fields else result.scalars().all()
+    
+    headers = {}
+    if len(page) == limit:
+        last = page[-1]
+        headers["X-Next-Cursor"] = encode_cursor(
+            {name: getattr(last, name) for name in PRODUCT_SORT_KEYS[sort]}
+        )
+    
+    if fields:
+        # Partial rows do not fit ProductSchema, so bypass response_model
+        returned = list(dict.fromkeys(["id", *requested]))
+        items = [{name: getattr(row, name) for name in returned} for row in page]
+        return JSONResponse(content=jsonable_encoder(items), headers=headers)
+    response.headers.update(headers)
+    return page
 
 @router.get("/products/{product_id}", response_model=ProductSchema)
 async def read_product(
     product_id: int,
-    current_user: UserSchema = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
     result = await db.execute(select(Product).filter(Product.id == product_id))
@@ -155,24 +233,41 @@ async def read_product(
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     
-    # Track product view behavior
-    behavior = Behavior(
+    # Track product view behavior; written in the background in batches
+    await behavior_buffer.record(
         user_id=current_user.id,
         product_id=product_id,
         action_type="view",
         context={"source": "product_page"}
     )
-    db.add(behavior)
-    await db.commit()
     
     return product
 
+@router.get("/products/{product_id}/similar", response_model=List[ProductSchema])
+async def read_similar_products(
+    product_id: int,
+    limit: int = Query(10, ge=1, le=100),
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Products most similar to the given one, from the precomputed neighbor index."""
+    index = get_similarity_index(PRODUCTS_INDEX)
+    if index is None:
+        raise HTTPException(status_code=503, detail="Similarity index has not been built")
+    if str(product_id) not in index:
+        raise HTTPException(status_code=404, detail="Product not found")
+    
+    neighbor_ids = [int(neighbor_id) for neighbor_id, _ in index.similar(str(product_id), limit=limit)]
+    result = await db.execute(select(Product).filter(Product.id.in_(neighbor_ids)))
+    by_id = {product.id: product for product in result.scalars().all()}
+    return [by_id[neighbor_id] for neighbor_id in neighbor_ids if neighbor_id in by_id]
+
 # Shopping List endpoints
 @router.post("/shopping-lists/", response_model=ShoppingListSchema)
 async def create_shopping_list(
     shopping_list: ShoppingListCreate,
-    current_user: User = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db)
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_write_db)
 ):
     try:
         db_shopping_list = ShoppingList(**shopping_list.dict(), user_id=current_user.id)
@@ -197,7 +292,7 @@ async def create_shopping_list(
 
 @router.get("/shopping-lists/", response_model=List[ShoppingListSchema])
 async def get_shopping_lists(
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
     try:
@@ -220,8 +315,8 @@ async def get_shopping_lists(
 async def add_item_to_shopping_list(
     list_id: int,
     item: ShoppingListItemCreate,
-    current_user: User = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db)
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_write_db)
 ):
     try:
         # Verify shopping list exists and belongs to user
@@ -241,6 +336,8 @@ async def add_item_to_shopping_list(
             quantity=item.quantity
         )
         db.add(db_item)
+        category = await db.scalar(select(Product.category).filter(Product.id == item.product_id))
+        await record_list_item(db, current_user.id, category, item.quantity)
         await db.commit()
         await db.refresh(db_item)
         
@@ -264,19 +361,22 @@ async def add_item_to_shopping_list(
 @router.get("/shopping-lists/{list_id}/analysis")
 async def analyze_shopping_list(
     list_id: int,
-    current_user: User = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db)
+    current_user: Principal = Depends(get_current_active_user)
 ):
+    # Duplicate requests (double clicks, retries) share one in-flight analysis
+    return await single_flight.do(
+        request_key("shopping_list_analysis", current_user.id, {"list_id": list_id}),
+        lambda: _analyze_shopping_list(list_id, current_user.id)
+    )
+
+async def _analyze_shopping_list(list_id: int, user_id: int) -> Dict:
     try:
-        # Get shopping list with items and products loaded
-        query = select(ShoppingList).filter(
-            ShoppingList.id == list_id,
-            ShoppingList.user_id == current_user.id
-        ).options(
-            selectinload(ShoppingList.items).selectinload(ShoppingListItem.product)
+        # Independent lookups run concurrently, each on its own pooled session
+        shopping_list, persona, mood = await asyncio.gather(
+            load_shopping_list(list_id, user_id),
+            load_persona(user_id),
+            load_latest_mood(user_id)
         )
-        result = await db.execute(query)
-        shopping_list = result.scalars().first()
         
         if not shopping_list:
             raise HTTPException(status_code=404, detail="Shopping list not found")
@@ -290,27 +390,16 @@ async def analyze_shopping_list(
             for item in shopping_list.items
         ]
         
-        # Get user persona and mood with proper loading
-        persona_query = select(Persona).filter(
-            Persona.user_id == current_user.id
-        )
-        persona_result = await db.execute(persona_query)
-        persona = persona_result.scalars().first()
-        
-        mood_query = select(MoodState).filter(
-            MoodState.user_id == current_user.id
-        ).order_by(MoodState.created_at.desc())
-        mood_result = await db.execute(mood_query)
-        mood = mood_result.scalars().first()
-        
         collaboration_context = {
             'persona': persona.__dict__ if persona else {},
             'mood': mood.__dict__ if mood else {},
             'shopping_list': items_data
         }
         
-        collaborative_insights = await agent_collaboration.make_decision(collaboration_context)
-        analysis = await genai_service.analyze_shopping_list(items_data)
+        collaborative_insights, analysis = await asyncio.gather(
+            agent_collaboration.make_decision(collaboration_context),
+            genai_service.analyze_shopping_list(items_data)
+        )
         analysis['collaborative_insights'] = collaborative_insights
         
         return analysis
@@ -324,79 +413,86 @@ async def analyze_shopping_list(
 
 # WebSocket for real-time updates
 @router.websocket("/ws/updates")
-async def websocket_endpoint(websocket: WebSocket):
+async def websocket_endpoint(websocket: WebSocket, token: Optional[str] = None):
+    # Browsers cannot set headers on websockets, so the token comes as a query parameter
+    principal = None
+    if token:
+        async with async_session() as db:
+            principal = await resolve_principal(token, db)
+    if principal is None or not principal.is_active:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    
     await websocket.accept()
+    subscription = update_hub.subscribe(principal.id)
+    # Watch for the client going away while we wait for updates
+    receiver = asyncio.create_task(_wait_for_disconnect(websocket))
     try:
         while True:
-            # Get updates from the database
-            updates = await get_updates()
-            await websocket.send_json(updates)
-            await asyncio.sleep(5)  # Send updates every 5 seconds
+            next_update = asyncio.create_task(subscription.get())
+            done, _ = await asyncio.wait({next_update, receiver}, return_when=asyncio.FIRST_COMPLETED)
+            if receiver in done:
+                next_update.cancel()
+                break
+            update = next_update.result()
+            if update is None:
+                # Dropped as a slow consumer; the client should reconnect
+                await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+                break
+            await websocket.send_json(update)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        receiver.cancel()
+        update_hub.unsubscribe(subscription)
+
+async def _wait_for_disconnect(websocket: WebSocket):
+    try:
+        while True:
+            await websocket.receive_text()
     except WebSocketDisconnect:
         pass
 
 # Real-time updates endpoint
-@router.get("/updates", response_model=List[TokenData])
+@router.get("/updates", response_model=List[Update])
 async def get_updates(
-    current_user: UserSchema = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
     # Get recent updates for the user
     updates = []
+    since = datetime.utcnow() - timedelta(minutes=5)
     
     # Check for new recommendations
-    result = await db.execute(select(Recommendation).filter(
-        Recommendation.user_id == current_user.id,
-        Recommendation.created_at > datetime.now() - timedelta(minutes=5)
-    ))
-    recent_recommendations = result.scalars().all()
-    
-    for rec in recent_recommendations:
-        updates.append(TokenData(
-            message=f"New recommendation: {rec.product.name}",
+    result = await db.execute(recommendation_rows(current_user.id, since=since))
+    for rec in result.all():
+        updates.append(Update(
+            message=f"New recommendation: {rec.product_name}",
             type="info",
             timestamp=rec.created_at
         ))
     
     # Check for new behaviors
-    result = await db.execute(select(Behavior).filter(
-        Behavior.user_id == current_user.id,
-        Behavior.created_at > datetime.now() - timedelta(minutes=5)
-    ))
-    recent_behaviors = result.scalars().all()
-    
-    for behavior in recent_behaviors:
-        updates.append(TokenData(
-            message=f"New activity: {behavior.action_type} on {behavior.product.name}",
+    result = await db.execute(behavior_rows(current_user.id, since=since))
+    for behavior in result.all():
+        updates.append(Update(
+            message=f"New activity: {behavior.action_type} on {behavior.product_name}",
             type="info",
             timestamp=behavior.created_at
         ))
     
     return updates
 
-# Enhanced recommendation endpoint with collaborative insights
-@router.get("/recommendations/", response_model=List[RecommendationSchema])
-async def get_recommendations(
-    current_user: UserSchema = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db)
-):
-    result = await db.execute(select(Product))
-    products = result.scalars().all()
-    recommendations = await genai_service.generate_recommendations(current_user, products, db)
-    
-    # Get collaborative insights
-    result = await db.execute(select(Persona).filter(Persona.user_id == current_user.id))
-    persona = result.scalars().first()
-    
-    result = await db.execute(select(MoodState).filter(
-        MoodState.user_id == current_user.id
-    ).order_by(MoodState.created_at.desc()))
-    mood = result.scalars().first()
-    
-    result = await db.execute(select(Behavior).filter(
-        Behavior.user_id == current_user.id
-    ).order_by(Behavior.created_at.desc()).limit(5))
-    recent_behaviors = result.scalars().all()
+async def generate_live_recommendations(db: AsyncSession, user: User) -> List[Dict]:
+    """Run the full model pipeline for a user; used on store misses and background refreshes."""
+    # Candidates use the given session; the other lookups get their own
+    products, persona, mood, recent_behaviors = await asyncio.gather(
+        # Only a bounded, pre-ranked slice of the catalog is sent to the model
+        candidate_generator.select_candidates(db, user.id),
+        load_persona(user.id),
+        load_latest_mood(user.id),
+        load_recent_behaviors(user.id, limit=5)
+    )
     
     collaboration_context = {
         'persona': persona.__dict__ if persona else {},
@@ -404,18 +500,59 @@ async def get_recommendations(
         'behaviors': [b.__dict__ for b in recent_behaviors]
     }
     
-    collaborative_insights = await agent_collaboration.make_decision(collaboration_context)
+    # The model call and the collaborative insights don't depend on each other
+    recommendations, collaborative_insights = await asyncio.gather(
+        genai_service.generate_recommendations(user, products, db),
+        agent_collaboration.make_decision(collaboration_context)
+    )
     
     # Enhance recommendations with collaborative insights
     for rec in recommendations:
-        rec.insights = collaborative_insights
+        rec["insights"] = collaborative_insights
+    
+    update_hub.publish_recommendations(
+        user.id, [rec["product"].name for rec in recommendations]
+    )
     
     return recommendations
 
+# Enhanced recommendation endpoint with collaborative insights
+@router.get("/recommendations/", response_model=List[RecommendationSchema])
+async def get_recommendations(
+    current_user: Principal = Depends(get_current_active_user)
+):
+    """Stored recommendations when fresh enough; see RecommendationStore for the refresh rules."""
+    async def load() -> List[Recommendation]:
+        # Shared by concurrent duplicates, so it must not depend on one request's session
+        async with async_session() as session:
+            return await recommendation_store.get(session, current_user.id, generate_live_recommendations)
+    
+    return await single_flight.do(request_key("recommendations", current_user.id), load)
+
+@router.get("/recommendations/stream")
+async def stream_recommendations(
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Recommendations as newline-delimited JSON, each sent as soon as the model completes it."""
+    # Always a live generation, so this is where the full user is needed
+    user = await recommendation_store.load_user(db, current_user.id)
+    products = await candidate_generator.select_candidates(db, current_user.id)
+    
+    async def ndjson():
+        names = []
+        async for rec in genai_service.stream_recommendations(user, products, db):
+            names.append(rec["product"].name)
+            payload = dict(rec, product=ProductSchema.model_validate(rec["product"]).model_dump(mode="json"))
+            yield json.dumps(payload) + "\n"
+        update_hub.publish_recommendations(current_user.id, names)
+    
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
 # Agent-specific endpoints
 @router.get("/users/me/persona")
 async def get_user_persona(
-    current_user: UserSchema = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
     persona = await db.execute(select(Persona).filter(Persona.user_id == current_user.id))
@@ -426,7 +563,7 @@ async def get_user_persona(
 
 @router.get("/users/me/mood")
 async def get_user_mood(
-    current_user: UserSchema = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
     mood = await db.execute(select(MoodState).filter(
@@ -439,7 +576,7 @@ async def get_user_mood(
 
 @router.get("/users/me/behaviors")
 async def get_user_behaviors(
-    current_user: UserSchema = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
     behaviors = await db.execute(select(Behavior).filter(
@@ -450,100 +587,29 @@ async def get_user_behaviors(
 # Analytics endpoints
 @router.get("/analytics/shopping-patterns")
 async def get_shopping_patterns(
-    current_user: UserSchema = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
     # Get shopping patterns for the last 30 days
     thirty_days_ago = datetime.now() - timedelta(days=30)
-    behaviors = await db.execute(select(Behavior).filter(
-        Behavior.user_id == current_user.id,
-        Behavior.created_at >= thirty_days_ago
-    ))
-    
-    # Group behaviors by date
-    patterns = {}
-    for behavior in behaviors.scalars().all():
-        date = behavior.created_at.date()
-        if date not in patterns:
-            patterns[date] = 0
-        patterns[date] += 1
-    
-    # Format data for chart
-    dates = []
-    frequencies = []
-    for date in sorted(patterns.keys()):
-        dates.append(date.strftime('%Y-%m-%d'))
-        frequencies.append(patterns[date])
-    
-    return {
-        "dates": dates,
-        "frequencies": frequencies
-    }
+    return await analytics_service.shopping_patterns(db, current_user.id, thirty_days_ago)
 
 @router.get("/analytics/mood-trends")
 async def get_mood_trends(
-    current_user: UserSchema = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
-    # Get mood states for the last 30 days
+    # Get mood trends for the last 30 days
     thirty_days_ago = datetime.now() - timedelta(days=30)
-    mood_states = await db.execute(select(MoodState).filter(
-        MoodState.user_id == current_user.id,
-        MoodState.created_at >= thirty_days_ago
-    ).order_by(MoodState.created_at))
-    
-    # Format data for chart
-    dates = []
-    intensities = []
-    for mood_state in mood_states.scalars().all():
-        dates.append(mood_state.created_at.strftime('%Y-%m-%d'))
-        intensities.append(mood_state.intensity)
-    
-    return {
-        "dates": dates,
-        "intensities": intensities
-    }
+    return await analytics_service.mood_trends(db, current_user.id, thirty_days_ago)
 
 @router.get("/analytics/categories")
 async def get_categories_distribution(
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
     try:
-        # Get all shopping lists for the user with items and products loaded
-        query = select(ShoppingList).filter(
-            ShoppingList.user_id == current_user.id
-        ).options(
-            selectinload(ShoppingList.items).selectinload(ShoppingListItem.product)
-        )
-        result = await db.execute(query)
-        shopping_lists = result.scalars().all()
-
-        # Calculate category distribution
-        category_counts = {}
-        total_items = 0
-
-        for shopping_list in shopping_lists:
-            for item in shopping_list.items:
-                if item.product and item.product.category:
-                    category = item.product.category
-                    quantity = item.quantity or 1
-                    category_counts[category] = category_counts.get(category, 0) + quantity
-                    total_items += quantity
-
-        # Calculate percentages
-        distribution = {
-            category: {
-                'count': count,
-                'percentage': (count / total_items * 100) if total_items > 0 else 0
-            }
-            for category, count in category_counts.items()
-        }
-
-        return {
-            'total_items': total_items,
-            'distribution': distribution
-        }
+        return await analytics_service.categories_distribution(db, current_user.id)
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -552,19 +618,17 @@ async def get_categories_distribution(
 
 @router.get("/analytics/recommendations")
 async def get_recommendation_performance(
-    current_user: UserSchema = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
     # Get recent recommendations and their effectiveness
-    recommendations = await db.execute(select(Recommendation).filter(
-        Recommendation.user_id == current_user.id
-    ).order_by(Recommendation.created_at.desc()).limit(10))
+    recommendations = await db.execute(recommendation_rows(current_user.id, limit=10))
     
     # Format data for chart
     products = []
     scores = []
-    for rec in recommendations.scalars().all():
-        products.append(rec.product.name)
+    for rec in recommendations.all():
+        products.append(rec.product_name)
         scores.append(rec.score * 100)  # Convert to percentage
     
     return {
@@ -576,7 +640,7 @@ async def get_recommendation_performance(
 @router.post("/quick-actions/{action_type}")
 async def execute_quick_action(
     action_type: str,
-    current_user: UserSchema = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
     if action_type == "find-deals":
@@ -602,35 +666,30 @@ async def execute_quick_action(
         return {"items": items.scalars().all()}
     
     elif action_type == "trending":
-        # Find trending products based on recent behaviors
-        recent_behaviors = await db.execute(select(Behavior).filter(
-            Behavior.created_at >= datetime.now() - timedelta(days=7)
-        ).limit(5))
-        
-        # Count product views
-        product_views = {}
-        for behavior in recent_behaviors.scalars().all():
-            if behavior.product_id not in product_views:
-                product_views[behavior.product_id] = 0
-            product_views[behavior.product_id] += 1
-        
-        # Get top 5 trending products
-        trending_products = []
-        for product_id, views in sorted(product_views.items(), key=lambda x: x[1], reverse=True)[:5]:
-            product = await db.execute(select(Product).filter(Product.id == product_id))
-            trending_products.append(product.scalars().first())
+        # Ranking comes from the cached leaderboard; fetch its products in one query
+        ranking = await trending_service.top(5)
+        product_ids = [product_id for product_id, _ in ranking]
+        products = await db.execute(select(Product).filter(Product.id.in_(product_ids)))
+        by_id = {product.id: product for product in products.scalars().all()}
+        trending_products = [by_id[product_id] for product_id in product_ids if product_id in by_id]
         
         return {"products": trending_products}
     
     else:
         raise HTTPException(status_code=400, detail="Invalid action type")
 
+# Metrics endpoint
+@router.get("/metrics", dependencies=[Depends(get_current_active_user)])
+async def get_metrics():
+    """Expose in-process counters such as LLM cache hits and misses."""
+    return metrics.snapshot()
+
 # Mood endpoints
 @router.post("/mood/", response_model=MoodStateSchema)
 async def update_mood(
     mood: MoodStateCreate,
-    current_user: UserSchema = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db)
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_write_db)
 ):
     db_mood = MoodState(
         user_id=current_user.id,
@@ -639,13 +698,14 @@ async def update_mood(
         context=mood.context
     )
     db.add(db_mood)
+    await record_mood(db, current_user.id, mood.intensity)
     await db.commit()
     await db.refresh(db_mood)
     return db_mood
 
 @router.get("/mood/", response_model=List[MoodStateSchema])
 async def get_mood_history(
-    current_user: UserSchema = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
     result = await db.execute(select(MoodState).filter(
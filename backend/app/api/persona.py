@@ -1,13 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 import google.generativeai as genai
 import os
+import asyncio
 from dotenv import load_dotenv
 
-from app.core.database import get_db
-from app.models.customer import Customer
-from app.schemas.persona import PersonaResponse, PersonaRequest
+from backend.database.database import get_db
+from backend.app.schemas.persona import PersonaResponse, PersonaRequest
+from backend.app.services.llm_client import get_llm_client
+from backend.app.services.customer_profile import customer_profiles, render_profile
 
 router = APIRouter()
 
@@ -16,35 +18,27 @@ load_dotenv()
 
 # Configure Gemini API
 genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-model = genai.GenerativeModel('gemini-pro')
+llm_client = get_llm_client('gemini-pro')
 
 @router.post("/generate_persona", response_model=PersonaResponse)
 async def generate_persona(
     request: PersonaRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Generate a customer persona using Gemini AI based on customer data.
     """
     try:
-        # Get customer data from database
-        customer = db.query(Customer).filter(
-            Customer.customer_id == request.customer_id
-        ).first()
+        # Get the customer's compact profile snapshot
+        profile = await customer_profiles.get(db, request.customer_id)
         
-        if not customer:
+        if not profile:
             raise HTTPException(status_code=404, detail="Customer not found")
         
         # Prepare prompt for Gemini
         prompt = f"""
         Generate a detailed psychographic profile for a customer with the following characteristics:
-        - Age: {customer.age}
-        - Gender: {customer.gender}
-        - Location: {customer.location}
-        - Customer Segment: {customer.customer_segment}
-        - Average Order Value: {customer.avg_order_value}
-        - Browsing History: {customer.browsing_history}
-        - Purchase History: {customer.purchase_history}
+        {render_profile(profile)}
         
         Please provide:
         1. Personality traits (as JSON array)
@@ -55,18 +49,22 @@ async def generate_persona(
         """
         
         # Generate persona using Gemini
-        response = model.generate_content(prompt)
+        response_text = await llm_client.generate(prompt)
         
         # Parse the response and update customer record
         # Note: In a real implementation, you would parse the Gemini response
         # and structure it according to your needs
         
         return PersonaResponse(
-            customer_id=customer.customer_id,
+            customer_id=profile.customer_id,
             persona_traits=["trait1", "trait2"],  # Example traits
-            psychographic_profile=response.text,
+            psychographic_profile=response_text,
             match_score=0.85  # Example match score
         )
         
+    except HTTPException:
+        raise
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Timed out waiting for the AI model")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
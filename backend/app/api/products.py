@@ -1,18 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
 from typing import List, Optional
 import google.generativeai as genai
 import os
+import asyncio
+import json
 from dotenv import load_dotenv
 
-from app.core.database import get_db
-from app.models.product import Product
-from app.models.customer import Customer
-from app.schemas.product import (
+from backend.database.database import get_db
+from backend.app.core.config import settings
+from backend.app.models.models import CatalogProduct, Customer
+from backend.app.services.recommendation_engine import recommendation_engine
+from backend.app.services.llm_client import get_llm_client
+from backend.app.services.customer_profile import customer_profiles, render_profile
+from backend.app.services.similarity_index import CATALOG_INDEX, get_similarity_index
+from backend.app.services.single_flight import request_key, single_flight
+from backend.app.services.batch_scoring import ensure_catalog_loaded, ndjson_line, score_customers, scoring_profile
+from backend.app.services.precompute import load_precomputed
+from backend.app.schemas.product import (
     ProductRecommendationRequest,
     ProductRecommendationResponse,
+    BatchRecommendationRequest,
     ProductStoryRequest,
-    ProductStoryResponse
+    ProductStoryResponse,
+    SimilarProductResponse
 )
 
 router = APIRouter()
@@ -22,68 +35,176 @@ load_dotenv()
 
 # Configure Gemini API
 genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-model = genai.GenerativeModel('gemini-pro')
+llm_client = get_llm_client('gemini-pro')
 
 @router.post("/recommend_products", response_model=List[ProductRecommendationResponse])
 async def recommend_products(
     request: ProductRecommendationRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get personalized product recommendations based on customer profile and mood.
     """
     try:
         # Get customer data
-        customer = db.query(Customer).filter(
+        result = await db.execute(select(
+            Customer.browsing_history, Customer.avg_order_value,
+            Customer.location, Customer.customer_segment
+        ).filter(
             Customer.customer_id == request.customer_id
-        ).first()
+        ))
+        customer = result.first()
         
         if not customer:
             raise HTTPException(status_code=404, detail="Customer not found")
         
-        # Get products based on customer preferences and mood
-        products = db.query(Product).filter(
-            Product.category.in_(customer.browsing_history.get("categories", [])),
-            Product.price <= customer.avg_order_value * 1.5  # Example filter
-        ).limit(10).all()
+        await ensure_catalog_loaded(db)
         
-        # Generate personalized recommendations
-        recommendations = []
-        for product in products:
-            # Calculate match score (simplified example)
-            match_score = 0.7  # In reality, this would be a complex calculation
-            
-            recommendations.append(ProductRecommendationResponse(
-                product_id=product.product_id,
-                name=product.brand,
-                category=product.category,
-                price=product.price,
-                match_score=match_score,
-                explanation=f"This product matches your {customer.customer_segment} profile and current mood."
-            ))
+        # "More like this" comes straight from the precomputed neighbor index
+        if request.similar_to:
+            index = get_similarity_index(CATALOG_INDEX)
+            if index is None:
+                raise HTTPException(status_code=503, detail="Similarity index has not been built")
+            neighbors = index.similar(request.similar_to, limit=request.limit or 10)
+            details = {item["product_id"]: item for item in recommendation_engine.lookup(pid for pid, _ in neighbors)}
+            return [
+                ProductRecommendationResponse(
+                    product_id=product_id,
+                    name=details[product_id]["brand"],
+                    category=details[product_id]["category"],
+                    price=details[product_id]["price"],
+                    match_score=round(score, 4),
+                    explanation=f"Similar to {request.similar_to} by category and shared customer interest."
+                )
+                for product_id, score in neighbors
+                if product_id in details
+            ]
+        
+        # Score the whole catalog locally, no external calls
+        matches = recommendation_engine.top_k(k=request.limit or 10, **scoring_profile(customer))
         
-        return recommendations
+        return [
+            ProductRecommendationResponse(
+                product_id=match["product_id"],
+                name=match["brand"],
+                category=match["category"],
+                price=match["price"],
+                match_score=match["match_score"],
+                explanation=f"This product matches your {customer.customer_segment} profile and current mood."
+            )
+            for match in matches
+        ]
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/recommend_products/batch")
+async def recommend_products_batch(
+    request: BatchRecommendationRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Recommendations for many customers in one call, as newline-delimited JSON.
+    
+    Each line is {"customer_id", "recommendations"} in request order, or
+    {"customer_id", "error"} for unknown customers.
+    """
+    if len(request.customer_ids) > settings.BATCH_SCORING_MAX_CUSTOMERS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.BATCH_SCORING_MAX_CUSTOMERS} customers per request"
+        )
+    
+    async def ndjson():
+        async for item in score_customers(db, request.customer_ids, k=request.limit):
+            yield ndjson_line(item)
+    
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+@router.get("/customers/{customer_id}/precomputed_recommendations", response_model=List[ProductRecommendationResponse])
+async def get_precomputed_recommendations(
+    customer_id: str,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    A customer's recommendations from the latest completed precompute run.
+    """
+    rows = await load_precomputed(db, customer_id)
+    if not rows:
+        raise HTTPException(status_code=404, detail="No precomputed recommendations for customer")
+    
+    await ensure_catalog_loaded(db)
+    details = {item["product_id"]: item for item in recommendation_engine.lookup(row.product_id for row in rows)}
+    return [
+        ProductRecommendationResponse(
+            product_id=row.product_id,
+            name=details[row.product_id]["brand"],
+            category=details[row.product_id]["category"],
+            price=details[row.product_id]["price"],
+            match_score=row.score,
+            explanation="Precomputed from your profile."
+        )
+        for row in rows
+        if row.product_id in details
+    ]
+
+@router.get("/catalog/{product_id}/similar", response_model=List[SimilarProductResponse])
+async def get_similar_catalog_products(
+    product_id: str,
+    limit: int = Query(10, ge=1, le=100),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Products most similar to the given one, from the precomputed neighbor index.
+    """
+    index = get_similarity_index(CATALOG_INDEX)
+    if index is None:
+        raise HTTPException(status_code=503, detail="Similarity index has not been built")
+    neighbors = index.similar(product_id, limit=limit)
+    if not neighbors and product_id not in index:
+        raise HTTPException(status_code=404, detail="Product not found")
+    
+    await ensure_catalog_loaded(db)
+    details = {item["product_id"]: item for item in recommendation_engine.lookup(pid for pid, _ in neighbors)}
+    return [
+        SimilarProductResponse(
+            product_id=neighbor_id,
+            name=details[neighbor_id]["brand"],
+            category=details[neighbor_id]["category"],
+            price=details[neighbor_id]["price"],
+            similarity=round(score, 4)
+        )
+        for neighbor_id, score in neighbors
+        if neighbor_id in details
+    ]
+
 @router.post("/product_storytelling", response_model=ProductStoryResponse)
 async def generate_product_story(
     request: ProductStoryRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Generate an engaging product story using Gemini AI.
     """
     try:
         # Get product data
-        product = db.query(Product).filter(
-            Product.product_id == request.product_id
-        ).first()
+        result = await db.execute(select(CatalogProduct).filter(
+            CatalogProduct.product_id == request.product_id
+        ))
+        product = result.scalars().first()
         
         if not product:
             raise HTTPException(status_code=404, detail="Product not found")
         
+        # Personalize for the customer when one is given
+        customer_context = ""
+        if request.customer_id:
+            profile = await customer_profiles.get(db, request.customer_id)
+            if profile:
+                customer_context = render_profile(profile)
+        
         # Prepare prompt for Gemini
         prompt = f"""
         Create an engaging and personalized product story for:
@@ -91,6 +212,7 @@ async def generate_product_story(
         Category: {product.category}
         Price: {product.price}
         Average Rating: {product.average_rating}
+        {customer_context}
         
         The story should:
         1. Highlight key features
@@ -99,13 +221,18 @@ async def generate_product_story(
         4. Be concise and engaging
         """
         
-        # Generate story using Gemini
-        response = model.generate_content(prompt)
+        # Generate story using Gemini; viewers of the same story share one in-flight call
+        response_text = await single_flight.do(
+            request_key("product_story", request.customer_id, {"product_id": request.product_id}),
+            lambda: llm_client.generate(prompt)
+        )
         
         return ProductStoryResponse(
             product_id=product.product_id,
-            story=response.text
+            story=response_text
         )
         
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Timed out waiting for the AI model")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
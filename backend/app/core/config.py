@@ -11,11 +11,74 @@ class Settings(BaseSettings):
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-here")
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    PRINCIPAL_CACHE_TTL_SECONDS: int = int(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "60"))
+    PRINCIPAL_CACHE_MAX_SIZE: int = 10000
+    
+    # Database settings
+    DATABASE_URL: Optional[str] = os.getenv("DATABASE_URL")
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "10"))
+    DB_MAX_OVERFLOW: int = 10
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
+    SQLITE_CACHE_SIZE_KB: int = 64000
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    # Fail loudly on implicit relationship lazy loads (enable in tests and development)
+    DB_RAISE_ON_LAZY_LOAD: bool = os.getenv("DB_RAISE_ON_LAZY_LOAD", "False").lower() == "true"
+    
+    # Behavior event buffer settings
+    BEHAVIOR_BUFFER_MAX_SIZE: int = 10000
+    BEHAVIOR_BUFFER_BATCH_SIZE: int = 500
+    BEHAVIOR_BUFFER_FLUSH_INTERVAL_SECONDS: float = 1.0
+    BEHAVIOR_BUFFER_PUT_TIMEOUT_SECONDS: float = 0.05
+    
+    # Realtime update settings
+    REALTIME_QUEUE_SIZE: int = 100
     
     # API settings
     DEBUG: bool = os.getenv("DEBUG", "False").lower() == "true"
     GOOGLE_API_KEY: str = os.getenv("GOOGLE_API_KEY", "your-google-api-key-here")
     
+    # LLM client settings
+    LLM_MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+    LLM_TIMEOUT_SECONDS: float = 30.0
+    
+    # LLM response cache settings
+    LLM_CACHE_BACKEND: str = os.getenv("LLM_CACHE_BACKEND", "memory")  # memory or sqlite
+    LLM_CACHE_PATH: str = os.getenv("LLM_CACHE_PATH", "llm_cache.db")
+    LLM_CACHE_TTL_SECONDS: int = 3600
+    LLM_CACHE_MAX_ENTRIES: int = 1024
+    
+    # Recommendation settings
+    RECOMMENDATION_CANDIDATE_LIMIT: int = 50
+    # Stored recommendations are fresh for the TTL, then served while regenerating up to the max staleness
+    RECOMMENDATION_TTL_SECONDS: int = int(os.getenv("RECOMMENDATION_TTL_SECONDS", "900"))
+    RECOMMENDATION_MAX_STALE_SECONDS: int = 86400
+    # Generations kept per user; the newest plus the one it replaced covers requests still reading it
+    RECOMMENDATION_GENERATIONS_KEPT: int = 2
+    # How often the in-memory scoring catalog checks catalog_products for new or updated rows
+    CATALOG_REFRESH_INTERVAL_SECONDS: float = 30.0
+    # Customers per matrix pass in batch scoring; the score matrix is chunk x catalog floats
+    BATCH_SCORING_CHUNK_SIZE: int = 128
+    BATCH_SCORING_MAX_CUSTOMERS: int = 10000
+    
+    # Offline precompute job settings (0 workers means one per core)
+    PRECOMPUTE_WORKERS: int = int(os.getenv("PRECOMPUTE_WORKERS", "0"))
+    PRECOMPUTE_SLICE_SIZE: int = 500
+    
+    # Item-to-item similarity index settings
+    SIMILARITY_INDEX_DIR: str = os.getenv("SIMILARITY_INDEX_DIR", "similarity_index")
+    SIMILARITY_TOP_K: int = 20
+    SIMILARITY_BASKET_MAX_ITEMS: int = 50
+    
+    # Customer profile snapshot settings
+    CUSTOMER_PROFILE_CACHE_TTL_SECONDS: int = 300
+    CUSTOMER_PROFILE_CACHE_MAX_SIZE: int = 10000
+    CUSTOMER_PROFILE_TOP_CATEGORIES: int = 5
+    CUSTOMER_PROFILE_RECENT_PURCHASES: int = 5
+    
+    # Trending leaderboard settings
+    TRENDING_REFRESH_INTERVAL_SECONDS: float = 60.0
+    TRENDING_LEADERBOARD_SIZE: int = 50
+    
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
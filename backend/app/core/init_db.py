@@ -1,80 +1,191 @@
-import pandas as pd
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-import os
+import argparse
+import asyncio
+from datetime import datetime
 from pathlib import Path
-import json
-
-from app.models.base import Base
-from app.models.customer import Customer
-from app.models.product import Product
-from app.core.database import engine, SessionLocal
-
-def init_db():
-    # Create database directory if it doesn't exist
-    db_dir = Path(__file__).parent.parent.parent / "database"
-    db_dir.mkdir(exist_ok=True)
-    
-    # Create all tables
-    Base.metadata.create_all(bind=engine)
-    
-    # Create a new session
-    db = SessionLocal()
-    
-    try:
-        # Load customer data
-        customer_df = pd.read_csv("../../customer_data_collection.csv")
-        
-        for _, row in customer_df.iterrows():
-            customer = Customer(
-                customer_id=str(row['Customer_ID']),
-                age=int(row['Age']),
-                gender=str(row['Gender']),
-                location=str(row['Location']),
-                browsing_history=json.dumps({"categories": []}),  # Initialize empty
-                purchase_history=json.dumps([]),  # Initialize empty
-                customer_segment=str(row['Customer_Segment']),
-                avg_order_value=float(row['Avg_Order_Value']),
-                current_mood="neutral",  # Default mood
-                persona_traits=json.dumps([]),  # Initialize empty
-                psychographic_profile="",  # Initialize empty
-                interaction_history=json.dumps([])  # Initialize empty
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import pandas as pd
+from sqlalchemy import case, select, update
+
+from backend.app.models.models import Customer, CatalogProduct, CustomerInteraction, IngestionCheckpoint
+from backend.app.models.customer import BEHAVIOR_TRACKED_COLUMNS
+from backend.database.database import Base, upsert_insert, write_engine
+
+# Seed datasets live at the repository root
+DATA_DIR = Path(__file__).resolve().parent.parent.parent.parent
+CUSTOMER_CSV = DATA_DIR / "customer_data_collection.csv"
+PRODUCT_CSV = DATA_DIR / "product_recommendation_data.csv"
+
+DEFAULT_CHUNK_SIZE = 2000
+
+def parse_list_column(series: pd.Series) -> pd.Series:
+    """Parse "['A', 'B']" style cells into lists with vectorized string ops."""
+    items = (
+        series.fillna("")
+        .astype(str)
+        .str.strip("[] ")
+        .str.replace("'", "", regex=False)
+        .str.replace('"', "", regex=False)
+        .str.split(",")
+    )
+    return items.map(lambda values: [v.strip() for v in values if v.strip()])
+
+def customer_rows(chunk: pd.DataFrame) -> List[Dict]:
+    categories = parse_list_column(chunk["Browsing_History"])
+    frame = pd.DataFrame({
+        "customer_id": chunk["Customer_ID"].astype(str),
+        "age": chunk["Age"].astype(int),
+        "gender": chunk["Gender"].astype(str),
+        "location": chunk["Location"].astype(str),
+        "browsing_history": categories.map(lambda c: {"categories": c}),
+        "customer_segment": chunk["Customer_Segment"].astype(str),
+        "avg_order_value": chunk["Avg_Order_Value"].astype(float),
+    })
+    frame["purchase_history"] = [[] for _ in range(len(frame))]
+    frame["current_mood"] = "neutral"
+    frame["persona_traits"] = [[] for _ in range(len(frame))]
+    frame["psychographic_profile"] = ""
+    frame["interaction_history"] = [[] for _ in range(len(frame))]
+    return frame.to_dict("records")
+
+def product_rows(chunk: pd.DataFrame) -> List[Dict]:
+    frame = pd.DataFrame({
+        "product_id": chunk["Product_ID"].astype(str),
+        "category": chunk["Category"].astype(str),
+        "subcategory": chunk["Subcategory"].astype(str),
+        "price": chunk["Price"].astype(float),
+        "brand": chunk["Brand"].astype(str),
+        "average_rating": chunk["Average_Rating_of_Similar_Products"].astype(float),
+        "product_rating": chunk["Product_Rating"].astype(float),
+        "review_sentiment_score": chunk["Customer_Review_Sentiment_Score"].astype(float),
+        "holiday": chunk["Holiday"].astype(str),
+        "season": chunk["Season"].astype(str),
+        "geographical_location": chunk["Geographical_Location"].astype(str),
+        "similar_products": parse_list_column(chunk["Similar_Product_List"]),
+        "probability_of_recommendation": chunk["Probability_of_Recommendation"].astype(float),
+    })
+    frame["ai_description"] = ""
+    frame["psychographic_tags"] = [[] for _ in range(len(frame))]
+    frame["mood_tags"] = [[] for _ in range(len(frame))]
+    return frame.to_dict("records")
+
+CUSTOMER_COLUMNS = [
+    "Customer_ID", "Age", "Gender", "Location", "Browsing_History",
+    "Customer_Segment", "Avg_Order_Value",
+]
+PRODUCT_COLUMNS = [
+    "Product_ID", "Category", "Subcategory", "Price", "Brand", "Average_Rating_of_Similar_Products",
+    "Product_Rating", "Customer_Review_Sentiment_Score", "Holiday", "Season",
+    "Geographical_Location", "Similar_Product_List", "Probability_of_Recommendation",
+]
+
+def has_tracked_behavior():
+    """True for customers the live event stream has written to."""
+    # Uncorrelated, so the subquery runs once per statement rather than once per row
+    return Customer.customer_id.in_(select(CustomerInteraction.customer_id))
+
+def _build_statement(model, key: str, upsert: bool, preserve: Sequence[str] = (), preserve_when: Optional[Any] = None):
+    table = model.__table__
+    stmt = upsert_insert(table)
+    if upsert:
+        excluded = {
+            column.name: stmt.excluded[column.name]
+            for column in table.columns
+            if column.name not in ("id", key, "created_at")
+        }
+        for name in preserve:
+            if preserve_when is None:
+                del excluded[name]
+            else:
+                # Keep the stored value only for rows matching the condition
+                excluded[name] = case((preserve_when, table.c[name]), else_=stmt.excluded[name])
+        return stmt.on_conflict_do_update(index_elements=[key], set_=excluded)
+    return stmt.on_conflict_do_nothing(index_elements=[key])
+
+async def _get_checkpoint(conn, source: str) -> int:
+    result = (await conn.execute(
+        select(IngestionCheckpoint.rows_loaded).where(IngestionCheckpoint.source == source)
+    )).first()
+    if result is None:
+        await conn.execute(upsert_insert(IngestionCheckpoint.__table__).values(source=source, rows_loaded=0))
+        return 0
+    return result[0] or 0
+
+async def load_csv(
+    source: str,
+    path: Path,
+    model,
+    key: str,
+    usecols: List[str],
+    to_rows: Callable[[pd.DataFrame], List[Dict]],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    upsert: bool = False,
+    resume: bool = False,
+    preserve: Sequence[str] = (),
+    preserve_when: Optional[Any] = None,
+) -> int:
+    """Stream a CSV into a table in batched transactions; returns rows written."""
+    async with write_engine.begin() as conn:
+        start = await _get_checkpoint(conn, source)
+        if not resume:
+            start = 0
+            await conn.execute(
+                update(IngestionCheckpoint).where(IngestionCheckpoint.source == source).values(rows_loaded=0)
             )
-            db.add(customer)
-        
-        # Load product data
-        product_df = pd.read_csv("../../product_recommendation_data.csv")
-        
-        for _, row in product_df.iterrows():
-            product = Product(
-                product_id=str(row['Product_ID']),
-                category=str(row['Category']),
-                price=float(row['Price']),
-                brand=str(row['Brand']),
-                average_rating=float(row['Average_Rating_of_Similar_Products']),
-                product_rating=float(row['Product_Rating']),
-                review_sentiment_score=float(row['Customer_Review_Sentiment_Score']),
-                holiday=str(row['Holiday']),
-                season=str(row['Season']),
-                geographical_location=str(row['Geographical_Location']),
-                similar_products=json.dumps([]),  # Initialize empty
-                probability_of_recommendation=float(row['Probability_of_Recommendation']),
-                ai_description="",  # Initialize empty
-                psychographic_tags=json.dumps([]),  # Initialize empty
-                mood_tags=json.dumps([])  # Initialize empty
+    stmt = _build_statement(model, key, upsert, preserve, preserve_when)
+
+    written = 0
+    reader = pd.read_csv(
+        path,
+        usecols=usecols,
+        chunksize=chunk_size,
+        skiprows=range(1, start + 1) if start else None,
+    )
+    for chunk in reader:
+        if chunk.empty:
+            continue
+        # Each batch is stamped when written, so readers can pick up rows changed since they last looked
+        batch_time = datetime.utcnow()
+        rows = to_rows(chunk)
+        for row in rows:
+            row["updated_at"] = batch_time
+        # Rows and checkpoint commit together, so a rerun resumes exactly here
+        async with write_engine.begin() as conn:
+            await conn.execute(stmt, rows)
+            await conn.execute(
+                update(IngestionCheckpoint)
+                .where(IngestionCheckpoint.source == source)
+                .values(rows_loaded=start + written + len(rows), updated_at=batch_time)
             )
-            db.add(product)
-        
-        # Commit the changes
-        db.commit()
+        written += len(rows)
+        print(f"{source}: {start + written} rows loaded")
+    return written
+
+async def init_db(chunk_size: int = DEFAULT_CHUNK_SIZE, upsert: bool = False, resume: bool = False):
+    # Create all tables
+    async with write_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    try:
+        await load_csv(
+            "customers", CUSTOMER_CSV, Customer, "customer_id", CUSTOMER_COLUMNS, customer_rows,
+            chunk_size=chunk_size, upsert=upsert, resume=resume,
+            # The live event stream owns these once it has seen the customer; others take the CSV values
+            preserve=BEHAVIOR_TRACKED_COLUMNS, preserve_when=has_tracked_behavior()
+        )
+        await load_csv(
+            "products", PRODUCT_CSV, CatalogProduct, "product_id", PRODUCT_COLUMNS, product_rows,
+            chunk_size=chunk_size, upsert=upsert, resume=resume
+        )
         print("Database initialized successfully!")
-        
     except Exception as e:
-        db.rollback()
         print(f"Error initializing database: {str(e)}")
         raise e
-    finally:
-        db.close()
 
 if __name__ == "__main__":
-    init_db() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Load the SmartCart seed datasets.")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows per batch transaction")
+    parser.add_argument("--upsert", action="store_true", help="Update rows that already exist instead of skipping them")
+    parser.add_argument("--resume", action="store_true", help="Continue from the last committed batch")
+    args = parser.parse_args()
+    asyncio.run(init_db(chunk_size=args.chunk_size, upsert=args.upsert, resume=args.resume))
@@ -0,0 +1,50 @@
+import threading
+from collections import defaultdict
+from typing import Any, Callable, Dict
+
+class MetricsRegistry:
+    """Process-local counters, gauges and timing summaries."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, int] = defaultdict(int)
+        self._gauges: Dict[str, Callable[[], Any]] = {}
+        self._summaries: Dict[str, Dict[str, float]] = {}
+
+    def incr(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[name] += amount
+
+    def register_gauge(self, name: str, func: Callable[[], Any]) -> None:
+        """Register a callable that is sampled whenever a snapshot is taken."""
+        with self._lock:
+            self._gauges[name] = func
+
+    def observe(self, name: str, value: float) -> None:
+        """Record one sample (e.g. a latency in seconds) into a running summary."""
+        with self._lock:
+            summary = self._summaries.get(name)
+            if summary is None:
+                summary = {"count": 0, "sum": 0.0, "max": value, "min": value}
+                self._summaries[name] = summary
+            summary["count"] += 1
+            summary["sum"] += value
+            summary["max"] = max(summary["max"], value)
+            summary["min"] = min(summary["min"], value)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+            summaries = {
+                name: dict(summary, avg=summary["sum"] / summary["count"])
+                for name, summary in self._summaries.items()
+            }
+        return {
+            "counters": counters,
+            "gauges": {name: func() for name, func in gauges.items()},
+            "summaries": summaries,
+        }
+
+# Shared registry for the process
+metrics = MetricsRegistry()
@@ -0,0 +1,19 @@
+import base64
+import json
+from typing import Any, Dict
+from fastapi import HTTPException
+
+def encode_cursor(values: Dict[str, Any]) -> str:
+    """Serialize the last row's sort key into an opaque, URL-safe cursor."""
+    raw = json.dumps(values, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, dict):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
@@ -1,9 +1,11 @@
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Dict, Optional, Tuple
+import time
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
@@ -11,11 +13,46 @@ from sqlalchemy.orm import selectinload
 from backend.app.models.models import User
 from backend.database.database import get_db
 from backend.app.core.config import settings
-from backend.app.schemas.schemas import UserResponse
+from backend.app.schemas.schemas import UserResponse, Principal
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
+# Resolved principals keyed by token subject (email): subject -> (expires_at, principal)
+_principal_cache: Dict[str, Tuple[float, Principal]] = {}
+
+def _get_cached_principal(subject: str) -> Optional[Principal]:
+    entry = _principal_cache.get(subject)
+    if entry is None:
+        return None
+    expires_at, principal = entry
+    if expires_at < time.monotonic():
+        _principal_cache.pop(subject, None)
+        return None
+    return principal
+
+def _cache_principal(subject: str, principal: Principal) -> None:
+    if settings.PRINCIPAL_CACHE_TTL_SECONDS <= 0:
+        return
+    if len(_principal_cache) >= settings.PRINCIPAL_CACHE_MAX_SIZE:
+        # Drop the entry closest to expiry to make room
+        oldest = min(_principal_cache, key=lambda k: _principal_cache[k][0])
+        _principal_cache.pop(oldest, None)
+    _principal_cache[subject] = (
+        time.monotonic() + settings.PRINCIPAL_CACHE_TTL_SECONDS,
+        principal
+    )
+
+def invalidate_principal(subject: str) -> None:
+    """Forget the cached principal for a token subject."""
+    _principal_cache.pop(subject, None)
+
+@event.listens_for(User.is_active, "set")
+def _invalidate_on_deactivate(target, value, oldvalue, initiator):
+    # A deactivated user must not keep authenticating from the cache
+    if not value and target.email:
+        invalidate_principal(target.email)
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
@@ -41,40 +78,57 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
+async def resolve_principal(token: str, db: AsyncSession) -> Optional[Principal]:
+    """Resolve a bearer token to its principal, or None if it is not valid."""
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        return None
+    email: str = payload.get("sub")
+    if email is None:
+        return None
+    
+    principal = _get_cached_principal(email)
+    if principal is not None:
+        return principal
+    
+    # Only the identity columns are needed to authorize a request
+    query = select(User.id, User.email, User.is_active).filter(User.email == email)
+    result = await db.execute(query)
+    row = result.first()
+    if row is None:
+        return None
+    principal = Principal(id=row.id, email=row.email, is_active=bool(row.is_active))
+    _cache_principal(email, principal)
+    return principal
+
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: AsyncSession = Depends(get_db)
-) -> User:
+) -> Principal:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
-    except JWTError:
+    principal = await resolve_principal(token, db)
+    if principal is None:
         raise credentials_exception
-    
-    # Load user with all relationships
-    query = select(User).filter(User.email == email).options(
+    return principal
+
+async def get_current_active_user(
+    current_user: Principal = Depends(get_current_user)
+) -> Principal:
+    if not current_user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return current_user
+
+def user_with_relationships(user_id: int):
+    """Query for a user with every relationship eagerly loaded."""
+    return select(User).filter(User.id == user_id).options(
         selectinload(User.shopping_lists),
         selectinload(User.behaviors),
         selectinload(User.mood_states),
         selectinload(User.personas),
         selectinload(User.recommendations)
     )
-    result = await db.execute(query)
-    user = result.scalars().first()
-    if user is None:
-        raise credentials_exception
-    return user
-
-async def get_current_active_user(
-    current_user: User = Depends(get_current_user)
-) -> User:
-    if not current_user.is_active:
-        raise HTTPException(status_code=400, detail="Inactive user")
-    return current_user 
\ No newline at end of file
@@ -1,4 +1,4 @@
-from fastapi import FastAPI, Request
+from fastapi import Depends, FastAPI, Request
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
@@ -8,7 +8,12 @@ from pathlib import Path
 import asyncio
 
 from backend.app.api.endpoints import router as api_router
+from backend.app.api import behavior, chat, persona, products
+from backend.app.core.security import get_current_active_user
 from backend.database.database import init_db
+from backend.app.services.event_buffer import behavior_buffer
+from backend.app.services.trending import trending_service
+from backend.app.services.recommendation_store import recommendation_store
 
 # Get the absolute path to the frontend directory
 FRONTEND_DIR = Path(__file__).parent.parent.parent / "frontend"
@@ -56,8 +61,24 @@ async def catch_all(path: str):
 
 # Include API routes after the catch-all route
 app.include_router(api_router, prefix="/api/v1")
+# The customer-dataset routers have no per-route auth; require a signed-in user for all of them
+authenticated = [Depends(get_current_active_user)]
+app.include_router(products.router, prefix="/api/v1", tags=["catalog"], dependencies=authenticated)
+app.include_router(chat.router, prefix="/api/v1", tags=["chat"], dependencies=authenticated)
+app.include_router(persona.router, prefix="/api/v1", tags=["persona"], dependencies=authenticated)
+app.include_router(behavior.router, prefix="/api/v1", tags=["behavior"], dependencies=authenticated)
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize the database on startup."""
-    await init_db() 
\ No newline at end of file
+    await init_db()
+    await behavior_buffer.start()
+    await trending_service.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background refreshes and flush buffered behavior events before the worker exits."""
+    await recommendation_store.stop()
+    await trending_service.stop()
+    await behavior_buffer.stop()
+ 
\ No newline at end of file
@@ -0,0 +1,28 @@
+from sqlalchemy import Column, String, Integer, Float, DateTime, Index
+from datetime import datetime
+from .base import Base
+
+class CatalogRecommendationRun(Base):
+    """One precompute run; its staging rows are readable only once completed_at is set."""
+    __tablename__ = "catalog_recommendation_runs"
+
+    run_id = Column(String, primary_key=True)
+    k = Column(Integer, nullable=False)
+    customers = Column(Integer)
+    started_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    completed_at = Column(DateTime, index=True)
+
+class CatalogRecommendationStaging(Base):
+    """Precomputed top-k catalog recommendations per customer, one row per rank."""
+    __tablename__ = "catalog_recommendation_staging"
+    __table_args__ = (
+        Index('ix_catalog_recommendation_staging_customer_id_rank', 'customer_id', 'rank'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    run_id = Column(String, nullable=False, index=True)  # Rows of older runs are removed once a run completes
+    customer_id = Column(String, nullable=False)
+    rank = Column(Integer, nullable=False)
+    product_id = Column(String, nullable=False)
+    score = Column(Float, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -1,6 +1,9 @@
 from sqlalchemy import Column, String, Integer, Float, JSON, Text
 from .base import BaseModel
 
+# Columns behavior tracking keeps updating after ingest; a seed re-ingest keeps them for tracked customers
+BEHAVIOR_TRACKED_COLUMNS = ("purchase_count", "avg_order_value", "browsing_history")
+
 class Customer(BaseModel):
     __tablename__ = "customers"
 
@@ -9,10 +12,11 @@ class Customer(BaseModel):
     gender = Column(String)
     location = Column(String)
     browsing_history = Column(JSON)  # Store as JSON array
-    purchase_history = Column(JSON)  # Store as JSON array
+    purchase_history = Column(JSON)  # Seed data only; new purchases go to customer_interactions
     customer_segment = Column(String)
     avg_order_value = Column(Float)
+    purchase_count = Column(Integer, default=0)  # Running count, updated per purchase event
     current_mood = Column(String)
     persona_traits = Column(JSON)  # Store personality traits as JSON
     psychographic_profile = Column(Text)  # Store detailed psychographic profile
-    interaction_history = Column(JSON)  # Store interaction logs 
\ No newline at end of file
+    interaction_history = Column(JSON)  # Legacy; superseded by customer_interactions 
\ No newline at end of file
@@ -0,0 +1,8 @@
+from sqlalchemy import Column, String, Integer
+from .base import BaseModel
+
+class IngestionCheckpoint(BaseModel):
+    __tablename__ = "ingestion_checkpoints"
+
+    source = Column(String, unique=True, index=True)  # Name of the dataset being loaded
+    rows_loaded = Column(Integer, default=0)  # Data rows committed so far
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, String, Integer, Float, JSON, DateTime, Index
+from datetime import datetime
+from .base import Base
+
+class CustomerInteraction(Base):
+    """Append-only log of customer behavior events; rows are never updated."""
+    __tablename__ = "customer_interactions"
+    __table_args__ = (
+        Index('ix_customer_interactions_customer_id_ts', 'customer_id', 'ts'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    customer_id = Column(String, nullable=False)
+    action_type = Column(String, nullable=False)  # e.g., "view", "purchase", "like", "skip"
+    product_id = Column(String)
+    category = Column(String)
+    price = Column(Float)
+    details = Column(JSON)
+    ts = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, Table, DateTime, JSON, Boolean
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Table, DateTime, Date, JSON, Boolean, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from backend.database.database import Base
@@ -34,14 +34,22 @@ class User(Base):
 
 class Product(Base):
     __tablename__ = "products"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # Serve price-ordered pages and category + price-range filters from indexes;
+        # SQLite appends the rowid (id) to every index, giving (price, id) ordering
+        Index('ix_products_price', 'price'),
+        Index('ix_products_category_price', 'category', 'price'),
+        {'extend_existing': True}
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
     description = Column(String, nullable=True)
     price = Column(Float, nullable=False)
-    category = Column(String, nullable=True)
+    category = Column(String, nullable=True, index=True)
     nutritional_info = Column(JSON, nullable=True)
+    average_rating = Column(Float, nullable=True)
+    probability_of_recommendation = Column(Float, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -63,7 +71,10 @@ class Category(Base):
 
 class ShoppingList(Base):
     __tablename__ = "shopping_lists"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index('ix_shopping_lists_user_id', 'user_id'),
+        {'extend_existing': True}
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
@@ -76,7 +87,10 @@ class ShoppingList(Base):
 
 class ShoppingListItem(Base):
     __tablename__ = "shopping_list_items"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index('ix_shopping_list_items_shopping_list_id', 'shopping_list_id'),
+        {'extend_existing': True}
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     shopping_list_id = Column(Integer, ForeignKey("shopping_lists.id"))
@@ -90,7 +104,11 @@ class ShoppingListItem(Base):
 
 class Behavior(Base):
     __tablename__ = "behaviors"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index('ix_behaviors_user_id_created_at', 'user_id', 'created_at'),
+        Index('ix_behaviors_created_at_product_id', 'created_at', 'product_id'),
+        {'extend_existing': True}
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
@@ -104,7 +122,10 @@ class Behavior(Base):
 
 class MoodState(Base):
     __tablename__ = "mood_states"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index('ix_mood_states_user_id_created_at', 'user_id', 'created_at'),
+        {'extend_existing': True}
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
@@ -131,14 +152,52 @@ class Persona(Base):
 
 class Recommendation(Base):
     __tablename__ = "recommendations"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # Serving reads a user's newest generation
+        Index('ix_recommendations_user_id_created_at', 'user_id', 'created_at'),
+        {'extend_existing': True}
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
     product_id = Column(Integer, ForeignKey("products.id"))
     score = Column(Float, nullable=False)
     reason = Column(String, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    context = Column(JSON, nullable=True)  # Interest and collaborative insights at generation time
+    created_at = Column(DateTime, default=datetime.utcnow)  # Shared by every row of one generation
 
     user = relationship("User", back_populates="recommendations")
-    product = relationship("Product", back_populates="recommendations") 
\ No newline at end of file
+    product = relationship("Product", back_populates="recommendations") 
+
+# Rollup tables maintained incrementally alongside the raw event tables
+class UserDailyActivity(Base):
+    __tablename__ = "user_daily_activity"
+    __table_args__ = {'extend_existing': True}
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    behavior_count = Column(Integer, nullable=False, default=0)
+
+class UserCategoryQuantity(Base):
+    __tablename__ = "user_category_quantities"
+    __table_args__ = {'extend_existing': True}
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    category = Column(String, primary_key=True)
+    quantity = Column(Integer, nullable=False, default=0)
+
+class UserDailyMood(Base):
+    __tablename__ = "user_daily_moods"
+    __table_args__ = {'extend_existing': True}
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    intensity_sum = Column(Float, nullable=False, default=0.0)
+    mood_count = Column(Integer, nullable=False, default=0)
+
+# Customer-dataset models share this registry and metadata
+from backend.app.models.customer import Customer
+from backend.app.models.product import CatalogProduct
+from backend.app.models.interaction import CustomerInteraction
+from backend.app.models.ingestion import IngestionCheckpoint
+from backend.app.models.catalog_recommendation import CatalogRecommendationRun, CatalogRecommendationStaging
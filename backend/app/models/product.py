@@ -1,11 +1,13 @@
 from sqlalchemy import Column, String, Integer, Float, JSON, Text
 from .base import BaseModel
 
-class Product(BaseModel):
-    __tablename__ = "products"
+class CatalogProduct(BaseModel):
+    """Product from the recommendation dataset, keyed by its string product_id."""
+    __tablename__ = "catalog_products"
 
     product_id = Column(String, unique=True, index=True)
     category = Column(String)
+    subcategory = Column(String, index=True)
     price = Column(Float)
     brand = Column(String)
     average_rating = Column(Float)
@@ -14,7 +16,7 @@ class Product(BaseModel):
     holiday = Column(String)
     season = Column(String)
     geographical_location = Column(String)
-    similar_products = Column(JSON)  # Store as JSON array
+    similar_products = Column(JSON)  # Subcategories listed as similar, as a JSON array
     probability_of_recommendation = Column(Float)
     ai_description = Column(Text)  # Store Gemini-generated description
     psychographic_tags = Column(JSON)  # Store psychographic matching tags
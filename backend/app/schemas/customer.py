@@ -0,0 +1,16 @@
+from pydantic import BaseModel
+from typing import Any, Dict, List, Optional
+
+class CustomerProfile(BaseModel):
+    """Bounded summary of a customer for prompts; never carries full history columns."""
+    customer_id: str
+    age: Optional[int] = None
+    gender: Optional[str] = None
+    location: Optional[str] = None
+    customer_segment: Optional[str] = None
+    avg_order_value: Optional[float] = None
+    current_mood: Optional[str] = None
+    top_categories: List[str] = []
+    recent_purchases: List[Dict[str, Any]] = []
+    purchase_count: int = 0
+    persona_traits: List[str] = []
@@ -1,10 +1,11 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional
 
 class ProductRecommendationRequest(BaseModel):
     customer_id: str
     mood: Optional[str] = None
     limit: Optional[int] = 10
+    similar_to: Optional[str] = None  # product_id for "more like this"
 
 class ProductRecommendationResponse(BaseModel):
     product_id: str
@@ -17,6 +18,17 @@ class ProductRecommendationResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class BatchRecommendationRequest(BaseModel):
+    customer_ids: List[str]
+    limit: int = Field(10, ge=1, le=100)
+
+class SimilarProductResponse(BaseModel):
+    product_id: str
+    name: str
+    category: str
+    price: float
+    similarity: float
+
 class ProductStoryRequest(BaseModel):
     product_id: str
     customer_id: Optional[str] = None
@@ -20,6 +20,15 @@ class UserResponse(UserBase):
     class Config:
         from_attributes = True
 
+class Principal(BaseModel):
+    """Minimal identity resolved from a bearer token."""
+    id: int
+    email: str
+    is_active: bool = True
+
+    class Config:
+        from_attributes = True
+
 class User(UserResponse):
     shopping_lists: List['ShoppingList'] = []
     behaviors: List['Behavior'] = []
@@ -35,6 +44,8 @@ class ProductBase(BaseModel):
     price: float
     category: Optional[str] = None
     nutritional_info: Optional[Dict[str, Any]] = None
+    average_rating: Optional[float] = None
+    probability_of_recommendation: Optional[float] = None
 
 class ProductCreate(ProductBase):
     pass
@@ -93,6 +104,9 @@ class ShoppingListItem(ShoppingListItemBase):
     class Config:
         from_attributes = True
 
+# ShoppingList refers to ShoppingListItem before it is defined
+ShoppingList.model_rebuild()
+
 class BehaviorBase(BaseModel):
     product_id: int
     action_type: str
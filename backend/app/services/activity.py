@@ -0,0 +1,51 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy.sql import Select
+from sqlalchemy.future import select
+
+from backend.app.models.models import Behavior, Product, Recommendation
+
+# Statement builders for per-user activity feeds. Each one joins the product
+# columns it needs into the same row, so callers never touch a lazy
+# relationship (which would be one extra query per row, or an error under
+# AsyncSession).
+
+def recommendation_rows(user_id: int, since: Optional[datetime] = None, limit: Optional[int] = None) -> Select:
+    """Recommendation rows with product id and name, newest first."""
+    query = select(
+        Recommendation.id,
+        Recommendation.product_id,
+        Product.name.label("product_name"),
+        Recommendation.score,
+        Recommendation.created_at
+    ).join(
+        Product, Recommendation.product_id == Product.id
+    ).filter(
+        Recommendation.user_id == user_id
+    )
+    if since is not None:
+        query = query.filter(Recommendation.created_at > since)
+    query = query.order_by(Recommendation.created_at.desc())
+    if limit is not None:
+        query = query.limit(limit)
+    return query
+
+def behavior_rows(user_id: int, since: Optional[datetime] = None, limit: Optional[int] = None) -> Select:
+    """Behavior rows with product id and name, newest first."""
+    query = select(
+        Behavior.id,
+        Behavior.product_id,
+        Product.name.label("product_name"),
+        Behavior.action_type,
+        Behavior.created_at
+    ).join(
+        Product, Behavior.product_id == Product.id
+    ).filter(
+        Behavior.user_id == user_id
+    )
+    if since is not None:
+        query = query.filter(Behavior.created_at > since)
+    query = query.order_by(Behavior.created_at.desc())
+    if limit is not None:
+        query = query.limit(limit)
+    return query
@@ -0,0 +1,64 @@
+from datetime import datetime
+from typing import Any, Dict
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from backend.app.models.models import UserDailyActivity, UserCategoryQuantity, UserDailyMood
+
+class AnalyticsService:
+    """
+    Dashboard aggregates read from the per-user rollup tables.
+
+    The rollups are kept current as events are written (see services/rollups.py),
+    so each read touches a handful of pre-aggregated rows rather than the raw history.
+    """
+
+    async def shopping_patterns(self, db: AsyncSession, user_id: int, since: datetime) -> Dict[str, Any]:
+        """Behavior counts per day since the given time, for the user."""
+        query = select(UserDailyActivity.day, UserDailyActivity.behavior_count).filter(
+            UserDailyActivity.user_id == user_id,
+            UserDailyActivity.day >= since.date()
+        ).order_by(UserDailyActivity.day)
+        result = await db.execute(query)
+        rows = result.all()
+        return {
+            "dates": [str(day) for day, _ in rows],
+            "frequencies": [count for _, count in rows]
+        }
+
+    async def mood_trends(self, db: AsyncSession, user_id: int, since: datetime) -> Dict[str, Any]:
+        """Average mood intensity per day since the given time, for the user."""
+        query = select(UserDailyMood.day, UserDailyMood.intensity_sum, UserDailyMood.mood_count).filter(
+            UserDailyMood.user_id == user_id,
+            UserDailyMood.day >= since.date()
+        ).order_by(UserDailyMood.day)
+        result = await db.execute(query)
+        rows = result.all()
+        return {
+            "dates": [str(day) for day, _, _ in rows],
+            "intensities": [total / count if count else 0 for _, total, count in rows]
+        }
+
+    async def categories_distribution(self, db: AsyncSession, user_id: int) -> Dict[str, Any]:
+        """Quantities per product category across all of the user's shopping lists."""
+        query = select(UserCategoryQuantity.category, UserCategoryQuantity.quantity).filter(
+            UserCategoryQuantity.user_id == user_id
+        )
+        result = await db.execute(query)
+        category_counts = dict(result.all())
+        total_items = sum(category_counts.values())
+
+        distribution = {
+            category: {
+                'count': count,
+                'percentage': (count / total_items * 100) if total_items > 0 else 0
+            }
+            for category, count in category_counts.items()
+        }
+        return {
+            'total_items': total_items,
+            'distribution': distribution
+        }
+
+# Shared service instance
+analytics_service = AnalyticsService()
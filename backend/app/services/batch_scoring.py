@@ -0,0 +1,222 @@
+import argparse
+import asyncio
+import json
+import sys
+import time
+from datetime import date, datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from backend.app.core.config import settings
+from backend.app.models.models import CatalogProduct, Customer
+from backend.app.services.recommendation_engine import recommendation_engine
+from backend.database.database import async_session
+
+# Only what scoring needs; the history blobs other than browsing are never loaded
+SCORING_COLUMNS = (
+    Customer.customer_id, Customer.browsing_history, Customer.avg_order_value, Customer.location,
+)
+
+# Customers are located by city, catalog products by country
+CITY_COUNTRIES = {
+    "Bangalore": "India",
+    "Chennai": "India",
+    "Delhi": "India",
+    "Kolkata": "India",
+    "Mumbai": "India",
+}
+
+# Catalog season names by month (meteorological seasons)
+SEASONS_BY_MONTH = {
+    12: "Winter", 1: "Winter", 2: "Winter",
+    3: "Spring", 4: "Spring", 5: "Spring",
+    6: "Summer", 7: "Summer", 8: "Summer",
+    9: "Autumn", 10: "Autumn", 11: "Autumn",
+}
+
+def current_season(today: Optional[date] = None) -> str:
+    return SEASONS_BY_MONTH[(today or date.today()).month]
+
+def scoring_profile(row: Any, today: Optional[date] = None) -> Dict[str, Any]:
+    """The recommendation engine's keyword arguments for a customer row."""
+    browsing_history = row.browsing_history or {}
+    if isinstance(browsing_history, str):
+        browsing_history = json.loads(browsing_history)
+    return {
+        "categories": {category: 1.0 for category in browsing_history.get("categories", [])},
+        "budget": row.avg_order_value,
+        # A location that is already a country passes through unchanged
+        "location": CITY_COUNTRIES.get(row.location, row.location),
+        "season": current_season(today),
+    }
+
+def check_profile_vocabulary() -> List[str]:
+    """Profile values the loaded catalog doesn't know; those terms would never score."""
+    missing = [
+        f"geographical_location={country}" for country in sorted(set(CITY_COUNTRIES.values()))
+        if not recommendation_engine.knows("geographical_location", country)
+    ]
+    missing += [
+        f"season={season}" for season in sorted(set(SEASONS_BY_MONTH.values()))
+        if not recommendation_engine.knows("season", season)
+    ]
+    return missing
+
+# Newest catalog_products.updated_at the engine has seen, and when the table was last checked
+_catalog_state: Dict[str, Any] = {"loaded_through": None, "checked_at": 0.0}
+
+CATALOG_COLUMNS = (
+    CatalogProduct.product_id, CatalogProduct.brand, CatalogProduct.category, CatalogProduct.price,
+    CatalogProduct.average_rating, CatalogProduct.product_rating, CatalogProduct.review_sentiment_score,
+    CatalogProduct.probability_of_recommendation, CatalogProduct.season, CatalogProduct.geographical_location,
+    CatalogProduct.updated_at
+)
+
+def _newest(rows: Sequence[Any], current: Optional[datetime]) -> Optional[datetime]:
+    return max((row.updated_at for row in rows if row.updated_at is not None), default=current)
+
+async def ensure_catalog_loaded(db: AsyncSession) -> None:
+    """
+    Load the catalog into the in-memory engine on first use, then keep it current.
+
+    At most once per refresh interval, rows written since the last check (by
+    the init_db loader, which stamps every batch) are applied with
+    add_products instead of reloading the whole catalog.
+    """
+    if recommendation_engine.loaded:
+        now = time.monotonic()
+        if now - _catalog_state["checked_at"] < settings.CATALOG_REFRESH_INTERVAL_SECONDS:
+            return
+        _catalog_state["checked_at"] = now
+        query = select(*CATALOG_COLUMNS)
+        if _catalog_state["loaded_through"] is not None:
+            query = query.filter(CatalogProduct.updated_at > _catalog_state["loaded_through"])
+        rows = (await db.execute(query)).all()
+        if rows:
+            recommendation_engine.add_products(rows)
+            _catalog_state["loaded_through"] = _newest(rows, _catalog_state["loaded_through"])
+        return
+
+    rows = (await db.execute(select(*CATALOG_COLUMNS))).all()
+    recommendation_engine.load(rows)
+    _catalog_state["loaded_through"] = _newest(rows, None)
+    _catalog_state["checked_at"] = time.monotonic()
+    missing = check_profile_vocabulary()
+    if missing:
+        print(f"Warning: catalog has no products for profile values {', '.join(missing)}")
+
+def _score_chunk(customer_ids: Sequence[str], rows: Dict[str, Any], k: int) -> List[Dict[str, Any]]:
+    found = [customer_id for customer_id in customer_ids if customer_id in rows]
+    ranked = dict(zip(found, recommendation_engine.top_k_batch(
+        [scoring_profile(rows[customer_id]) for customer_id in found], k=k
+    )))
+    return [
+        {"customer_id": customer_id, "recommendations": ranked[customer_id]}
+        if customer_id in ranked else
+        {"customer_id": customer_id, "error": "Customer not found"}
+        for customer_id in customer_ids
+    ]
+
+async def score_customers(
+    db: AsyncSession, customer_ids: Sequence[str], k: int, chunk_size: Optional[int] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Top-k recommendations for many customers, yielded in request order.
+
+    Customers are handled a chunk at a time: one query loads the chunk's
+    profiles and one matrix pass scores them, which bounds both the SQL
+    parameter count and the score matrix size.
+    """
+    chunk_size = chunk_size or settings.BATCH_SCORING_CHUNK_SIZE
+    await ensure_catalog_loaded(db)
+    for start in range(0, len(customer_ids), chunk_size):
+        chunk = [str(customer_id) for customer_id in customer_ids[start:start + chunk_size]]
+        result = await db.execute(select(*SCORING_COLUMNS).filter(Customer.customer_id.in_(chunk)))
+        rows = {row.customer_id: row for row in result.all()}
+        for item in _score_chunk(chunk, rows, k):
+            yield item
+
+async def score_all_customers(
+    db: AsyncSession, k: int, chunk_size: Optional[int] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """Top-k recommendations for every customer, streamed from a single query."""
+    chunk_size = chunk_size or settings.BATCH_SCORING_CHUNK_SIZE
+    await ensure_catalog_loaded(db)
+    result = await db.stream(select(*SCORING_COLUMNS).order_by(Customer.id))
+    async for partition in result.partitions(chunk_size):
+        rows = {row.customer_id: row for row in partition}
+        for item in _score_chunk(list(rows), rows, k):
+            yield item
+
+def ndjson_line(item: Dict[str, Any]) -> str:
+    return json.dumps(item) + "\n"
+
+async def write_ndjson(items: AsyncIterator[Dict[str, Any]], output) -> int:
+    count = 0
+    async for item in items:
+        output.write(ndjson_line(item))
+        count += 1
+    return count
+
+async def write_parquet(items: AsyncIterator[Dict[str, Any]], path: str, chunk_size: int) -> int:
+    """One row per (customer, rank); written a row group at a time so memory stays bounded."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise SystemExit("Parquet output needs pyarrow: pip install pyarrow")
+
+    schema = pa.schema([
+        ("customer_id", pa.string()), ("rank", pa.int32()), ("product_id", pa.string()),
+        ("brand", pa.string()), ("category", pa.string()), ("price", pa.float64()), ("match_score", pa.float64()),
+    ])
+    count = 0
+    rows: List[Dict[str, Any]] = []
+    with pq.ParquetWriter(path, schema) as writer:
+        async for item in items:
+            count += 1
+            for rank, rec in enumerate(item.get("recommendations", []), start=1):
+                rows.append(dict(rec, customer_id=item["customer_id"], rank=rank))
+            if count % chunk_size == 0 and rows:
+                writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+                rows = []
+        if rows:
+            writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+    return count
+
+async def run(
+    customer_ids: Optional[List[str]], k: int, output_format: str, output_path: Optional[str], chunk_size: int
+) -> None:
+    async with async_session() as db:
+        if customer_ids is None:
+            items = score_all_customers(db, k, chunk_size)
+        else:
+            items = score_customers(db, customer_ids, k, chunk_size)
+
+        if output_format == "parquet":
+            count = await write_parquet(items, output_path, chunk_size)
+        elif output_path:
+            with open(output_path, "w") as output:
+                count = await write_ndjson(items, output)
+        else:
+            count = await write_ndjson(items, sys.stdout)
+    print(f"Scored {count} customers", file=sys.stderr)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score catalog recommendations for many customers.")
+    parser.add_argument("--customers", help="File with one customer_id per line (default: every customer)")
+    parser.add_argument("--k", type=int, default=10, help="Recommendations per customer")
+    parser.add_argument("--format", choices=("ndjson", "parquet"), default="ndjson")
+    parser.add_argument("--output", help="Output file (NDJSON defaults to stdout)")
+    parser.add_argument("--chunk-size", type=int, default=settings.BATCH_SCORING_CHUNK_SIZE,
+                        help="Customers scored per matrix pass")
+    args = parser.parse_args()
+    if args.format == "parquet" and not args.output:
+        parser.error("--output is required for parquet")
+
+    customer_ids = None
+    if args.customers:
+        with open(args.customers) as f:
+            customer_ids = [line.strip() for line in f if line.strip()]
+    asyncio.run(run(customer_ids, args.k, args.format, args.output, args.chunk_size))
@@ -0,0 +1,81 @@
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import case, func, literal
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from backend.app.core.config import settings
+from backend.app.models.models import Product, Behavior
+
+class CandidateGenerator:
+    """Narrow the catalog to a bounded top-N before it is handed to the LLM."""
+
+    # Relative weight of each ranking signal
+    CATEGORY_WEIGHT = 0.5
+    PRICE_WEIGHT = 0.2
+    QUALITY_WEIGHT = 0.3
+
+    # Products priced within this factor of the user's typical price are "in band"
+    PRICE_BAND = 0.5
+
+    def __init__(self, limit: Optional[int] = None):
+        self.limit = limit or settings.RECOMMENDATION_CANDIDATE_LIMIT
+
+    async def select_candidates(self, db: AsyncSession, user_id: int, limit: Optional[int] = None) -> List[Product]:
+        """Return the top-N products for a user, ranked entirely in SQL."""
+        affinity, typical_price = await self._user_signals(db, user_id)
+        score = self._score_expression(affinity, typical_price)
+        query = select(Product).order_by(score.desc(), Product.id).limit(limit or self.limit)
+        result = await db.execute(query)
+        return result.scalars().all()
+
+    async def _user_signals(self, db: AsyncSession, user_id: int) -> Tuple[Dict[str, float], Optional[float]]:
+        """Aggregate category affinity and typical price from the user's behaviors."""
+        query = select(
+            Product.category,
+            func.count(Behavior.id),
+            func.avg(Product.price)
+        ).join(Product, Behavior.product_id == Product.id).filter(
+            Behavior.user_id == user_id
+        ).group_by(Product.category)
+        result = await db.execute(query)
+        rows = result.all()
+
+        affinity = {}
+        total_count = 0
+        total_price = 0.0
+        for category, count, avg_price in rows:
+            total_count += count
+            total_price += (avg_price or 0.0) * count
+            if category:
+                affinity[category] = count
+
+        if affinity:
+            top = max(affinity.values())
+            affinity = {category: count / top for category, count in affinity.items()}
+        typical_price = total_price / total_count if total_count else None
+        return affinity, typical_price
+
+    def _score_expression(self, affinity: Dict[str, float], typical_price: Optional[float]) -> Any:
+        """Build the SQL ranking expression from the user's signals."""
+        if affinity:
+            category_score = case(affinity, value=Product.category, else_=0.0)
+        else:
+            category_score = literal(0.0)
+
+        if typical_price:
+            low = typical_price * (1 - self.PRICE_BAND)
+            high = typical_price * (1 + self.PRICE_BAND)
+            price_score = case((Product.price.between(low, high), 1.0), else_=0.0)
+        else:
+            price_score = literal(0.0)
+
+        quality_score = (
+            func.coalesce(Product.probability_of_recommendation, 0.5) * 0.5
+            + func.coalesce(Product.average_rating, 2.5) / 5.0 * 0.5
+        )
+
+        return (
+            category_score * self.CATEGORY_WEIGHT
+            + price_score * self.PRICE_WEIGHT
+            + quality_score * self.QUALITY_WEIGHT
+        )
@@ -0,0 +1,133 @@
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Dict, List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from backend.app.models.models import Customer, CustomerInteraction
+from backend.app.schemas.customer import CustomerProfile
+from backend.app.core.config import settings
+from backend.app.core.metrics import metrics
+
+# Only these columns are read; the history blobs are never loaded
+PROFILE_COLUMNS = (
+    Customer.customer_id, Customer.age, Customer.gender, Customer.location,
+    Customer.customer_segment, Customer.avg_order_value, Customer.current_mood,
+    Customer.browsing_history, Customer.purchase_count, Customer.persona_traits,
+)
+
+async def load_recent_purchases(db: AsyncSession, customer_id: str, limit: int) -> List[Dict[str, Any]]:
+    """Newest purchases from the interaction log, via its (customer_id, ts) index."""
+    result = await db.execute(select(
+        CustomerInteraction.product_id, CustomerInteraction.price, CustomerInteraction.ts
+    ).filter(
+        CustomerInteraction.customer_id == customer_id,
+        CustomerInteraction.action_type == "purchase"
+    ).order_by(CustomerInteraction.ts.desc()).limit(limit))
+    rows = result.all()
+    return [
+        {"product_id": product_id, "price": price, "timestamp": ts.isoformat()}
+        for product_id, price, ts in rows
+    ]
+
+def build_profile(row: Any, recent_purchases: List[Dict[str, Any]]) -> CustomerProfile:
+    """Reduce a customer row to a fixed-size snapshot."""
+    browsing = row.browsing_history or {}
+    categories = browsing.get("categories", []) if isinstance(browsing, dict) else list(browsing)
+    # Most frequent first; ties keep the most recently added category first
+    counts = Counter(categories)
+    recency = {category: i for i, category in enumerate(categories)}
+    top_categories = sorted(counts, key=lambda c: (-counts[c], -recency[c]))
+
+    return CustomerProfile(
+        customer_id=row.customer_id,
+        age=row.age,
+        gender=row.gender,
+        location=row.location,
+        customer_segment=row.customer_segment,
+        avg_order_value=row.avg_order_value,
+        current_mood=row.current_mood,
+        top_categories=top_categories[:settings.CUSTOMER_PROFILE_TOP_CATEGORIES],
+        recent_purchases=[
+            {key: value for key, value in purchase.items() if value is not None}
+            for purchase in recent_purchases
+        ],
+        purchase_count=row.purchase_count or 0,
+        persona_traits=[str(trait) for trait in (row.persona_traits or [])][:5],
+    )
+
+def render_profile(profile: CustomerProfile) -> str:
+    """Prompt-ready text for a snapshot; its size does not grow with history."""
+    purchases = ", ".join(
+        f"{p.get('product_id')} (${p['price']:.2f})" if isinstance(p.get("price"), (int, float)) else str(p.get("product_id"))
+        for p in profile.recent_purchases
+    ) or "none"
+    lines = [
+        "Customer Profile:",
+        f"- Age: {profile.age}",
+        f"- Gender: {profile.gender}",
+        f"- Location: {profile.location}",
+        f"- Customer Segment: {profile.customer_segment}",
+        f"- Average Order Value: {profile.avg_order_value}",
+        f"- Current Mood: {profile.current_mood or 'neutral'}",
+        f"- Top Categories: {', '.join(profile.top_categories) or 'none'}",
+        f"- Recent Purchases ({profile.purchase_count} total): {purchases}",
+    ]
+    if profile.persona_traits:
+        lines.append(f"- Persona Traits: {', '.join(profile.persona_traits)}")
+    return "\n".join(lines)
+
+class CustomerProfileCache:
+    """
+    In-memory LRU of customer profile snapshots.
+
+    Entries are dropped by invalidate() whenever the customer's behavior is
+    recorded, and also expire after a TTL as a safety net for writes that
+    bypass the API.
+    """
+
+    def __init__(
+        self,
+        max_size: int = settings.CUSTOMER_PROFILE_CACHE_MAX_SIZE,
+        ttl_seconds: float = settings.CUSTOMER_PROFILE_CACHE_TTL_SECONDS,
+    ):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        metrics.register_gauge("customer_profiles.entries", lambda: len(self._entries))
+
+    async def get(self, db: AsyncSession, customer_id: str) -> Optional[CustomerProfile]:
+        """Snapshot for a customer, loading it on a miss; None if the customer doesn't exist."""
+        with self._lock:
+            entry = self._entries.get(customer_id)
+            if entry is not None and entry[0] >= time.monotonic():
+                self._entries.move_to_end(customer_id)
+                metrics.incr("customer_profiles.hits")
+                return entry[1]
+
+        metrics.incr("customer_profiles.misses")
+        result = await db.execute(select(*PROFILE_COLUMNS).filter(Customer.customer_id == customer_id))
+        row = result.first()
+        if row is None:
+            return None
+        recent_purchases = await load_recent_purchases(db, customer_id, settings.CUSTOMER_PROFILE_RECENT_PURCHASES)
+        profile = build_profile(row, recent_purchases)
+        with self._lock:
+            self._entries[customer_id] = (time.monotonic() + self.ttl_seconds, profile)
+            self._entries.move_to_end(customer_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return profile
+
+    def invalidate(self, customer_id: str) -> None:
+        with self._lock:
+            self._entries.pop(customer_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+# Shared cache for the process
+customer_profiles = CustomerProfileCache()
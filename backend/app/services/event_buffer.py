@@ -0,0 +1,138 @@
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from sqlalchemy import insert
+
+from backend.app.core.config import settings
+from backend.app.core.metrics import metrics
+from backend.app.models.models import Behavior
+from backend.app.services.realtime import update_hub
+from backend.app.services.rollups import record_behaviors
+from backend.database.database import write_engine
+
+class BehaviorEventBuffer:
+    """
+    Accept behavior events without touching the database on the request path.
+
+    Events are queued in memory and written to the behaviors table in batches
+    by a background task, when either the batch size or the flush interval
+    is reached. The queue is bounded: when it is full, record() waits briefly
+    and then drops the event rather than stalling the request.
+    """
+
+    def __init__(
+        self,
+        max_size: int = settings.BEHAVIOR_BUFFER_MAX_SIZE,
+        batch_size: int = settings.BEHAVIOR_BUFFER_BATCH_SIZE,
+        flush_interval: float = settings.BEHAVIOR_BUFFER_FLUSH_INTERVAL_SECONDS,
+        put_timeout: float = settings.BEHAVIOR_BUFFER_PUT_TIMEOUT_SECONDS,
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_size)
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        metrics.register_gauge("behavior_events.queue_depth", self._queue.qsize)
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def record(
+        self,
+        user_id: int,
+        product_id: int,
+        action_type: str,
+        context: Optional[Dict[str, Any]] = None,
+    ) -> bool:
+        """Queue an event; returns False if it was dropped under backpressure."""
+        event = {
+            "user_id": user_id,
+            "product_id": product_id,
+            "action_type": action_type,
+            "context": context,
+            "created_at": datetime.utcnow(),
+        }
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            try:
+                await asyncio.wait_for(self._queue.put(event), timeout=self.put_timeout)
+            except asyncio.TimeoutError:
+                metrics.incr("behavior_events.dropped")
+                return False
+        metrics.incr("behavior_events.accepted")
+        return True
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._stopping = False
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background task after flushing every queued event."""
+        self._stopping = True
+        if self._task is not None:
+            await self._task
+            self._task = None
+        # Anything recorded after the loop exited
+        while not self._queue.empty():
+            await self._flush(self._drain(self.batch_size))
+
+    async def _run(self) -> None:
+        while not (self._stopping and self._queue.empty()):
+            batch = await self._next_batch()
+            if batch:
+                await self._flush(batch)
+
+    async def _next_batch(self) -> List[Dict[str, Any]]:
+        try:
+            first = await asyncio.wait_for(self._queue.get(), timeout=self.flush_interval)
+        except asyncio.TimeoutError:
+            return []
+        batch = [first]
+        deadline = asyncio.get_running_loop().time() + self.flush_interval
+        while len(batch) < self.batch_size and not self._stopping:
+            batch.extend(self._drain(self.batch_size - len(batch)))
+            remaining = deadline - asyncio.get_running_loop().time()
+            if len(batch) >= self.batch_size or remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        batch.extend(self._drain(self.batch_size - len(batch)))
+        return batch
+
+    def _drain(self, limit: int) -> List[Dict[str, Any]]:
+        events = []
+        while len(events) < limit:
+            try:
+                events.append(self._queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        return events
+
+    async def _flush(self, batch: List[Dict[str, Any]]) -> None:
+        if not batch:
+            return
+        try:
+            async with write_engine.begin() as conn:
+                await conn.execute(insert(Behavior.__table__), batch)
+                # Rollups commit with the raw rows so they never drift apart
+                await record_behaviors(conn, batch)
+            metrics.incr("behavior_events.flushed", len(batch))
+            metrics.incr("behavior_events.batches")
+        except Exception as e:
+            metrics.incr("behavior_events.flush_errors")
+            print(f"Error flushing behavior events: {str(e)}")
+            return
+        try:
+            await update_hub.publish_behaviors(batch)
+        except Exception as e:
+            print(f"Error publishing behavior updates: {str(e)}")
+
+# Shared buffer for the process
+behavior_buffer = BehaviorEventBuffer()
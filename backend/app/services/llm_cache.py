@@ -0,0 +1,181 @@
+import hashlib
+import json
+from abc import ABC, abstractmethod
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from backend.app.core.config import settings
+from backend.app.core.metrics import metrics
+
+class LLMCacheBackend(ABC):
+    """Storage interface for cached LLM responses."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        """The cached response, or None when missing or expired."""
+
+    @abstractmethod
+    def set(self, key: str, value: str) -> None:
+        """Store a response under the key."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Drop every entry."""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Number of stored entries."""
+
+class InMemoryLLMCache(LLMCacheBackend):
+    """LRU cache with per-entry TTL, held in process memory."""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class SQLiteLLMCache(LLMCacheBackend):
+    """LRU cache with per-entry TTL, persisted to a SQLite file shared across restarts."""
+
+    def __init__(self, path: str, max_entries: int = 10000, ttl_seconds: float = 86400):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_llm_cache_accessed_at ON llm_cache (accessed_at)")
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at < now:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                return None
+            self._conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, now + self.ttl_seconds, now)
+            )
+            # Evict expired entries, then least recently used ones beyond capacity
+            self._conn.execute("DELETE FROM llm_cache WHERE expires_at < ?", (now,))
+            self._conn.execute(
+                "DELETE FROM llm_cache WHERE key IN ("
+                "SELECT key FROM llm_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+class LLMResponseCache:
+    """Cache LLM responses keyed by model name plus a hash of the normalized prompt and generation config."""
+
+    def __init__(self, backend: LLMCacheBackend, name: str = "llm_cache"):
+        self.backend = backend
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        metrics.register_gauge(f"{name}.entries", lambda: len(self.backend))
+
+    @staticmethod
+    def normalize_prompt(prompt: str) -> str:
+        # Prompts are built from indented f-strings; whitespace carries no meaning
+        return " ".join(prompt.split())
+
+    @classmethod
+    def make_key(cls, model_name: str, prompt: str, generation_config: Optional[Dict[str, Any]] = None) -> str:
+        digest = hashlib.sha256(cls.normalize_prompt(prompt).encode("utf-8"))
+        if generation_config:
+            # The same prompt in JSON mode (or with a schema) is a different request
+            digest.update(json.dumps(generation_config, sort_keys=True).encode("utf-8"))
+        return f"{model_name}:{digest.hexdigest()}"
+
+    def get(self, model_name: str, prompt: str, generation_config: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        value = self.backend.get(self.make_key(model_name, prompt, generation_config))
+        if value is None:
+            self.misses += 1
+            metrics.incr(f"{self.name}.misses")
+        else:
+            self.hits += 1
+            metrics.incr(f"{self.name}.hits")
+        return value
+
+    def set(
+        self, model_name: str, prompt: str, value: str, generation_config: Optional[Dict[str, Any]] = None
+    ) -> None:
+        self.backend.set(self.make_key(model_name, prompt, generation_config), value)
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self.backend)}
+
+def create_llm_cache() -> LLMResponseCache:
+    """Build the response cache for the backend selected in settings."""
+    if settings.LLM_CACHE_BACKEND == "sqlite":
+        backend = SQLiteLLMCache(
+            settings.LLM_CACHE_PATH,
+            max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.LLM_CACHE_TTL_SECONDS
+        )
+    elif settings.LLM_CACHE_BACKEND == "memory":
+        backend = InMemoryLLMCache(
+            max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.LLM_CACHE_TTL_SECONDS
+        )
+    else:
+        raise ValueError(f"Unknown LLM cache backend: {settings.LLM_CACHE_BACKEND}")
+    return LLMResponseCache(backend)
+
+# Shared response cache for the process
+llm_cache = create_llm_cache()
@@ -0,0 +1,160 @@
+import asyncio
+import dataclasses
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Dict, Optional
+import google.generativeai as genai
+
+from backend.app.core.config import settings
+from backend.app.core.metrics import metrics
+from backend.app.services.llm_cache import llm_cache, LLMResponseCache
+
+# Shared across every client so the whole process respects one concurrency budget
+_semaphore: Optional[asyncio.Semaphore] = None
+_executor = ThreadPoolExecutor(
+    max_workers=settings.LLM_MAX_CONCURRENCY, thread_name_prefix="llm"
+)
+
+def _get_semaphore() -> asyncio.Semaphore:
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(settings.LLM_MAX_CONCURRENCY)
+    return _semaphore
+
+def _json_generation_config(response_schema: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+    """
+    JSON output mode, with the response schema where the SDK supports one.
+
+    The pinned google-generativeai 0.3.1 GenerationConfig has neither
+    response_mime_type nor response_schema, so there JSON mode is only the
+    prompt's instructions and callers must still parse defensively.
+    """
+    fields = {field.name for field in dataclasses.fields(genai.types.GenerationConfig)}
+    if "response_mime_type" not in fields:
+        return None
+    config: Dict[str, Any] = {"response_mime_type": "application/json"}
+    if response_schema is not None and "response_schema" in fields:
+        config["response_schema"] = response_schema
+    return config
+
+class AsyncLLMClient:
+    """Non-blocking access to a Gemini model with caching, bounded concurrency and timeouts."""
+
+    def __init__(self, model_name: str, cache: Optional[LLMResponseCache] = llm_cache):
+        self.model = genai.GenerativeModel(model_name)
+        self.cache = cache
+
+    @property
+    def model_name(self) -> str:
+        return self.model.model_name
+
+    async def generate(
+        self,
+        prompt: str,
+        timeout: Optional[float] = None,
+        use_cache: bool = True,
+        json_mode: bool = False,
+        response_schema: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """
+        Return the response text for a prompt.
+
+        Cancelling the awaiting task or hitting the timeout stops waiting and
+        raises (asyncio.TimeoutError on timeout). With the SDK's async call the
+        upstream request is cancelled too; on older SDKs the blocking call
+        keeps running to completion in the executor thread, whose pool size
+        still caps how many run at once.
+        """
+        generation_config = _json_generation_config(response_schema) if json_mode else None
+        if use_cache and self.cache is not None:
+            cached = self.cache.get(self.model_name, prompt, generation_config)
+            if cached is not None:
+                return cached
+
+        async with _get_semaphore():
+            metrics.incr("llm.requests")
+            try:
+                response = await asyncio.wait_for(
+                    self._generate_content(prompt, generation_config),
+                    timeout=timeout or settings.LLM_TIMEOUT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                metrics.incr("llm.timeouts")
+                raise
+        text = response.text
+
+        if use_cache and self.cache is not None:
+            self.cache.set(self.model_name, prompt, text, generation_config)
+        return text
+
+    async def stream(
+        self,
+        prompt: str,
+        timeout: Optional[float] = None,
+        use_cache: bool = True,
+        json_mode: bool = False,
+        response_schema: Optional[Dict[str, Any]] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Yield the response text in chunks as the model produces them.
+
+        The timeout bounds the whole response. A cached response is yielded
+        as a single chunk; a completed stream is cached like generate().
+        """
+        generation_config = _json_generation_config(response_schema) if json_mode else None
+        if use_cache and self.cache is not None:
+            cached = self.cache.get(self.model_name, prompt, generation_config)
+            if cached is not None:
+                yield cached
+                return
+
+        if not hasattr(self.model, "generate_content_async"):
+            yield await self.generate(
+                prompt, timeout=timeout, use_cache=use_cache, json_mode=json_mode, response_schema=response_schema
+            )
+            return
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + (timeout or settings.LLM_TIMEOUT_SECONDS)
+        chunks = []
+        async with _get_semaphore():
+            metrics.incr("llm.requests")
+            try:
+                response = await asyncio.wait_for(
+                    self.model.generate_content_async(
+                        prompt, generation_config=generation_config, stream=True
+                    ),
+                    timeout=deadline - loop.time()
+                )
+                iterator = response.__aiter__()
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(iterator.__anext__(), timeout=deadline - loop.time())
+                    except StopAsyncIteration:
+                        break
+                    chunks.append(chunk.text)
+                    yield chunk.text
+            except asyncio.TimeoutError:
+                metrics.incr("llm.timeouts")
+                raise
+
+        if use_cache and self.cache is not None:
+            self.cache.set(self.model_name, prompt, "".join(chunks), generation_config)
+
+    async def _generate_content(self, prompt: str, generation_config: Optional[Dict[str, Any]] = None):
+        if hasattr(self.model, "generate_content_async"):
+            return await self.model.generate_content_async(prompt, generation_config=generation_config)
+        # Older SDKs only expose the blocking call; keep it off the event loop
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            _executor, lambda: self.model.generate_content(prompt, generation_config=generation_config)
+        )
+
+_clients: Dict[str, AsyncLLMClient] = {}
+
+def get_llm_client(model_name: str) -> AsyncLLMClient:
+    """Return the shared client for a model, creating it on first use."""
+    client = _clients.get(model_name)
+    if client is None:
+        client = AsyncLLMClient(model_name)
+        _clients[model_name] = client
+    return client
@@ -0,0 +1,201 @@
+import argparse
+import asyncio
+import multiprocessing
+import os
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from sqlalchemy import delete, insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from backend.app.core.config import settings
+from backend.app.models.models import CatalogRecommendationRun, CatalogRecommendationStaging, Customer
+from backend.app.services.batch_scoring import SCORING_COLUMNS, ensure_catalog_loaded, scoring_profile
+from backend.app.services.recommendation_engine import RecommendationEngine, recommendation_engine
+from backend.database.database import async_session, init_db, write_engine
+
+class SharedCatalog:
+    """
+    The engine's feature columns packed into two shared memory blocks.
+
+    Numeric columns form one float64 (columns x products) matrix and the
+    categorical codes one int32 matrix. Workers attach by name and score
+    against views of the blocks, so the catalog exists once in memory no
+    matter how many processes use it.
+    """
+
+    def __init__(self, spec: Dict[str, Any], blocks: Sequence[shared_memory.SharedMemory]):
+        self.spec = spec
+        self._blocks = list(blocks)
+
+    @classmethod
+    def create(cls, engine: RecommendationEngine) -> "SharedCatalog":
+        numeric, codes = engine.columns()
+        blocks = []
+        spec = {"metadata": engine.metadata()}
+        for key, columns, dtype in (("numeric", numeric, np.float64), ("codes", codes, np.int32)):
+            names = list(columns)
+            shape = (len(names), len(engine))
+            block = shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize))
+            matrix = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+            for row, name in enumerate(names):
+                matrix[row] = columns[name]
+            blocks.append(block)
+            spec[key] = {"name": block.name, "columns": names, "shape": shape, "dtype": np.dtype(dtype).str}
+        return cls(spec, blocks)
+
+    @classmethod
+    def attach(cls, spec: Dict[str, Any]) -> Tuple["SharedCatalog", RecommendationEngine]:
+        blocks, views = [], {}
+        for key in ("numeric", "codes"):
+            # Spawned workers report to the parent's resource tracker, so the parent's unlink covers them
+            block = shared_memory.SharedMemory(name=spec[key]["name"])
+            matrix = np.ndarray(tuple(spec[key]["shape"]), dtype=np.dtype(spec[key]["dtype"]), buffer=block.buf)
+            views[key] = {name: matrix[row] for row, name in enumerate(spec[key]["columns"])}
+            blocks.append(block)
+        engine = RecommendationEngine.from_columns(views["numeric"], views["codes"], spec["metadata"])
+        return cls(spec, blocks), engine
+
+    def close(self) -> None:
+        for block in self._blocks:
+            block.close()
+
+    def unlink(self) -> None:
+        for block in self._blocks:
+            block.unlink()
+
+# Per-worker state, set up once by the pool initializer
+_worker: Dict[str, Any] = {}
+
+def _init_worker(spec: Dict[str, Any]) -> None:
+    catalog, engine = SharedCatalog.attach(spec)
+    _worker["catalog"] = catalog
+    _worker["engine"] = engine
+    _worker["loop"] = asyncio.new_event_loop()
+
+async def _write_rows(rows: List[Dict[str, Any]]) -> None:
+    async with write_engine.begin() as conn:
+        await conn.execute(insert(CatalogRecommendationStaging), rows)
+
+def _score_and_write(run_id: str, customer_ids: Sequence[str], profiles: Sequence[Dict[str, Any]], k: int) -> int:
+    """Worker task: score a slice of customers and bulk insert their top-k rows."""
+    engine: RecommendationEngine = _worker["engine"]
+    created_at = datetime.utcnow()
+    rows = []
+    chunk_size = settings.BATCH_SCORING_CHUNK_SIZE
+    for start in range(0, len(profiles), chunk_size):
+        ranked = engine.top_k_batch(profiles[start:start + chunk_size], k=k)
+        for customer_id, recommendations in zip(customer_ids[start:start + chunk_size], ranked):
+            rows.extend(
+                {
+                    "run_id": run_id,
+                    "customer_id": customer_id,
+                    "rank": rank,
+                    "product_id": rec["product_id"],
+                    "score": rec["match_score"],
+                    "created_at": created_at,
+                }
+                for rank, rec in enumerate(recommendations, start=1)
+            )
+    if rows:
+        _worker["loop"].run_until_complete(_write_rows(rows))
+    return len(customer_ids)
+
+def latest_run_id():
+    """Subquery for the newest completed run; staging rows of any other run are never read."""
+    return select(CatalogRecommendationRun.run_id).filter(
+        CatalogRecommendationRun.completed_at.isnot(None)
+    ).order_by(CatalogRecommendationRun.completed_at.desc()).limit(1).scalar_subquery()
+
+async def load_precomputed(db: AsyncSession, customer_id: str) -> List[Any]:
+    """A customer's rows from the latest completed run, best first."""
+    result = await db.execute(select(
+        CatalogRecommendationStaging.product_id, CatalogRecommendationStaging.score
+    ).filter(
+        CatalogRecommendationStaging.run_id == latest_run_id(),
+        CatalogRecommendationStaging.customer_id == customer_id
+    ).order_by(CatalogRecommendationStaging.rank))
+    return result.all()
+
+async def precompute(k: int, workers: Optional[int] = None, slice_size: Optional[int] = None) -> str:
+    """
+    Precompute top-k catalog recommendations for every customer.
+
+    The parent streams customer profiles and hands slices to a process pool;
+    at most two slices per worker are queued so memory stays bounded. The run
+    is recorded in catalog_recommendation_runs and marked completed only after
+    every slice is written, and readers select by the latest completed run.
+    A failed run deletes its own rows; a completed one deletes every other run.
+    """
+    workers = workers or settings.PRECOMPUTE_WORKERS or os.cpu_count() or 1
+    slice_size = slice_size or settings.PRECOMPUTE_SLICE_SIZE
+    run_id = uuid.uuid4().hex
+    started = time.perf_counter()
+
+    await init_db()
+    async with async_session() as db:
+        await ensure_catalog_loaded(db)
+    async with write_engine.begin() as conn:
+        await conn.execute(insert(CatalogRecommendationRun).values(run_id=run_id, k=k, started_at=datetime.utcnow()))
+    catalog = SharedCatalog.create(recommendation_engine)
+
+    # Spawned workers start clean instead of inheriting the parent's database connections
+    context = multiprocessing.get_context("spawn")
+    loop = asyncio.get_running_loop()
+    in_flight = asyncio.Semaphore(workers * 2)
+    customers = 0
+    completed = False
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                 initializer=_init_worker, initargs=(catalog.spec,)) as pool:
+            async def submit(customer_ids: List[str], profiles: List[Dict[str, Any]]) -> int:
+                try:
+                    return await loop.run_in_executor(pool, _score_and_write, run_id, customer_ids, profiles, k)
+                finally:
+                    in_flight.release()
+
+            tasks = []
+            async with async_session() as db:
+                result = await db.stream(select(*SCORING_COLUMNS).order_by(Customer.id))
+                async for partition in result.partitions(slice_size):
+                    await in_flight.acquire()
+                    tasks.append(asyncio.ensure_future(submit(
+                        [row.customer_id for row in partition],
+                        [scoring_profile(row) for row in partition]
+                    )))
+            customers = sum(await asyncio.gather(*tasks))
+
+        # Publishing the run and dropping the others is one transaction
+        async with write_engine.begin() as conn:
+            await conn.execute(update(CatalogRecommendationRun).where(
+                CatalogRecommendationRun.run_id == run_id
+            ).values(completed_at=datetime.utcnow(), customers=customers))
+            await conn.execute(delete(CatalogRecommendationStaging).where(CatalogRecommendationStaging.run_id != run_id))
+            await conn.execute(delete(CatalogRecommendationRun).where(CatalogRecommendationRun.run_id != run_id))
+        completed = True
+    finally:
+        catalog.close()
+        catalog.unlink()
+        if not completed:
+            async with write_engine.begin() as conn:
+                await conn.execute(delete(CatalogRecommendationStaging).where(CatalogRecommendationStaging.run_id == run_id))
+                await conn.execute(delete(CatalogRecommendationRun).where(CatalogRecommendationRun.run_id == run_id))
+
+    elapsed = time.perf_counter() - started
+    print(f"Precomputed {customers} customers with {workers} workers in {elapsed:.1f}s "
+          f"({customers / elapsed:.0f} customers/s), run {run_id}")
+    return run_id
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute catalog recommendations for every customer.")
+    parser.add_argument("--k", type=int, default=10, help="Recommendations per customer")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: one per core)")
+    parser.add_argument("--slice-size", type=int, default=settings.PRECOMPUTE_SLICE_SIZE,
+                        help="Customers per worker task")
+    args = parser.parse_args()
+    asyncio.run(precompute(k=args.k, workers=args.workers, slice_size=args.slice_size))
@@ -0,0 +1,100 @@
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set
+from sqlalchemy.future import select
+
+from backend.app.core.config import settings
+from backend.app.core.metrics import metrics
+from backend.app.models.models import Product
+from backend.app.schemas.schemas import Update
+from backend.database.database import async_session
+
+class Subscription:
+    """One connected client's bounded queue of pending updates."""
+
+    def __init__(self, user_id: int, max_queue_size: int):
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self.overflowed = False
+
+    async def get(self) -> Optional[Dict[str, Any]]:
+        """Next update, or None once the subscription was dropped as a slow consumer."""
+        return await self.queue.get()
+
+class UpdateHub:
+    """
+    In-process pub/sub for per-user realtime updates.
+
+    Writers publish once and every subscribed connection of that user gets the
+    update pushed to its own bounded queue. A connection that lets its queue
+    fill up is dropped instead of holding back publishers or growing memory.
+    """
+
+    def __init__(self, max_queue_size: int = settings.REALTIME_QUEUE_SIZE):
+        self.max_queue_size = max_queue_size
+        self._subscribers: Dict[int, Set[Subscription]] = {}
+        metrics.register_gauge("realtime.subscribers", self.subscriber_count)
+
+    def subscriber_count(self) -> int:
+        return sum(len(subs) for subs in self._subscribers.values())
+
+    def has_subscribers(self, user_id: int) -> bool:
+        return bool(self._subscribers.get(user_id))
+
+    def subscribe(self, user_id: int) -> Subscription:
+        subscription = Subscription(user_id, self.max_queue_size)
+        self._subscribers.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subs = self._subscribers.get(subscription.user_id)
+        if subs is None:
+            return
+        subs.discard(subscription)
+        if not subs:
+            del self._subscribers[subscription.user_id]
+
+    def publish(self, user_id: int, message: str, update_type: str = "info", timestamp: Optional[datetime] = None) -> None:
+        subs = self._subscribers.get(user_id)
+        if not subs:
+            return
+        update = Update(message=message, type=update_type, timestamp=timestamp or datetime.utcnow()).model_dump(mode="json")
+        for subscription in list(subs):
+            try:
+                subscription.queue.put_nowait(update)
+                metrics.incr("realtime.published")
+            except asyncio.QueueFull:
+                self._drop(subscription)
+
+    def _drop(self, subscription: Subscription) -> None:
+        subscription.overflowed = True
+        self.unsubscribe(subscription)
+        # Replace the backlog with the end-of-stream marker
+        while not subscription.queue.empty():
+            subscription.queue.get_nowait()
+        subscription.queue.put_nowait(None)
+        metrics.incr("realtime.slow_consumers_dropped")
+
+    async def publish_behaviors(self, events: Iterable[Dict[str, Any]]) -> None:
+        """Push activity updates for newly written behavior rows."""
+        events = [e for e in events if self.has_subscribers(e["user_id"])]
+        if not events:
+            return
+        # One lookup per batch, regardless of how many clients are connected
+        product_ids = {e["product_id"] for e in events}
+        async with async_session() as db:
+            result = await db.execute(select(Product.id, Product.name).where(Product.id.in_(product_ids)))
+            names = dict(result.all())
+        for event in events:
+            self.publish(
+                event["user_id"],
+                f"New activity: {event['action_type']} on {names.get(event['product_id'], 'a product')}",
+                timestamp=event.get("created_at")
+            )
+
+    def publish_recommendations(self, user_id: int, product_names: List[str]) -> None:
+        for name in product_names:
+            self.publish(user_id, f"New recommendation: {name}")
+
+# Shared hub for the process
+update_hub = UpdateHub()
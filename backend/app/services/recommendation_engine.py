@@ -0,0 +1,300 @@
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+
+class RecommendationEngine:
+    """
+    In-memory, columnar product catalog scored with NumPy.
+
+    Numeric product attributes are held as float arrays. Category, season and
+    location are stored as integer codes into a vocabulary; gathering a
+    per-code weight vector with them is the same as a dot product against
+    their one-hot encoding, without materializing the one-hot matrix.
+    """
+
+    NUMERIC_COLUMNS = (
+        "price",
+        "average_rating",
+        "product_rating",
+        "review_sentiment_score",
+        "probability_of_recommendation",
+    )
+    CATEGORICAL_COLUMNS = ("category", "season", "geographical_location")
+
+    # Relative weight of each signal in the final match score (sums to 1)
+    WEIGHTS = {
+        "category": 0.35,
+        "price": 0.2,
+        "season": 0.05,
+        "location": 0.05,
+        "quality": 0.35,
+    }
+
+    def __init__(self, initial_capacity: int = 1024):
+        self._lock = threading.Lock()
+        self._initial_capacity = initial_capacity
+        self._reset()
+
+    def _reset(self) -> None:
+        capacity = self._initial_capacity
+        self._size = 0
+        self._numeric = {name: np.zeros(capacity, dtype=np.float64) for name in self.NUMERIC_COLUMNS}
+        self._codes = {name: np.zeros(capacity, dtype=np.int32) for name in self.CATEGORICAL_COLUMNS}
+        self._vocab: Dict[str, Dict[str, int]] = {name: {} for name in self.CATEGORICAL_COLUMNS}
+        self._product_ids: List[str] = []
+        self._brands: List[str] = []
+        self._categories: List[str] = []
+        self._row_by_id: Dict[str, int] = {}
+
+    @property
+    def loaded(self) -> bool:
+        return self._size > 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def load(self, products: Iterable[Any]) -> None:
+        """Replace the catalog with the given product rows."""
+        with self._lock:
+            self._reset()
+            self._append(list(products))
+
+    def add_products(self, products: Iterable[Any]) -> None:
+        """Append or update products without rebuilding the catalog."""
+        with self._lock:
+            self._append(list(products))
+
+    def columns(self) -> Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray]]:
+        """The numeric and code columns, trimmed to the loaded rows."""
+        with self._lock:
+            n = self._size
+            return (
+                {name: column[:n] for name, column in self._numeric.items()},
+                {name: column[:n] for name, column in self._codes.items()},
+            )
+
+    def metadata(self) -> Dict[str, Any]:
+        """Everything besides the columns needed to rebuild the engine elsewhere."""
+        with self._lock:
+            return {
+                "vocab": self._vocab,
+                "product_ids": self._product_ids,
+                "brands": self._brands,
+                "categories": self._categories,
+            }
+
+    @classmethod
+    def from_columns(
+        cls, numeric: Dict[str, np.ndarray], codes: Dict[str, np.ndarray], metadata: Dict[str, Any]
+    ) -> "RecommendationEngine":
+        """A read-only engine over existing arrays, e.g. views of shared memory; nothing is copied."""
+        engine = cls(initial_capacity=0)
+        engine._numeric = numeric
+        engine._codes = codes
+        engine._vocab = metadata["vocab"]
+        engine._product_ids = metadata["product_ids"]
+        engine._brands = metadata["brands"]
+        engine._categories = metadata["categories"]
+        engine._row_by_id = {product_id: row for row, product_id in enumerate(engine._product_ids)}
+        engine._size = len(engine._product_ids)
+        return engine
+
+    def _append(self, products: Sequence[Any]) -> None:
+        new_rows = []
+        for product in products:
+            product_id = self._product_id(product)
+            row = self._row_by_id.get(product_id)
+            if row is None:
+                row = self._size + len(new_rows)
+                new_rows.append(product_id)
+                self._row_by_id[product_id] = row
+            self._ensure_capacity(row + 1)
+            self._write_row(row, product)
+        self._size += len(new_rows)
+
+    def _ensure_capacity(self, required: int) -> None:
+        capacity = len(self._numeric["price"])
+        if required <= capacity:
+            return
+        # Grow geometrically so appends stay amortized O(1)
+        new_capacity = max(required, capacity * 2)
+        for name, column in self._numeric.items():
+            grown = np.zeros(new_capacity, dtype=column.dtype)
+            grown[:capacity] = column
+            self._numeric[name] = grown
+        for name, column in self._codes.items():
+            grown = np.zeros(new_capacity, dtype=column.dtype)
+            grown[:capacity] = column
+            self._codes[name] = grown
+
+    def _write_row(self, row: int, product: Any) -> None:
+        for name in self.NUMERIC_COLUMNS:
+            value = getattr(product, name, None)
+            self._numeric[name][row] = float(value) if value is not None else np.nan
+        for name in self.CATEGORICAL_COLUMNS:
+            self._codes[name][row] = self._encode(name, getattr(product, name, None))
+
+        product_id = self._product_id(product)
+        brand = getattr(product, "brand", None) or getattr(product, "name", None) or ""
+        category = getattr(product, "category", None) or ""
+        if row < len(self._product_ids):
+            self._product_ids[row] = product_id
+            self._brands[row] = brand
+            self._categories[row] = category
+        else:
+            self._product_ids.append(product_id)
+            self._brands.append(brand)
+            self._categories.append(category)
+
+    def _encode(self, column: str, value: Optional[str]) -> int:
+        # Code 0 is reserved for missing values
+        if not value:
+            return 0
+        vocab = self._vocab[column]
+        code = vocab.get(value)
+        if code is None:
+            code = len(vocab) + 1
+            vocab[value] = code
+        return code
+
+    @staticmethod
+    def _product_id(product: Any) -> str:
+        product_id = getattr(product, "product_id", None)
+        if product_id is None:
+            product_id = getattr(product, "id")
+        return str(product_id)
+
+    def knows(self, column: str, value: str) -> bool:
+        """Whether any loaded product has this categorical value."""
+        return value in self._vocab[column]
+
+    def _weight_vector(self, column: str, preferred: Dict[str, float]) -> np.ndarray:
+        vocab = self._vocab[column]
+        weights = np.zeros(len(vocab) + 1, dtype=np.float64)
+        for value, weight in preferred.items():
+            code = vocab.get(value)
+            if code is not None:
+                weights[code] = weight
+        return weights
+
+    def score(
+        self,
+        categories: Optional[Dict[str, float]] = None,
+        budget: Optional[float] = None,
+        season: Optional[str] = None,
+        location: Optional[str] = None,
+    ) -> np.ndarray:
+        """Compute a match score in [0, 1] for every product in one vectorized pass."""
+        profile = {"categories": categories, "budget": budget, "season": season, "location": location}
+        return self.score_batch([profile])[0]
+
+    def score_batch(self, profiles: Sequence[Dict[str, Any]]) -> np.ndarray:
+        """
+        Score many customer profiles at once as a (profiles x products) matrix.
+
+        Each profile takes the keyword arguments of score(). Per-customer
+        weight rows are gathered by product code in one indexing operation and
+        the remaining terms are accumulated in place, so the cost is a handful
+        of passes over the matrix rather than one loop per customer.
+        """
+        n = self._size
+        if not profiles:
+            return np.zeros((0, n), dtype=np.float64)
+        weights = self.WEIGHTS
+
+        category_weights = np.stack([
+            self._weight_vector("category", profile.get("categories") or {}) for profile in profiles
+        ])
+        category_weights *= weights["category"]
+        scores = category_weights[:, self._codes["category"][:n]]
+
+        for column, key, weight in (("season", "season", "season"), ("geographical_location", "location", "location")):
+            match_weights = np.stack([
+                self._weight_vector(column, {profile[key]: weights[weight]} if profile.get(key) else {})
+                for profile in profiles
+            ])
+            scores += match_weights[:, self._codes[column][:n]]
+
+        scores += self._price_score(np.array([profile.get("budget") or 0.0 for profile in profiles]))
+        scores += weights["quality"] * self._quality_score()
+        return scores
+
+    def _price_score(self, budgets: np.ndarray) -> np.ndarray:
+        # Closeness of each price to each budget; 0.5 without a budget, 0 for unpriced products
+        price = self._numeric["price"][:self._size]
+        has_budget = budgets != 0.0
+        budgets = np.where(has_budget, budgets, 1.0)[:, None]
+        price_score = np.subtract(price, budgets)
+        np.abs(price_score, out=price_score)
+        price_score /= budgets
+        np.subtract(1.0, price_score, out=price_score)
+        np.clip(price_score, 0.0, 1.0, out=price_score)
+        price_score[~has_budget] = 0.5
+        np.nan_to_num(price_score, copy=False, nan=0.0)
+        price_score *= self.WEIGHTS["price"]
+        return price_score
+
+    def _quality_score(self) -> np.ndarray:
+        n = self._size
+        return (
+            0.4 * np.nan_to_num(self._numeric["probability_of_recommendation"][:n], nan=0.5)
+            + 0.2 * np.nan_to_num(self._numeric["average_rating"][:n], nan=2.5) / 5.0
+            + 0.2 * np.nan_to_num(self._numeric["product_rating"][:n], nan=2.5) / 5.0
+            + 0.2 * np.nan_to_num(self._numeric["review_sentiment_score"][:n], nan=0.5)
+        )
+
+    def top_k(self, k: int = 10, **profile: Any) -> List[Dict[str, Any]]:
+        """Return the k best matching products for a customer profile, best first."""
+        return self.top_k_batch([profile], k=k)[0]
+
+    def top_k_batch(self, profiles: Sequence[Dict[str, Any]], k: int = 10) -> List[List[Dict[str, Any]]]:
+        """
+        The k best matching products for each profile, best first.
+
+        Memory grows with len(profiles) x catalog size; callers scoring many
+        customers should pass them in chunks.
+        """
+        with self._lock:
+            n = self._size
+            if n == 0 or k <= 0:
+                return [[] for _ in profiles]
+            if not profiles:
+                return []
+            scores = self.score_batch(profiles)
+            k = min(k, n)
+            top = np.argpartition(scores, n - k, axis=1)[:, n - k:]
+            top_scores = np.take_along_axis(scores, top, axis=1)
+            order = np.argsort(-top_scores, axis=1, kind="stable")
+            top = np.take_along_axis(top, order, axis=1)
+            top_scores = np.take_along_axis(top_scores, order, axis=1)
+            return [
+                [
+                    {
+                        "product_id": self._product_ids[row],
+                        "brand": self._brands[row],
+                        "category": self._categories[row],
+                        "price": float(self._numeric["price"][row]),
+                        "match_score": round(float(score), 4),
+                    }
+                    for row, score in zip(rows, row_scores)
+                ]
+                for rows, row_scores in zip(top, top_scores)
+            ]
+
+    def lookup(self, product_ids: Iterable[str]) -> List[Dict[str, Any]]:
+        """Catalog details for the given products, in order; unknown ids are skipped."""
+        with self._lock:
+            rows = [self._row_by_id.get(str(product_id)) for product_id in product_ids]
+            return [
+                {
+                    "product_id": self._product_ids[row],
+                    "brand": self._brands[row],
+                    "category": self._categories[row],
+                    "price": float(self._numeric["price"][row]),
+                }
+                for row in rows
+                if row is not None
+            ]
+
+# Shared catalog for the process
+recommendation_engine = RecommendationEngine()
@@ -0,0 +1,99 @@
+import json
+from typing import Any, Dict, Iterable, List, Optional
+
+# Shape the model is asked to produce: a JSON array of these objects
+RECOMMENDATION_SCHEMA = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": {
+            "product_id": {"type": "integer"},
+            "score": {"type": "number"},
+            "reasoning": {"type": "string"},
+            "interest": {"type": "string"}
+        },
+        "required": ["product_id", "score", "reasoning", "interest"]
+    }
+}
+
+class StreamingRecommendationParser:
+    """
+    Incrementally parse a streamed JSON array of recommendations.
+
+    Text is fed in arbitrary chunks. Every character is scanned once to find
+    where each top-level object ends, and each completed object is decoded
+    and returned from feed() right away, so callers can emit recommendations
+    before the response is finished. Objects only count once the array has
+    opened, so braces in any preamble (code fences, notes) are ignored, as is
+    everything between objects.
+    """
+
+    def __init__(self, products: Iterable[Any]):
+        self._products = {product.id: product for product in products}
+        self._buffer = ""
+        self._pos = 0
+        self._start: Optional[int] = None
+        self._depth = 0
+        self._in_array = False
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, text: str) -> List[Dict[str, Any]]:
+        """Consume a chunk; return the recommendations it completed."""
+        self._buffer += text
+        completed = []
+        buffer = self._buffer
+        for pos in range(self._pos, len(buffer)):
+            char = buffer[pos]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = self._in_array
+            elif not self._in_array:
+                self._in_array = char == "["
+            elif char == "{":
+                if self._depth == 0:
+                    self._start = pos
+                self._depth += 1
+            elif char == "}" and self._depth > 0:
+                self._depth -= 1
+                if self._depth == 0:
+                    recommendation = self._decode(buffer[self._start:pos + 1])
+                    if recommendation is not None:
+                        completed.append(recommendation)
+                    self._start = None
+            elif char == "]" and self._depth == 0:
+                self._in_array = False
+
+        # Keep only the unfinished object so the buffer stays small
+        if self._start is None:
+            self._buffer = ""
+            self._pos = 0
+        else:
+            self._buffer = buffer[self._start:]
+            self._pos = len(self._buffer)
+            self._start = 0
+        return completed
+
+    def _decode(self, raw: str) -> Optional[Dict[str, Any]]:
+        try:
+            item = json.loads(raw)
+            product_id = int(item["product_id"])
+            score = float(item["score"])
+        except (ValueError, TypeError, KeyError):
+            return None
+        product = self._products.get(product_id)
+        if product is None:
+            return None
+        return {
+            "product_id": product_id,
+            "score": score,
+            "reasoning": str(item.get("reasoning", "")),
+            "interest": str(item.get("interest", "")),
+            "product": product
+        }
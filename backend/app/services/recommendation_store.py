@@ -0,0 +1,150 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import delete, func, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.orm import joinedload
+
+from backend.app.core.config import settings
+from backend.app.core.metrics import metrics
+from backend.app.core.security import user_with_relationships
+from backend.app.models.models import Behavior, Recommendation, User
+from backend.database.database import async_session, async_write_session
+
+# Produces fresh recommendation dicts ({"product_id", "score", "reasoning", "interest", "insights"})
+Generator = Callable[[AsyncSession, User], Awaitable[List[Dict[str, Any]]]]
+
+class RecommendationStore:
+    """
+    Persisted recommendations, served stale-while-revalidate.
+
+    Each generation is stored as Recommendation rows sharing one created_at.
+    A generation younger than the TTL and not followed by new behaviors is
+    served as is. An older or invalidated one is still served while a
+    background task regenerates it (one per user at a time). Only users with
+    nothing stored, or a generation past the max staleness, wait for a live
+    generation. Saving a generation prunes all but the newest few.
+    """
+
+    def __init__(self, ttl_seconds: float, max_stale_seconds: float, generations_kept: int):
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self.max_stale = timedelta(seconds=max_stale_seconds)
+        self.generations_kept = max(1, generations_kept)
+        self._refreshing: Dict[int, asyncio.Task] = {}
+
+    async def latest(self, db: AsyncSession, user_id: int) -> Tuple[List[Recommendation], Optional[datetime]]:
+        """The user's newest generation, best first, with its timestamp."""
+        newest = select(func.max(Recommendation.created_at)).filter(
+            Recommendation.user_id == user_id
+        ).scalar_subquery()
+        result = await db.execute(select(Recommendation).options(
+            joinedload(Recommendation.product)
+        ).filter(
+            Recommendation.user_id == user_id,
+            Recommendation.created_at == newest
+        ).order_by(Recommendation.score.desc(), Recommendation.id))
+        rows = list(result.scalars().all())
+        return rows, rows[0].created_at if rows else None
+
+    async def invalidated(self, db: AsyncSession, user_id: int, since: datetime) -> bool:
+        """Whether the user has acted since the generation was made."""
+        result = await db.execute(select(Behavior.id).filter(
+            Behavior.user_id == user_id,
+            Behavior.created_at > since
+        ).limit(1))
+        return result.first() is not None
+
+    async def save(self, user_id: int, recommendations: List[Dict[str, Any]]) -> None:
+        """
+        Store a generation; the rows share one timestamp so they are read back together.
+
+        Generations beyond the newest generations_kept are deleted in the same transaction.
+        """
+        if not recommendations:
+            return
+        created_at = datetime.utcnow()
+        async with async_write_session() as db:
+            await db.execute(insert(Recommendation), [
+                {
+                    "user_id": user_id,
+                    "product_id": rec["product_id"],
+                    "score": rec["score"],
+                    "reason": rec.get("reasoning"),
+                    "context": jsonable_encoder({
+                        "interest": rec.get("interest"),
+                        "insights": rec.get("insights", {})
+                    }),
+                    "created_at": created_at
+                }
+                for rec in recommendations
+            ])
+            oldest_kept = select(Recommendation.created_at).filter(
+                Recommendation.user_id == user_id
+            ).distinct().order_by(Recommendation.created_at.desc()).offset(self.generations_kept - 1).limit(1).scalar_subquery()
+            await db.execute(delete(Recommendation).where(
+                Recommendation.user_id == user_id,
+                Recommendation.created_at < oldest_kept
+            ))
+            await db.commit()
+
+    async def load_user(self, db: AsyncSession, user_id: int) -> Optional[User]:
+        """The full user a generator needs; loaded only when a generation is actually made."""
+        result = await db.execute(user_with_relationships(user_id))
+        return result.scalars().first()
+
+    async def get(self, db: AsyncSession, user_id: int, generate: Generator) -> List[Recommendation]:
+        rows, generated_at = await self.latest(db, user_id)
+        if rows:
+            age = datetime.utcnow() - generated_at
+            if age <= self.ttl and not await self.invalidated(db, user_id, generated_at):
+                metrics.incr("recommendation_store.fresh")
+                return rows
+            if age <= self.max_stale:
+                metrics.incr("recommendation_store.stale")
+                self.schedule_refresh(user_id, generate)
+                return rows
+
+        metrics.incr("recommendation_store.misses")
+        user = await self.load_user(db, user_id)
+        if user is None:
+            return []
+        await self.save(user_id, await generate(db, user))
+        rows, _ = await self.latest(db, user_id)
+        return rows
+
+    def schedule_refresh(self, user_id: int, generate: Generator) -> None:
+        """Regenerate in the background unless a refresh for the user is already running."""
+        if user_id in self._refreshing:
+            return
+        task = asyncio.create_task(self._refresh(user_id, generate))
+        self._refreshing[user_id] = task
+        task.add_done_callback(lambda _: self._refreshing.pop(user_id, None))
+
+    async def _refresh(self, user_id: int, generate: Generator) -> None:
+        try:
+            async with async_session() as db:
+                user = await self.load_user(db, user_id)
+                if user is None:
+                    return
+                recommendations = await generate(db, user)
+            await self.save(user_id, recommendations)
+            metrics.incr("recommendation_store.refreshes")
+        except Exception as e:
+            metrics.incr("recommendation_store.refresh_errors")
+            print(f"Error refreshing recommendations: {str(e)}")
+
+    async def stop(self) -> None:
+        """Cancel refreshes still running at shutdown."""
+        tasks = list(self._refreshing.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+# Shared store for the process
+recommendation_store = RecommendationStore(
+    ttl_seconds=settings.RECOMMENDATION_TTL_SECONDS,
+    max_stale_seconds=settings.RECOMMENDATION_MAX_STALE_SECONDS,
+    generations_kept=settings.RECOMMENDATION_GENERATIONS_KEPT
+)
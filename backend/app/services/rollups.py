@@ -0,0 +1,111 @@
+import argparse
+import asyncio
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional
+from sqlalchemy import delete, func, insert
+from sqlalchemy.future import select
+
+from backend.app.models.models import (
+    Behavior, MoodState, Product, ShoppingList, ShoppingListItem,
+    UserDailyActivity, UserCategoryQuantity, UserDailyMood
+)
+from backend.database.database import upsert_insert, write_engine, init_db
+
+async def record_behaviors(db: Any, events: Iterable[Dict[str, Any]]) -> None:
+    """Add newly written behavior events to the user x day activity counts."""
+    counts = Counter(
+        (event["user_id"], (event.get("created_at") or datetime.utcnow()).date())
+        for event in events
+    )
+    if not counts:
+        return
+    table = UserDailyActivity.__table__
+    stmt = upsert_insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.day],
+        set_={"behavior_count": table.c.behavior_count + stmt.excluded.behavior_count}
+    )
+    await db.execute(stmt, [
+        {"user_id": user_id, "day": day, "behavior_count": count}
+        for (user_id, day), count in counts.items()
+    ])
+
+async def record_mood(db: Any, user_id: int, intensity: float, created_at: Optional[datetime] = None) -> None:
+    """Add a mood reading to the user x day mood totals."""
+    table = UserDailyMood.__table__
+    stmt = upsert_insert(table).values(
+        user_id=user_id,
+        day=(created_at or datetime.utcnow()).date(),
+        intensity_sum=intensity,
+        mood_count=1
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.day],
+        set_={
+            "intensity_sum": table.c.intensity_sum + stmt.excluded.intensity_sum,
+            "mood_count": table.c.mood_count + stmt.excluded.mood_count
+        }
+    )
+    await db.execute(stmt)
+
+async def record_list_item(db: Any, user_id: int, category: Optional[str], quantity: Optional[int]) -> None:
+    """Add a shopping list item to the user x category quantities."""
+    if not category:
+        return
+    table = UserCategoryQuantity.__table__
+    stmt = upsert_insert(table).values(user_id=user_id, category=category, quantity=quantity or 1)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.category],
+        set_={"quantity": table.c.quantity + stmt.excluded.quantity}
+    )
+    await db.execute(stmt)
+
+async def backfill() -> None:
+    """Rebuild every rollup table from the raw event tables."""
+    await init_db()
+    async with write_engine.begin() as conn:
+        for model in (UserDailyActivity, UserCategoryQuantity, UserDailyMood):
+            await conn.execute(delete(model))
+
+        day = func.date(Behavior.created_at)
+        await conn.execute(insert(UserDailyActivity).from_select(
+            ["user_id", "day", "behavior_count"],
+            select(Behavior.user_id, day, func.count(Behavior.id)).filter(
+                Behavior.user_id.isnot(None), Behavior.created_at.isnot(None)
+            ).group_by(Behavior.user_id, day)
+        ))
+
+        await conn.execute(insert(UserCategoryQuantity).from_select(
+            ["user_id", "category", "quantity"],
+            select(
+                ShoppingList.user_id, Product.category,
+                func.sum(func.coalesce(ShoppingListItem.quantity, 1))
+            ).select_from(ShoppingListItem).join(
+                ShoppingList, ShoppingListItem.shopping_list_id == ShoppingList.id
+            ).join(
+                Product, ShoppingListItem.product_id == Product.id
+            ).filter(
+                ShoppingList.user_id.isnot(None), Product.category.isnot(None)
+            ).group_by(ShoppingList.user_id, Product.category)
+        ))
+
+        day = func.date(MoodState.created_at)
+        await conn.execute(insert(UserDailyMood).from_select(
+            ["user_id", "day", "intensity_sum", "mood_count"],
+            select(
+                MoodState.user_id, day, func.sum(MoodState.intensity), func.count(MoodState.id)
+            ).filter(
+                MoodState.user_id.isnot(None), MoodState.created_at.isnot(None)
+            ).group_by(MoodState.user_id, day)
+        ))
+    print("Analytics rollups rebuilt successfully")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain the analytics rollup tables.")
+    parser.add_argument("--backfill", action="store_true", help="Rebuild all rollups from the raw event tables")
+    args = parser.parse_args()
+    if args.backfill:
+        asyncio.run(backfill())
+    else:
+        parser.print_help()
@@ -0,0 +1,273 @@
+import argparse
+import asyncio
+import heapq
+import os
+import shutil
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from backend.app.core.config import settings
+from backend.app.models.models import Behavior, CatalogProduct, CustomerInteraction, Product, ShoppingListItem
+from backend.database.database import async_session
+
+# Index names: the customer dataset catalog and the app's own products
+CATALOG_INDEX = "catalog"
+PRODUCTS_INDEX = "products"
+
+# How the signals blend into a neighbor's score
+CONTENT_WEIGHT = 0.5
+COOCCURRENCE_WEIGHT = 0.5
+# Co-occurrence counts are damped as c / (c + shrinkage), so one shared basket is weak evidence
+COOCCURRENCE_SHRINKAGE = 5.0
+# Breaks ties between equally similar neighbors in favor of better products
+QUALITY_WEIGHT = 0.01
+
+class SimilarityIndex:
+    """
+    Top-k most similar products for every product, as fixed-size arrays.
+
+    neighbors[i] holds the row numbers of the products most similar to ids[i]
+    (best first, padded with -1) and scores[i] their similarity. The arrays are
+    stored as .npy files and opened with mmap_mode="r", so all worker
+    processes share one copy through the page cache. A lookup is a dict hit
+    plus reading one k-wide row.
+    """
+
+    def __init__(self, ids: np.ndarray, neighbors: np.ndarray, scores: np.ndarray):
+        self.ids = ids
+        self.neighbors = neighbors
+        self.scores = scores
+        self._row_by_id = {str(product_id): row for row, product_id in enumerate(ids)}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, product_id: str) -> bool:
+        return str(product_id) in self._row_by_id
+
+    @property
+    def k(self) -> int:
+        return self.neighbors.shape[1]
+
+    def similar(self, product_id: str, limit: Optional[int] = None) -> List[Tuple[str, float]]:
+        """(product_id, score) pairs most similar to a product, best first."""
+        row = self._row_by_id.get(str(product_id))
+        if row is None:
+            return []
+        limit = self.k if limit is None else min(limit, self.k)
+        neighbors = self.neighbors[row, :limit]
+        scores = self.scores[row, :limit]
+        return [
+            (str(self.ids[neighbor]), float(score))
+            for neighbor, score in zip(neighbors, scores)
+            if neighbor >= 0
+        ]
+
+    def save(self, directory: Path) -> None:
+        """
+        Write a new build next to the old ones and switch CURRENT to it.
+
+        Readers resolve CURRENT before opening the arrays, so they see either
+        the whole old build or the whole new one. The previous build is kept
+        for readers that resolved CURRENT just before the switch; older ones
+        are removed (processes still mapping them keep their pages).
+        """
+        build = f"build-{time.time_ns()}"
+        build_dir = directory / build
+        build_dir.mkdir(parents=True)
+        for name, array in (("ids", self.ids), ("neighbors", self.neighbors), ("scores", self.scores)):
+            np.save(build_dir / f"{name}.npy", array)
+        tmp_path = directory / "CURRENT.tmp"
+        tmp_path.write_text(build)
+        os.replace(tmp_path, directory / "CURRENT")
+        for old in sorted(directory.glob("build-*"))[:-2]:
+            shutil.rmtree(old, ignore_errors=True)
+
+    @classmethod
+    def load(cls, directory: Path, mmap: bool = True) -> "SimilarityIndex":
+        mode = "r" if mmap else None
+        return cls(
+            np.load(directory / "ids.npy", mmap_mode=mode),
+            np.load(directory / "neighbors.npy", mmap_mode=mode),
+            np.load(directory / "scores.npy", mmap_mode=mode),
+        )
+
+def build_index(
+    ids: Sequence[str],
+    quality: Sequence[float],
+    group_of: Sequence[Optional[str]],
+    similar_groups: Sequence[Sequence[str]],
+    baskets: Iterable[Sequence[int]],
+    k: int,
+) -> SimilarityIndex:
+    """
+    Merge content and co-occurrence evidence into top-k neighbor arrays.
+
+    group_of[i] is the group product i belongs to (e.g. its subcategory) and
+    similar_groups[i] the groups listed as similar to it; repeats weigh more.
+    Each basket is a list of product rows seen together (one shopping list, or
+    one user's recent activity).
+    """
+    n = len(ids)
+    quality = np.nan_to_num(np.asarray(quality, dtype=np.float64), nan=0.0)
+
+    # Group members, best first: only the first k + 1 of a group can enter a top-k on content alone
+    members: Dict[str, List[int]] = defaultdict(list)
+    for row in np.argsort(-quality, kind="stable"):
+        if group_of[row]:
+            members[group_of[row]].append(int(row))
+
+    cooccurrence: List[Counter] = [Counter() for _ in range(n)]
+    for basket in baskets:
+        items = list(dict.fromkeys(basket))[:settings.SIMILARITY_BASKET_MAX_ITEMS]
+        for a in items:
+            for b in items:
+                if a != b:
+                    cooccurrence[a][b] += 1
+
+    neighbors = np.full((n, k), -1, dtype=np.int32)
+    scores = np.zeros((n, k), dtype=np.float32)
+    for row in range(n):
+        listed = Counter(group for group in similar_groups[row] if group)
+        total = sum(listed.values())
+
+        candidates = set(cooccurrence[row])
+        for group in listed:
+            candidates.update(members.get(group, ())[:k + 1])
+        candidates.discard(row)
+
+        def similarity(other: int) -> float:
+            content = listed.get(group_of[other], 0) / total if total else 0.0
+            count = cooccurrence[row].get(other, 0)
+            return CONTENT_WEIGHT * content + COOCCURRENCE_WEIGHT * count / (count + COOCCURRENCE_SHRINKAGE)
+
+        scored = ((other, similarity(other)) for other in candidates)
+        best = heapq.nlargest(k, scored, key=lambda item: item[1] + QUALITY_WEIGHT * quality[item[0]])
+        for col, (other, score) in enumerate(best):
+            neighbors[row, col] = other
+            scores[row, col] = score
+
+    return SimilarityIndex(np.asarray(ids, dtype=str), neighbors, scores)
+
+async def _grouped_baskets(
+    db: AsyncSession, query, row_by_key: Dict[str, int]
+) -> AsyncIterator[List[int]]:
+    """Stream (group, product) rows ordered by group and yield each group's product rows."""
+    current, basket = None, []
+    result = await db.stream(query)
+    async for group, product_id in result:
+        if group != current:
+            if len(basket) > 1:
+                yield basket
+            current, basket = group, []
+        row = row_by_key.get(str(product_id))
+        if row is not None:
+            basket.append(row)
+    if len(basket) > 1:
+        yield basket
+
+async def _collect(baskets: AsyncIterator[List[int]]) -> List[List[int]]:
+    return [basket async for basket in baskets]
+
+async def build_catalog_index(db: AsyncSession, k: int) -> SimilarityIndex:
+    """Catalog neighbors from Similar_Product_List subcategories and customer co-interactions."""
+    result = await db.execute(select(
+        CatalogProduct.product_id, CatalogProduct.subcategory,
+        CatalogProduct.similar_products, CatalogProduct.probability_of_recommendation
+    ).order_by(CatalogProduct.id))
+    rows = result.all()
+    row_by_key = {str(row.product_id): i for i, row in enumerate(rows)}
+
+    baskets = await _collect(_grouped_baskets(db, select(
+        CustomerInteraction.customer_id, CustomerInteraction.product_id
+    ).filter(
+        CustomerInteraction.product_id.isnot(None)
+    ).order_by(CustomerInteraction.customer_id, CustomerInteraction.ts.desc()), row_by_key))
+
+    return build_index(
+        ids=[row.product_id for row in rows],
+        quality=[row.probability_of_recommendation for row in rows],
+        group_of=[row.subcategory for row in rows],
+        similar_groups=[row.similar_products or [] for row in rows],
+        baskets=baskets,
+        k=k,
+    )
+
+async def build_products_index(db: AsyncSession, k: int) -> SimilarityIndex:
+    """App product neighbors from category and shopping list / behavior co-occurrence."""
+    result = await db.execute(select(
+        Product.id, Product.category, Product.probability_of_recommendation, Product.average_rating
+    ).order_by(Product.id))
+    rows = result.all()
+    row_by_key = {str(row.id): i for i, row in enumerate(rows)}
+
+    baskets = await _collect(_grouped_baskets(db, select(
+        ShoppingListItem.shopping_list_id, ShoppingListItem.product_id
+    ).order_by(ShoppingListItem.shopping_list_id), row_by_key))
+    baskets += await _collect(_grouped_baskets(db, select(
+        Behavior.user_id, Behavior.product_id
+    ).filter(
+        Behavior.product_id.isnot(None)
+    ).order_by(Behavior.user_id, Behavior.created_at.desc()), row_by_key))
+
+    return build_index(
+        ids=[str(row.id) for row in rows],
+        quality=[
+            row.probability_of_recommendation if row.probability_of_recommendation is not None
+            else (row.average_rating or 0.0) / 5.0
+            for row in rows
+        ],
+        group_of=[row.category for row in rows],
+        similar_groups=[[row.category] if row.category else [] for row in rows],
+        baskets=baskets,
+        k=k,
+    )
+
+# Loaded indexes with the CURRENT marker they were loaded at: name -> (marker, index)
+_indexes: Dict[str, Tuple[Tuple[int, int], SimilarityIndex]] = {}
+
+def get_similarity_index(name: str) -> Optional[SimilarityIndex]:
+    """
+    The named index, memory-mapped on first use; None until it has been built.
+
+    Every access stats the CURRENT marker, so a rebuild by the CLI is picked
+    up by running servers without a restart.
+    """
+    directory = Path(settings.SIMILARITY_INDEX_DIR) / name
+    try:
+        stat = (directory / "CURRENT").stat()
+    except FileNotFoundError:
+        _indexes.pop(name, None)
+        return None
+    # Each save renames a fresh file over CURRENT, so its inode changes even when
+    # two builds land within one filesystem timestamp tick
+    marker = (stat.st_ino, stat.st_mtime_ns)
+    loaded = _indexes.get(name)
+    if loaded is None or loaded[0] != marker:
+        build = (directory / "CURRENT").read_text().strip()
+        loaded = (marker, SimilarityIndex.load(directory / build))
+        _indexes[name] = loaded
+    return loaded[1]
+
+def reset_similarity_indexes() -> None:
+    """Drop loaded indexes so the next lookup maps freshly built files."""
+    _indexes.clear()
+
+async def build_all(k: int = settings.SIMILARITY_TOP_K) -> None:
+    async with async_session() as db:
+        for name, build in ((CATALOG_INDEX, build_catalog_index), (PRODUCTS_INDEX, build_products_index)):
+            index = await build(db, k)
+            index.save(Path(settings.SIMILARITY_INDEX_DIR) / name)
+            print(f"{name}: {len(index)} products indexed")
+    reset_similarity_indexes()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the item-to-item similarity indexes.")
+    parser.add_argument("--k", type=int, default=settings.SIMILARITY_TOP_K, help="Neighbors kept per product")
+    args = parser.parse_args()
+    asyncio.run(build_all(k=args.k))
@@ -0,0 +1,51 @@
+import asyncio
+import hashlib
+import json
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+from backend.app.core.metrics import metrics
+
+T = TypeVar("T")
+
+def request_key(endpoint: str, user: Optional[Any], inputs: Any = None) -> str:
+    """Key for a logical request: endpoint, user and a hash of its inputs."""
+    digest = hashlib.sha256(json.dumps(inputs, sort_keys=True, default=str).encode()).hexdigest()[:16]
+    return f"{endpoint}:{user}:{digest}"
+
+class SingleFlight:
+    """
+    Collapse concurrent identical calls into one execution.
+
+    The first caller for a key starts the work as a task; callers arriving
+    while it runs await the same task and get the same result or exception.
+    The key is released as soon as the task finishes, so later calls start
+    fresh work (caching is left to the layers below). The task is shielded
+    from callers being cancelled, so one disconnecting client does not fail
+    the others.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Task] = {}
+        metrics.register_gauge("single_flight.in_flight", lambda: len(self._calls))
+
+    async def do(self, key: str, func: Callable[[], Awaitable[T]]) -> T:
+        endpoint = key.split(":", 1)[0]
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._release(key, done))
+            metrics.incr(f"single_flight.{endpoint}.calls")
+        else:
+            metrics.incr(f"single_flight.{endpoint}.collapsed")
+        return await asyncio.shield(task)
+
+    def _release(self, key: str, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Mark the outcome as retrieved even if every caller went away
+        if not task.cancelled():
+            task.exception()
+
+# Shared coalescing layer for the process
+single_flight = SingleFlight()
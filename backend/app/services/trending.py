@@ -0,0 +1,100 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+from sqlalchemy import case, func
+from sqlalchemy.future import select
+
+from backend.app.core.config import settings
+from backend.app.core.metrics import metrics
+from backend.app.models.models import Behavior
+from backend.database.database import async_session
+
+# Sliding windows and their weights. Windows are nested, so an event from the
+# last hour counts in all three and the score decays stepwise with age.
+TRENDING_WINDOWS: List[Tuple[timedelta, float]] = [
+    (timedelta(hours=1), 4.0),
+    (timedelta(hours=24), 2.0),
+    (timedelta(days=7), 1.0),
+]
+
+class TrendingService:
+    """
+    In-memory leaderboard of products by time-decayed popularity.
+
+    Scores come from one aggregate query over the behavior stream, re-run by a
+    background task on an interval; requests only read the cached ranking.
+    """
+
+    def __init__(
+        self,
+        refresh_interval: float = settings.TRENDING_REFRESH_INTERVAL_SECONDS,
+        size: int = settings.TRENDING_LEADERBOARD_SIZE,
+    ):
+        self.refresh_interval = refresh_interval
+        self.size = size
+        self._leaderboard: List[Tuple[int, float]] = []
+        self._refreshed_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        metrics.register_gauge("trending.age_seconds", self.age)
+
+    def age(self) -> float:
+        if self._refreshed_at is None:
+            return -1.0
+        return time.monotonic() - self._refreshed_at
+
+    def build_query(self, now: datetime):
+        """Score every product touched in the widest window with one GROUP BY."""
+        terms = [
+            func.sum(case((Behavior.created_at >= now - window, weight), else_=0.0))
+            for window, weight in TRENDING_WINDOWS
+        ]
+        score = terms[0]
+        for term in terms[1:]:
+            score = score + term
+        oldest = now - max(window for window, _ in TRENDING_WINDOWS)
+        return select(Behavior.product_id, score.label("score")).filter(
+            Behavior.created_at >= oldest,
+            Behavior.product_id.isnot(None)
+        ).group_by(Behavior.product_id).order_by(score.desc(), Behavior.product_id).limit(self.size)
+
+    async def refresh(self) -> None:
+        async with self._lock:
+            async with async_session() as db:
+                result = await db.execute(self.build_query(datetime.utcnow()))
+                self._leaderboard = [(product_id, float(score)) for product_id, score in result.all()]
+            self._refreshed_at = time.monotonic()
+            metrics.incr("trending.refreshes")
+
+    async def top(self, limit: int = 5) -> List[Tuple[int, float]]:
+        """Highest-scoring (product_id, score) pairs; refreshes once if never loaded."""
+        if self._refreshed_at is None:
+            await self.refresh()
+        return self._leaderboard[:limit]
+
+    async def start(self) -> None:
+        if self._task is not None and not self._task.done():
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f"Error refreshing trending leaderboard: {str(e)}")
+            await asyncio.sleep(self.refresh_interval)
+
+# Shared leaderboard for the process
+trending_service = TrendingService()
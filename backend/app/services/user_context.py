@@ -0,0 +1,40 @@
+from typing import List, Optional
+from sqlalchemy.future import select
+from sqlalchemy.orm import selectinload
+
+from backend.app.models.models import Behavior, MoodState, Persona, ShoppingList, ShoppingListItem
+from backend.database.database import async_session
+
+# Independent per-user lookups. Each opens its own pooled session, since one
+# AsyncSession cannot run statements concurrently, so callers can fan them
+# out with asyncio.gather and wait only for the slowest.
+
+async def load_persona(user_id: int) -> Optional[Persona]:
+    async with async_session() as db:
+        result = await db.execute(select(Persona).filter(Persona.user_id == user_id).limit(1))
+        return result.scalars().first()
+
+async def load_latest_mood(user_id: int) -> Optional[MoodState]:
+    async with async_session() as db:
+        result = await db.execute(select(MoodState).filter(
+            MoodState.user_id == user_id
+        ).order_by(MoodState.created_at.desc()).limit(1))
+        return result.scalars().first()
+
+async def load_recent_behaviors(user_id: int, limit: int = 5) -> List[Behavior]:
+    async with async_session() as db:
+        result = await db.execute(select(Behavior).filter(
+            Behavior.user_id == user_id
+        ).order_by(Behavior.created_at.desc()).limit(limit))
+        return result.scalars().all()
+
+async def load_shopping_list(list_id: int, user_id: int) -> Optional[ShoppingList]:
+    """The user's shopping list with its items and their products loaded."""
+    async with async_session() as db:
+        result = await db.execute(select(ShoppingList).filter(
+            ShoppingList.id == list_id,
+            ShoppingList.user_id == user_id
+        ).options(
+            selectinload(ShoppingList.items).selectinload(ShoppingListItem.product)
+        ))
+        return result.scalars().first()
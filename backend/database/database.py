@@ -1,9 +1,11 @@
+from sqlalchemy import event
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker, declarative_base
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 import os
 from dotenv import load_dotenv
-import aiosqlite
 from backend.app.core.config import settings
 
 load_dotenv()
@@ -12,24 +14,76 @@ load_dotenv()
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 DATABASE_PATH = os.path.join(BASE_DIR, "smartcart.db")
 
-# Use database URL with absolute path
-SQLALCHEMY_DATABASE_URL = f"sqlite+aiosqlite:///{DATABASE_PATH}"
+# A server database can be selected through settings; SQLite is the default
+SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL or f"sqlite+aiosqlite:///{DATABASE_PATH}"
+IS_SQLITE = SQLALCHEMY_DATABASE_URL.startswith("sqlite")
 
-# Create async engine
-engine = create_async_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
-    echo=settings.DEBUG,
-)
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    """Tune every new SQLite connection for concurrent readers and one writer."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE}")
+    cursor.execute(f"PRAGMA cache_size=-{settings.SQLITE_CACHE_SIZE_KB}")
+    cursor.execute(f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+def _create_engine(pool_size: int, max_overflow: int):
+    engine_kwargs = {
+        "echo": settings.DEBUG,
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_pre_ping": not IS_SQLITE,
+    }
+    if IS_SQLITE:
+        # aiosqlite defaults to NullPool (a new connection per checkout)
+        engine_kwargs["poolclass"] = AsyncAdaptedQueuePool
+        engine_kwargs["connect_args"] = {"check_same_thread": False}
+    new_engine = create_async_engine(SQLALCHEMY_DATABASE_URL, **engine_kwargs)
+    if IS_SQLITE:
+        event.listen(new_engine.sync_engine, "connect", _apply_sqlite_pragmas)
+    return new_engine
+
+# Read engine: a pool of connections so reads run concurrently
+engine = _create_engine(settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW)
+
+# Write engine: SQLite allows one writer at a time, so writes queue for a single
+# dedicated connection in-process instead of contending for the file lock.
+# Server databases handle concurrent writers themselves and share the read pool.
+write_engine = _create_engine(1, 0) if IS_SQLITE else engine
+
+class AppSession(Session):
+    """Sync session behind the app's AsyncSessions; a target for session events."""
 
-# Create session factory
+def _raise_on_lazy_load(orm_execute_state):
+    """Reject queries emitted by an implicit relationship lazy load."""
+    if orm_execute_state.is_select and orm_execute_state.lazy_loaded_from is not None:
+        mapper = orm_execute_state.lazy_loaded_from.mapper
+        raise InvalidRequestError(
+            f"Implicit lazy load from {mapper.class_.__name__}; "
+            "select the needed columns or use an eager loader option"
+        )
+
+if settings.DB_RAISE_ON_LAZY_LOAD:
+    event.listen(AppSession, "do_orm_execute", _raise_on_lazy_load)
+
+# Create session factories
 async_session = sessionmaker(
-    engine, expire_on_commit=False, class_=AsyncSession
+    engine, expire_on_commit=False, class_=AsyncSession, sync_session_class=AppSession
+)
+async_write_session = sessionmaker(
+    write_engine, expire_on_commit=False, class_=AsyncSession, sync_session_class=AppSession
 )
 
 Base = declarative_base()
 
+def upsert_insert(table):
+    """INSERT for the configured dialect, supporting on_conflict_do_update/do_nothing."""
+    if IS_SQLITE:
+        return sqlite.insert(table)
+    return postgresql.insert(table)
+
 # Dependency for database session
 async def get_db():
     async with async_session() as session:
@@ -42,12 +96,24 @@ async def get_db():
         finally:
             await session.close()
 
+# Dependency for a session on the writer connection
+async def get_write_db():
+    async with async_write_session() as session:
+        try:
+            yield session
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+        finally:
+            await session.close()
+
 # Initialize database
 async def init_db():
     try:
-        async with engine.begin() as conn:
+        async with write_engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
         print("Database initialized successfully")
     except Exception as e:
         print(f"Error initializing database: {str(e)}")
-        raise 
\ No newline at end of file
+        raise
@@ -0,0 +1,58 @@
+import asyncio
+import os
+import tempfile
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+# Point the app at scratch storage before any backend module reads its settings
+_TMP_DIR = tempfile.mkdtemp(prefix="smartcart-tests-")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(_TMP_DIR, 'smartcart.db')}"
+os.environ["SIMILARITY_INDEX_DIR"] = os.path.join(_TMP_DIR, "similarity_index")
+os.environ["LLM_CACHE_BACKEND"] = "memory"
+
+from backend.app.models import models  # noqa: E402,F401  (registers every table on Base)
+from backend.app.api.endpoints import router as api_router  # noqa: E402
+from backend.app.core.security import create_access_token, get_password_hash  # noqa: E402
+from backend.app.models.models import User  # noqa: E402
+from backend.database.database import Base, async_write_session, engine, write_engine  # noqa: E402
+
+@pytest.fixture
+def run_db():
+    """Run an async test body against a fresh, empty schema."""
+    def run(body):
+        async def main():
+            async with write_engine.begin() as conn:
+                await conn.run_sync(Base.metadata.drop_all)
+                await conn.run_sync(Base.metadata.create_all)
+            # A disposed engine runs its first-connect hooks again; do that once, not from concurrent checkouts
+            async with engine.connect():
+                pass
+            try:
+                return await body()
+            finally:
+                # Pooled connections belong to this event loop; the next test gets its own
+                await engine.dispose()
+                await write_engine.dispose()
+        return asyncio.run(main())
+    return run
+
+@pytest.fixture
+def api_client():
+    """HTTP client factory for the API router, mounted without the frontend catch-all route."""
+    app = FastAPI()
+    app.include_router(api_router, prefix="/api/v1")
+    return lambda: httpx.AsyncClient(app=app, base_url="http://test")
+
+@pytest.fixture
+def sign_in():
+    """Create a user and return (user_id, bearer headers) for it."""
+    async def create(email="shopper@example.com"):
+        async with async_write_session() as db:
+            user = User(email=email, hashed_password=get_password_hash("password"))
+            db.add(user)
+            await db.commit()
+        token = create_access_token({"sub": email})
+        return user.id, {"Authorization": f"Bearer {token}"}
+    return create
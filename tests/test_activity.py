@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import InvalidRequestError
+
+from backend.app.models.models import Behavior, Product, Recommendation
+from backend.database.database import AppSession, _raise_on_lazy_load, async_session, async_write_session
+
+async def _seed_activity(user_id):
+    now = datetime.utcnow()
+    async with async_write_session() as db:
+        db.add_all([Product(id=1, name="Milk", price=1.0), Product(id=2, name="Bread", price=2.0)])
+        await db.flush()
+        db.add_all([
+            Recommendation(user_id=user_id, product_id=1, score=0.25, created_at=now - timedelta(minutes=1)),
+            Recommendation(user_id=user_id, product_id=2, score=0.5, created_at=now),
+            Recommendation(user_id=user_id, product_id=2, score=0.75, created_at=now - timedelta(hours=1)),
+            Recommendation(user_id=user_id + 1, product_id=1, score=0.9, created_at=now),
+            Behavior(user_id=user_id, product_id=2, action_type="view", created_at=now),
+        ])
+        await db.commit()
+
+def test_updates_name_the_products_from_the_last_few_minutes(run_db, api_client, sign_in):
+    async def body():
+        user_id, headers = await sign_in()
+        await _seed_activity(user_id)
+        async with api_client() as client:
+            response = await client.get("/api/v1/updates", headers=headers)
+        assert response.status_code == 200
+        assert [update["message"] for update in response.json()] == [
+            "New recommendation: Bread",
+            "New recommendation: Milk",
+            "New activity: view on Bread",
+        ]
+    run_db(body)
+
+def test_recommendation_performance_lists_the_newest_first(run_db, api_client, sign_in):
+    async def body():
+        user_id, headers = await sign_in()
+        await _seed_activity(user_id)
+        async with api_client() as client:
+            response = await client.get("/api/v1/analytics/recommendations", headers=headers)
+        assert response.json() == {"products": ["Bread", "Milk", "Bread"], "scores": [50.0, 25.0, 75.0]}
+    run_db(body)
+
+def test_lazy_load_guard_rejects_implicit_relationship_loads(run_db, sign_in):
+    async def body():
+        user_id, _ = await sign_in()
+        await _seed_activity(user_id)
+        event.listen(AppSession, "do_orm_execute", _raise_on_lazy_load)
+        try:
+            async with async_session() as db:
+                def touch_product(session):
+                    recommendation = session.query(Recommendation).first()
+                    return recommendation.product.name
+                with pytest.raises(InvalidRequestError, match="Implicit lazy load from Recommendation"):
+                    await db.run_sync(touch_product)
+        finally:
+            event.remove(AppSession, "do_orm_execute", _raise_on_lazy_load)
+    run_db(body)
@@ -0,0 +1,86 @@
+import io
+import json
+import time
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+
+from backend.app.core.config import settings
+from backend.app.models.customer import Customer
+from backend.app.services import batch_scoring
+from backend.app.services.recommendation_engine import recommendation_engine
+from backend.database.database import async_session, async_write_session
+
+CATALOG = [
+    SimpleNamespace(
+        product_id=f"P{i}", brand=f"Brand {i}", category=["Books", "Fashion", "Garden"][i % 3],
+        price=20.0 + 15 * i, average_rating=3.0 + i % 3 * 0.5, product_rating=4.0,
+        review_sentiment_score=0.5, probability_of_recommendation=i / 10,
+        season=["Winter", "Summer"][i % 2], geographical_location=["India", "Canada"][i % 2],
+    )
+    for i in range(10)
+]
+
+CUSTOMERS = {
+    "C1": dict(browsing_history={"categories": ["Books", "Garden"]}, avg_order_value=60.0, location="Chennai"),
+    "C2": dict(browsing_history='{"categories": ["Fashion"]}', avg_order_value=150.0, location="Canada"),
+    "C3": dict(browsing_history=None, avg_order_value=None, location=None),
+}
+
+@pytest.fixture
+def loaded_engine(monkeypatch):
+    """The shared engine holding CATALOG, with no refresh from the database."""
+    monkeypatch.setattr(settings, "CATALOG_REFRESH_INTERVAL_SECONDS", 3600)
+    monkeypatch.setitem(batch_scoring._catalog_state, "checked_at", time.monotonic())
+    recommendation_engine.load(CATALOG)
+    yield recommendation_engine
+    recommendation_engine.load([])
+
+async def _seed_customers():
+    async with async_write_session() as db:
+        db.add_all([Customer(customer_id=customer_id, **columns) for customer_id, columns in CUSTOMERS.items()])
+        await db.commit()
+
+def test_current_season():
+    days = [date(2024, 1, 15), date(2024, 4, 1), date(2024, 7, 31), date(2024, 11, 30), date(2024, 12, 1)]
+    assert [batch_scoring.current_season(day) for day in days] == ["Winter", "Spring", "Summer", "Autumn", "Winter"]
+
+def test_scoring_profile_maps_city_to_country_and_adds_the_season():
+    row = SimpleNamespace(customer_id="C2", **CUSTOMERS["C2"])
+    assert batch_scoring.scoring_profile(row, today=date(2024, 7, 1)) == {
+        "categories": {"Fashion": 1.0}, "budget": 150.0, "location": "Canada", "season": "Summer",
+    }
+    row = SimpleNamespace(customer_id="C1", **CUSTOMERS["C1"])
+    assert batch_scoring.scoring_profile(row, today=date(2024, 1, 1))["location"] == "India"
+    row = SimpleNamespace(customer_id="C3", **CUSTOMERS["C3"])
+    assert batch_scoring.scoring_profile(row, today=date(2024, 1, 1))["categories"] == {}
+
+def test_check_profile_vocabulary_reports_values_the_catalog_lacks(loaded_engine):
+    assert batch_scoring.check_profile_vocabulary() == ["season=Autumn", "season=Spring"]
+
+def test_score_customers_matches_single_profiles_in_request_order(run_db, loaded_engine):
+    async def body():
+        await _seed_customers()
+        requested = ["C2", "missing", "C1", "C3"]
+        async with async_session() as db:
+            items = [item async for item in batch_scoring.score_customers(db, requested, k=3, chunk_size=2)]
+        assert [item["customer_id"] for item in items] == requested
+        assert items[1] == {"customer_id": "missing", "error": "Customer not found"}
+        for item in (items[0], items[2], items[3]):
+            row = SimpleNamespace(customer_id=item["customer_id"], **CUSTOMERS[item["customer_id"]])
+            expected = loaded_engine.top_k(k=3, **batch_scoring.scoring_profile(row))
+            assert item["recommendations"] == expected
+    run_db(body)
+
+def test_score_all_customers_streams_every_customer_as_ndjson(run_db, loaded_engine):
+    async def body():
+        await _seed_customers()
+        output = io.StringIO()
+        async with async_session() as db:
+            count = await batch_scoring.write_ndjson(batch_scoring.score_all_customers(db, k=2, chunk_size=2), output)
+        lines = [json.loads(line) for line in output.getvalue().splitlines()]
+        assert count == 3
+        assert [line["customer_id"] for line in lines] == ["C1", "C2", "C3"]
+        assert all(len(line["recommendations"]) == 2 for line in lines)
+    run_db(body)
@@ -0,0 +1,39 @@
+from backend.app.models.models import Behavior, Product, User
+from backend.app.services.candidate_service import CandidateGenerator
+from backend.database.database import async_session, async_write_session
+
+async def _seed(products, behaviors=()):
+    async with async_write_session() as db:
+        user = User(email="shopper@example.com", hashed_password="x")
+        db.add(user)
+        db.add_all([Product(id=product_id, **fields) for product_id, fields in products.items()])
+        await db.flush()
+        db.add_all([Behavior(user_id=user.id, product_id=product_id, action_type="view") for product_id in behaviors])
+        await db.commit()
+        return user.id
+
+def test_candidates_are_bounded_and_ranked_by_quality_without_history(run_db):
+    async def body():
+        user_id = await _seed({
+            1: {"name": "low", "price": 5.0, "average_rating": 1.0, "probability_of_recommendation": 0.1},
+            2: {"name": "high", "price": 5.0, "average_rating": 5.0, "probability_of_recommendation": 0.9},
+            3: {"name": "mid", "price": 5.0, "average_rating": 3.0, "probability_of_recommendation": 0.5},
+        })
+        async with async_session() as db:
+            candidates = await CandidateGenerator(limit=2).select_candidates(db, user_id)
+        assert [product.name for product in candidates] == ["high", "mid"]
+    run_db(body)
+
+def test_category_affinity_and_price_band_outrank_quality(run_db):
+    async def body():
+        user_id = await _seed({
+            1: {"name": "viewed", "price": 10.0, "category": "Books"},
+            2: {"name": "same category, in band", "price": 12.0, "category": "Books"},
+            3: {"name": "other category, top rated", "price": 500.0, "category": "Garden",
+                "average_rating": 5.0, "probability_of_recommendation": 1.0},
+        }, behaviors=[1])
+        async with async_session() as db:
+            candidates = await CandidateGenerator().select_candidates(db, user_id)
+        assert [product.id for product in candidates][-1] == 3
+        assert {product.id for product in candidates[:2]} == {1, 2}
+    run_db(body)
@@ -0,0 +1,59 @@
+import json
+
+import httpx
+from fastapi import FastAPI
+
+from backend.app.api import chat
+
+class FakeStreamingClient:
+    def __init__(self, chunks, error=None):
+        self.chunks = chunks
+        self.error = error
+        self.prompts = []
+
+    async def stream(self, prompt):
+        self.prompts.append(prompt)
+        for chunk in self.chunks:
+            yield chunk
+        if self.error is not None:
+            raise self.error
+
+def _events(body):
+    events = []
+    for block in body.strip().split("\n\n"):
+        name, data = block.split("\n")
+        events.append((name[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+async def _post(message):
+    app = FastAPI()
+    app.include_router(chat.router, prefix="/api/v1")
+    async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+        return await client.post("/api/v1/chat/stream", json={"message": message})
+
+def test_tokens_are_streamed_as_events_then_done(run_db, monkeypatch):
+    fake = FakeStreamingClient(["Try ", "", "the oat milk."])
+    monkeypatch.setattr(chat, "llm_client", fake)
+
+    async def body():
+        response = await _post("Any dairy-free options?")
+        assert response.headers["content-type"].startswith("text/event-stream")
+        assert response.headers["cache-control"] == "no-cache"
+        assert _events(response.text) == [
+            ("token", {"text": "Try "}),
+            ("token", {"text": "the oat milk."}),
+            ("done", {"suggested_actions": chat.SUGGESTED_ACTIONS}),
+        ]
+        assert "Customer Query: Any dairy-free options?" in fake.prompts[0]
+    run_db(body)
+
+def test_model_failure_mid_stream_ends_with_an_error_event(run_db, monkeypatch):
+    monkeypatch.setattr(chat, "llm_client", FakeStreamingClient(["Partial"], error=RuntimeError("quota exceeded")))
+
+    async def body():
+        response = await _post("Hello")
+        assert _events(response.text) == [
+            ("token", {"text": "Partial"}),
+            ("error", {"detail": "quota exceeded"}),
+        ]
+    run_db(body)
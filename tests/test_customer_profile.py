@@ -0,0 +1,95 @@
+from datetime import datetime, timedelta
+
+from backend.app.models.customer import Customer
+from backend.app.models.interaction import CustomerInteraction
+from backend.app.services.customer_profile import CustomerProfileCache, render_profile
+from backend.database.database import async_session, async_write_session
+
+async def _seed_customer(customer_id="C1", **columns):
+    values = dict(
+        customer_id=customer_id, age=34, gender="F", location="Chennai",
+        customer_segment="Regular", avg_order_value=42.5, current_mood="happy",
+        browsing_history={"categories": ["Dairy", "Bakery", "Dairy", "Produce", "Bakery"]},
+        purchase_history=[{"product_id": f"P{i}"} for i in range(500)],
+        purchase_count=3, persona_traits=["thrifty", "curious"],
+    )
+    values.update(columns)
+    async with async_write_session() as db:
+        db.add(Customer(**values))
+        await db.commit()
+
+async def _seed_purchases(customer_id, count):
+    start = datetime(2024, 1, 1)
+    async with async_write_session() as db:
+        db.add_all([
+            CustomerInteraction(
+                customer_id=customer_id, action_type="purchase", product_id=f"P{i}",
+                price=float(i), ts=start + timedelta(days=i)
+            )
+            for i in range(count)
+        ])
+        db.add(CustomerInteraction(customer_id=customer_id, action_type="view", product_id="V", ts=start + timedelta(days=99)))
+        await db.commit()
+
+def test_profile_is_a_bounded_snapshot(run_db):
+    async def body():
+        await _seed_customer()
+        await _seed_purchases("C1", 8)
+        async with async_session() as db:
+            profile = await CustomerProfileCache().get(db, "C1")
+        # Ties between Dairy and Bakery go to the one seen most recently
+        assert profile.top_categories == ["Bakery", "Dairy", "Produce"]
+        assert [p["product_id"] for p in profile.recent_purchases] == ["P7", "P6", "P5", "P4", "P3"]
+        assert profile.purchase_count == 3
+        text = render_profile(profile)
+        assert "- Top Categories: Bakery, Dairy, Produce" in text
+        assert "- Recent Purchases (3 total): P7 ($7.00), P6 ($6.00)" in text
+        assert "- Persona Traits: thrifty, curious" in text
+        assert "P499" not in text
+    run_db(body)
+
+def test_missing_customer_is_none_and_not_cached(run_db):
+    async def body():
+        cache = CustomerProfileCache()
+        async with async_session() as db:
+            assert await cache.get(db, "nobody") is None
+            await _seed_customer("nobody")
+            assert (await cache.get(db, "nobody")).customer_id == "nobody"
+    run_db(body)
+
+def test_cached_until_invalidated(run_db):
+    async def body():
+        await _seed_customer()
+        cache = CustomerProfileCache()
+        async with async_session() as db:
+            first = await cache.get(db, "C1")
+            await _seed_purchases("C1", 1)
+            assert await cache.get(db, "C1") is first
+            cache.invalidate("C1")
+            refreshed = await cache.get(db, "C1")
+        assert refreshed is not first
+        assert [p["product_id"] for p in refreshed.recent_purchases] == ["P0"]
+    run_db(body)
+
+def test_entries_expire_after_the_ttl(run_db):
+    async def body():
+        await _seed_customer()
+        cache = CustomerProfileCache(ttl_seconds=-1)
+        async with async_session() as db:
+            first = await cache.get(db, "C1")
+            assert await cache.get(db, "C1") is not first
+    run_db(body)
+
+def test_least_recently_used_entry_is_evicted(run_db):
+    async def body():
+        for customer_id in ("A", "B", "C"):
+            await _seed_customer(customer_id)
+        cache = CustomerProfileCache(max_size=2)
+        async with async_session() as db:
+            a = await cache.get(db, "A")
+            await cache.get(db, "B")
+            await cache.get(db, "A")
+            await cache.get(db, "C")
+            assert list(cache._entries) == ["A", "C"]
+            assert await cache.get(db, "A") is a
+    run_db(body)
@@ -0,0 +1,35 @@
+import asyncio
+
+from sqlalchemy import text
+
+from backend.app.core.config import settings
+from backend.database.database import engine, write_engine
+
+def test_sqlite_connections_are_tuned(run_db):
+    async def body():
+        async with engine.connect() as conn:
+            pragmas = {
+                name: (await conn.execute(text(f"PRAGMA {name}"))).scalar()
+                for name in ("journal_mode", "synchronous", "busy_timeout", "temp_store")
+            }
+        assert pragmas == {
+            "journal_mode": "wal",
+            "synchronous": 1,  # NORMAL
+            "busy_timeout": settings.SQLITE_BUSY_TIMEOUT_MS,
+            "temp_store": 2,  # MEMORY
+        }
+    run_db(body)
+
+def test_reads_are_pooled_and_writes_share_one_connection(run_db):
+    async def body():
+        async def connection_id(target):
+            async with target.connect() as conn:
+                raw = await conn.get_raw_connection()
+                await asyncio.sleep(0.01)
+                return id(raw.driver_connection)
+
+        readers = await asyncio.gather(*(connection_id(engine) for _ in range(3)))
+        writers = await asyncio.gather(*(connection_id(write_engine) for _ in range(3)))
+        assert len(set(readers)) == 3
+        assert len(set(writers)) == 1
+    run_db(body)
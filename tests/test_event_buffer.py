@@ -0,0 +1,60 @@
+import asyncio
+
+from sqlalchemy import func, select
+
+from backend.app.models.models import Behavior
+from backend.app.services.event_buffer import BehaviorEventBuffer
+from backend.database.database import async_session
+
+async def _stored():
+    async with async_session() as db:
+        return await db.scalar(select(func.count(Behavior.id)))
+
+async def _wait_for(count, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while await _stored() < count and asyncio.get_running_loop().time() < deadline:
+        await asyncio.sleep(0.01)
+    return await _stored()
+
+def test_full_batch_is_written_without_waiting_for_the_interval(run_db):
+    async def body():
+        buffer = BehaviorEventBuffer(batch_size=3, flush_interval=1.0)
+        await buffer.start()
+        for product_id in range(3):
+            assert await buffer.record(1, product_id, "view")
+        assert await _wait_for(3, timeout=0.5) == 3
+        await buffer.stop()
+    run_db(body)
+
+def test_partial_batch_is_written_after_the_interval(run_db):
+    async def body():
+        buffer = BehaviorEventBuffer(batch_size=100, flush_interval=0.05)
+        await buffer.start()
+        await buffer.record(1, 1, "view", {"source": "test"})
+        assert await _stored() == 0
+        assert await _wait_for(1) == 1
+        async with async_session() as db:
+            behavior = (await db.execute(select(Behavior))).scalars().one()
+        assert (behavior.user_id, behavior.product_id, behavior.action_type, behavior.context) == (
+            1, 1, "view", {"source": "test"}
+        )
+        await buffer.stop()
+    run_db(body)
+
+def test_stop_flushes_everything_queued(run_db):
+    async def body():
+        buffer = BehaviorEventBuffer(batch_size=4, flush_interval=0.2)
+        await buffer.start()
+        for product_id in range(10):
+            await buffer.record(1, product_id, "view")
+        await buffer.stop()
+        assert await _stored() == 10
+        assert not buffer.running
+    run_db(body)
+
+def test_events_are_dropped_when_the_queue_stays_full():
+    async def body():
+        buffer = BehaviorEventBuffer(max_size=1, put_timeout=0.01)
+        assert await buffer.record(1, 1, "view") is True
+        assert await buffer.record(1, 2, "view") is False
+    asyncio.run(body())
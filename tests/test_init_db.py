@@ -0,0 +1,98 @@
+import pandas as pd
+from sqlalchemy import func, insert, select, update
+
+from backend.app.core import init_db
+from backend.app.models.customer import BEHAVIOR_TRACKED_COLUMNS
+from backend.app.models.models import Customer, CustomerInteraction, IngestionCheckpoint
+
+def _write_customers(path, count, avg_order_value=100.0):
+    pd.DataFrame({
+        "Customer_ID": [f"C{i}" for i in range(count)],
+        "Age": [30] * count,
+        "Gender": ["Female"] * count,
+        "Location": ["Delhi"] * count,
+        "Browsing_History": ["['Books', 'Fashion']"] * count,
+        "Customer_Segment": ["New Visitor"] * count,
+        "Avg_Order_Value": [avg_order_value] * count,
+    }).to_csv(path, index=False)
+
+async def _load(path, **kwargs):
+    return await init_db.load_csv(
+        "customers", path, Customer, "customer_id", init_db.CUSTOMER_COLUMNS, init_db.customer_rows, **kwargs
+    )
+
+async def _scalar(query):
+    async with init_db.write_engine.connect() as conn:
+        return (await conn.execute(query)).scalar()
+
+def test_parse_list_column():
+    series = pd.Series(["['Books', 'Fashion']", '["A"]', "[]", None])
+    assert init_db.parse_list_column(series).tolist() == [["Books", "Fashion"], ["A"], [], []]
+
+def test_load_csv_writes_in_chunks_and_records_the_checkpoint(run_db, tmp_path):
+    path = tmp_path / "customers.csv"
+    _write_customers(path, 5)
+
+    async def body():
+        assert await _load(path, chunk_size=2) == 5
+        assert await _scalar(select(func.count(Customer.id))) == 5
+        assert await _scalar(select(IngestionCheckpoint.rows_loaded)) == 5
+        stored = await _scalar(select(Customer.browsing_history).where(Customer.customer_id == "C0"))
+        assert stored == {"categories": ["Books", "Fashion"]}
+    run_db(body)
+
+def test_resume_continues_after_the_last_committed_batch(run_db, tmp_path):
+    path = tmp_path / "customers.csv"
+    _write_customers(path, 3)
+
+    async def body():
+        await _load(path, chunk_size=2)
+        # The file grows; a resumed run only reads the new rows
+        _write_customers(path, 5)
+        assert await _load(path, chunk_size=2, resume=True) == 2
+        assert await _scalar(select(func.count(Customer.id))) == 5
+        assert await _scalar(select(IngestionCheckpoint.rows_loaded)) == 5
+    run_db(body)
+
+def test_reloading_skips_existing_rows_unless_upserting(run_db, tmp_path):
+    path = tmp_path / "customers.csv"
+    _write_customers(path, 2, avg_order_value=100.0)
+    avg_order_value = select(Customer.avg_order_value).where(Customer.customer_id == "C0")
+
+    async def body():
+        await _load(path)
+        _write_customers(path, 2, avg_order_value=250.0)
+        await _load(path)
+        assert await _scalar(avg_order_value) == 100.0
+        await _load(path, upsert=True)
+        assert await _scalar(avg_order_value) == 250.0
+        assert await _scalar(select(func.count(Customer.id))) == 2
+    run_db(body)
+
+def test_upsert_keeps_tracked_columns_only_for_tracked_customers(run_db, tmp_path):
+    path = tmp_path / "customers.csv"
+    _write_customers(path, 2, avg_order_value=100.0)
+
+    async def column(name, customer_id):
+        return await _scalar(select(getattr(Customer, name)).where(Customer.customer_id == customer_id))
+
+    async def body():
+        await _load(path)
+        async with init_db.write_engine.begin() as conn:
+            await conn.execute(insert(CustomerInteraction).values(
+                customer_id="C0", action_type="purchase", product_id="P1", price=5.0
+            ))
+            await conn.execute(update(Customer).where(Customer.customer_id == "C0").values(
+                avg_order_value=55.0, browsing_history={"categories": ["Toys"]}
+            ))
+        _write_customers(path, 2, avg_order_value=250.0)
+        await _load(
+            path, upsert=True,
+            preserve=BEHAVIOR_TRACKED_COLUMNS, preserve_when=init_db.has_tracked_behavior()
+        )
+        assert await column("avg_order_value", "C0") == 55.0
+        assert await column("browsing_history", "C0") == {"categories": ["Toys"]}
+        assert await column("avg_order_value", "C1") == 250.0
+        # Columns outside the tracked set still take the CSV value
+        assert await column("age", "C0") == 30
+    run_db(body)
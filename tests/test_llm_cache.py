@@ -0,0 +1,82 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from backend.app.models.models import Behavior, MoodState, Persona, Product, User
+from backend.app.services import llm_cache
+from backend.app.services.genai_service import GenAIService
+from backend.app.services.llm_cache import InMemoryLLMCache, LLMCacheBackend, LLMResponseCache, SQLiteLLMCache
+
+def test_key_ignores_whitespace_but_not_model_or_generation_config():
+    key = LLMResponseCache.make_key
+    assert key("m", "a   b\n  c") == key("m", "a b c")
+    assert key("m", "a b") != key("other", "a b")
+    assert key("m", "a b") != key("m", "a b", {"response_mime_type": "application/json"})
+    assert key("m", "a b", {"x": 1, "y": 2}) == key("m", "a b", {"y": 2, "x": 1})
+
+def test_backend_interface_is_abstract():
+    with pytest.raises(TypeError):
+        LLMCacheBackend()
+
+def test_in_memory_cache_evicts_least_recently_used():
+    cache = InMemoryLLMCache(max_entries=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    assert cache.get("a") == "1"
+    cache.set("c", "3")
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c"), len(cache)) == ("1", "3", 2)
+
+@pytest.mark.parametrize("make_backend", [
+    lambda tmp_path: InMemoryLLMCache(ttl_seconds=60),
+    lambda tmp_path: SQLiteLLMCache(str(tmp_path / "cache.db"), ttl_seconds=60),
+])
+def test_entries_expire_after_the_ttl(make_backend, tmp_path, monkeypatch):
+    backend = make_backend(tmp_path)
+    now = [1000.0]
+    monkeypatch.setattr(llm_cache.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(llm_cache.time, "time", lambda: now[0])
+    backend.set("k", "v")
+    now[0] += 59
+    assert backend.get("k") == "v"
+    now[0] += 2
+    assert backend.get("k") is None
+
+def test_sqlite_cache_persists_and_evicts(tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache = SQLiteLLMCache(path, max_entries=2)
+    for key in ("a", "b", "c"):
+        cache.set(key, key.upper())
+    assert len(cache) == 2
+    assert SQLiteLLMCache(path).get("c") == "C"
+
+def test_response_cache_counts_hits_and_misses():
+    cache = LLMResponseCache(InMemoryLLMCache(), name="test_llm_cache")
+    assert cache.get("m", "prompt") is None
+    cache.set("m", "prompt", "answer")
+    assert cache.get("m", "  prompt ") == "answer"
+    assert cache.stats() == {"hits": 1, "misses": 1, "entries": 1}
+
+def _user():
+    user = User(id=1, preferences={"diet": "vegan"})
+    user.behaviors = [Behavior(id=1, product_id=2, action_type="view", created_at=datetime(2026, 1, 1))]
+    user.mood_states = [MoodState(id=1, mood="happy", intensity=0.5, created_at=datetime(2026, 1, 1))]
+    user.personas = [Persona(id=1, name="Planner", traits={"thrifty": True})]
+    return user
+
+def test_recommendation_prompt_is_stable_across_requests(monkeypatch):
+    service = GenAIService()
+    prompts = []
+
+    async def stream(prompt, **kwargs):
+        prompts.append(prompt)
+        yield "[]"
+    monkeypatch.setattr(service.llm, "stream", stream)
+    products = [Product(id=2, name="Oats", price=3.0, category="Food")]
+
+    # Fresh ORM objects each time, as separate requests would load them
+    for _ in range(2):
+        asyncio.run(service.generate_recommendations(_user(), products, None))
+    assert prompts[0] == prompts[1]
+    assert "_sa_instance_state" not in prompts[0]
@@ -0,0 +1,101 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from backend.app.core.config import settings
+from backend.app.services import llm_client
+from backend.app.services.llm_cache import InMemoryLLMCache, LLMResponseCache
+from backend.app.services.llm_client import AsyncLLMClient
+
+class AsyncModel:
+    """Stands in for a GenerativeModel with the async API."""
+    model_name = "models/fake"
+
+    def __init__(self, delay=0.0, chunks=("[", "]")):
+        self.delay = delay
+        self.chunks = chunks
+        self.calls = 0
+        self.active = 0
+        self.peak = 0
+
+    async def generate_content_async(self, prompt, generation_config=None, stream=False):
+        self.calls += 1
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        if stream:
+            return self._stream()
+        return SimpleNamespace(text="".join(self.chunks))
+
+    async def _stream(self):
+        for chunk in self.chunks:
+            yield SimpleNamespace(text=chunk)
+
+class BlockingModel:
+    """Stands in for an older SDK model that only has the blocking call."""
+    model_name = "models/blocking"
+
+    def __init__(self):
+        self.threads = []
+
+    def generate_content(self, prompt, generation_config=None):
+        self.threads.append(threading.current_thread().name)
+        return SimpleNamespace(text="done")
+
+@pytest.fixture
+def make_client(monkeypatch):
+    # The semaphore binds to the event loop that first uses it; each test runs its own loop
+    monkeypatch.setattr(llm_client, "_semaphore", None)
+
+    def make(model):
+        client = AsyncLLMClient("fake", cache=LLMResponseCache(InMemoryLLMCache(), name="test_llm_client_cache"))
+        client.model = model
+        return client
+    return make
+
+def test_generate_caches_responses(make_client):
+    model = AsyncModel()
+    client = make_client(model)
+
+    async def body():
+        assert await client.generate("prompt") == "[]"
+        assert await client.generate("  prompt") == "[]"
+        assert await client.generate("prompt", use_cache=False) == "[]"
+    asyncio.run(body())
+    assert model.calls == 2
+
+def test_generate_times_out(make_client):
+    client = make_client(AsyncModel(delay=1.0))
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(client.generate("prompt", timeout=0.01))
+
+def test_concurrency_is_bounded(make_client, monkeypatch):
+    monkeypatch.setattr(settings, "LLM_MAX_CONCURRENCY", 2)
+    model = AsyncModel(delay=0.02)
+    client = make_client(model)
+
+    async def body():
+        await asyncio.gather(*(client.generate(f"prompt {i}") for i in range(6)))
+    asyncio.run(body())
+    assert model.calls == 6 and model.peak == 2
+
+def test_blocking_sdk_runs_off_the_event_loop(make_client):
+    model = BlockingModel()
+    client = make_client(model)
+    assert asyncio.run(client.generate("prompt")) == "done"
+    assert model.threads[0].startswith("llm")
+
+def test_stream_yields_chunks_then_serves_the_joined_text_from_cache(make_client):
+    model = AsyncModel(chunks=('[{"a"', ': 1}', "]"))
+    client = make_client(model)
+
+    async def collect():
+        return [chunk async for chunk in client.stream("prompt")]
+    assert asyncio.run(collect()) == ['[{"a"', ": 1}", "]"]
+    assert asyncio.run(collect()) == ['[{"a": 1}]']
+    assert model.calls == 1
@@ -0,0 +1,103 @@
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import func, insert, select
+
+from backend.app.core.config import settings
+from backend.app.models.customer import Customer
+from backend.app.models.models import CatalogRecommendationRun, CatalogRecommendationStaging
+from backend.app.services import batch_scoring, precompute
+from backend.app.services.recommendation_engine import recommendation_engine
+from backend.database.database import async_session, async_write_session
+
+CATALOG = [
+    SimpleNamespace(
+        product_id=f"P{i}", brand=f"Brand {i}", category=["Books", "Fashion", "Garden"][i % 3],
+        price=20.0 + 15 * i, average_rating=3.0 + i % 3 * 0.5, product_rating=4.0,
+        review_sentiment_score=0.5, probability_of_recommendation=i / 10,
+        season=["Winter", "Summer"][i % 2], geographical_location=["India", "Canada"][i % 2],
+    )
+    for i in range(10)
+]
+
+CUSTOMERS = [
+    SimpleNamespace(customer_id=f"C{i}", browsing_history={"categories": [CATALOG[i].category]},
+                    avg_order_value=30.0 * (i + 1), location=["Delhi", "Canada"][i % 2])
+    for i in range(5)
+]
+
+@pytest.fixture
+def loaded_engine(monkeypatch):
+    """The shared engine holding CATALOG, with no refresh from the database."""
+    monkeypatch.setattr(settings, "CATALOG_REFRESH_INTERVAL_SECONDS", 3600)
+    monkeypatch.setitem(batch_scoring._catalog_state, "checked_at", time.monotonic())
+    recommendation_engine.load(CATALOG)
+    yield recommendation_engine
+    recommendation_engine.load([])
+
+async def _seed_customers():
+    async with async_write_session() as db:
+        db.add_all([Customer(**vars(customer)) for customer in CUSTOMERS])
+        await db.commit()
+
+async def _runs():
+    async with async_session() as db:
+        result = await db.execute(select(CatalogRecommendationRun.run_id, CatalogRecommendationRun.completed_at))
+        return dict(result.all())
+
+async def _staged_run_ids():
+    async with async_session() as db:
+        result = await db.execute(select(CatalogRecommendationStaging.run_id).distinct())
+        return set(result.scalars().all())
+
+def test_completed_run_matches_the_engine_and_replaces_older_runs(run_db, loaded_engine):
+    async def body():
+        await _seed_customers()
+        first = await precompute.precompute(k=3, workers=1, slice_size=2)
+        second = await precompute.precompute(k=3, workers=1, slice_size=2)
+
+        runs = await _runs()
+        assert list(runs) == [second] and runs[second] is not None
+        assert await _staged_run_ids() == {second}
+        async with async_session() as db:
+            for customer in CUSTOMERS:
+                rows = await precompute.load_precomputed(db, customer.customer_id)
+                expected = loaded_engine.top_k(k=3, **batch_scoring.scoring_profile(customer))
+                assert [(row.product_id, row.score) for row in rows] == [
+                    (item["product_id"], item["match_score"]) for item in expected
+                ]
+            assert await db.scalar(select(func.count(CatalogRecommendationStaging.id))) == 3 * len(CUSTOMERS)
+        assert first != second
+    run_db(body)
+
+def test_readers_ignore_runs_that_have_not_completed(run_db, loaded_engine):
+    async def body():
+        await _seed_customers()
+        await precompute.precompute(k=2, workers=1)
+        async with async_write_session() as db:
+            await db.execute(insert(CatalogRecommendationRun).values(run_id="partial", k=2, started_at=datetime.utcnow()))
+            await db.execute(insert(CatalogRecommendationStaging).values(
+                run_id="partial", customer_id="C0", rank=1, product_id="P-partial", score=1.0
+            ))
+            await db.commit()
+        async with async_session() as db:
+            rows = await precompute.load_precomputed(db, "C0")
+        assert len(rows) == 2 and "P-partial" not in [row.product_id for row in rows]
+    run_db(body)
+
+def test_failed_run_removes_its_rows_and_keeps_the_published_one(run_db, loaded_engine, monkeypatch):
+    async def body():
+        await _seed_customers()
+        published = await precompute.precompute(k=2, workers=1)
+
+        def broken(row):
+            raise RuntimeError("bad profile")
+        monkeypatch.setattr(precompute, "scoring_profile", broken)
+        with pytest.raises(RuntimeError):
+            await precompute.precompute(k=2, workers=1)
+
+        assert list(await _runs()) == [published]
+        assert await _staged_run_ids() == {published}
+    run_db(body)
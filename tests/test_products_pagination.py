@@ -0,0 +1,69 @@
+from backend.app.models.models import Product
+from backend.database.database import async_write_session
+
+async def _seed():
+    async with async_write_session() as db:
+        db.add_all([
+            Product(id=i, name=f"Product {i}", price=float(10 * (i % 4)), category="Food" if i % 2 else "Home")
+            for i in range(1, 11)
+        ])
+        await db.commit()
+
+async def _pages(client, **params):
+    pages, cursor = [], None
+    while True:
+        query = dict(params, **({"cursor": cursor} if cursor else {}))
+        response = await client.get("/api/v1/products/", params=query)
+        assert response.status_code == 200
+        pages.append(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return pages
+
+def test_cursor_pages_cover_every_product_once(run_db, api_client):
+    async def body():
+        await _seed()
+        async with api_client() as client:
+            pages = await _pages(client, limit=3)
+        assert [len(page) for page in pages] == [3, 3, 3, 1]
+        assert [product["id"] for page in pages for product in page] == list(range(1, 11))
+    run_db(body)
+
+def test_price_order_breaks_ties_by_id_across_page_boundaries(run_db, api_client):
+    async def body():
+        await _seed()
+        async with api_client() as client:
+            pages = await _pages(client, limit=4, sort="price")
+        ordered = [(product["price"], product["id"]) for page in pages for product in page]
+        assert ordered == sorted(ordered)
+        assert len(ordered) == 10
+    run_db(body)
+
+def test_filters_and_sparse_fields(run_db, api_client):
+    async def body():
+        await _seed()
+        async with api_client() as client:
+            response = await client.get("/api/v1/products/", params={
+                "category": "Food", "min_price": 10, "max_price": 20, "fields": "name,price"
+            })
+            unknown = await client.get("/api/v1/products/", params={"fields": "name,secret"})
+        assert response.json() == [
+            {"id": 1, "name": "Product 1", "price": 10.0},
+            {"id": 5, "name": "Product 5", "price": 10.0},
+            {"id": 9, "name": "Product 9", "price": 10.0},
+        ]
+        assert unknown.status_code == 400
+    run_db(body)
+
+def test_bad_cursors_are_rejected(run_db, api_client):
+    async def body():
+        await _seed()
+        async with api_client() as client:
+            first = await client.get("/api/v1/products/", params={"limit": 2})
+            garbage = await client.get("/api/v1/products/", params={"cursor": "not base64!"})
+            mismatched = await client.get("/api/v1/products/", params={
+                "cursor": first.headers["X-Next-Cursor"], "sort": "price"
+            })
+        assert garbage.status_code == 400
+        assert mismatched.status_code == 400
+    run_db(body)
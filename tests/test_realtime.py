@@ -0,0 +1,47 @@
+import asyncio
+
+from backend.app.models.models import Product
+from backend.app.services.realtime import UpdateHub
+from backend.database.database import async_write_session
+
+def test_publish_reaches_every_connection_of_that_user_only():
+    async def body():
+        hub = UpdateHub(max_queue_size=10)
+        first, second, other = hub.subscribe(1), hub.subscribe(1), hub.subscribe(2)
+        hub.publish(1, "hello")
+        assert (await first.get())["message"] == "hello"
+        assert (await second.get())["message"] == "hello"
+        assert other.queue.empty()
+
+        hub.unsubscribe(first)
+        hub.unsubscribe(second)
+        assert not hub.has_subscribers(1)
+        hub.publish(1, "nobody listening")
+        assert hub.subscriber_count() == 1
+    asyncio.run(body())
+
+def test_slow_consumer_is_dropped_with_an_end_marker():
+    async def body():
+        hub = UpdateHub(max_queue_size=2)
+        slow = hub.subscribe(1)
+        for i in range(3):
+            hub.publish(1, f"update {i}")
+        assert slow.overflowed
+        assert not hub.has_subscribers(1)
+        assert await slow.get() is None
+    asyncio.run(body())
+
+def test_behavior_updates_name_the_product(run_db):
+    async def body():
+        async with async_write_session() as db:
+            db.add(Product(id=7, name="Oats", price=3.0))
+            await db.commit()
+        hub = UpdateHub()
+        subscription = hub.subscribe(1)
+        await hub.publish_behaviors([
+            {"user_id": 1, "product_id": 7, "action_type": "view"},
+            {"user_id": 2, "product_id": 7, "action_type": "view"},
+        ])
+        assert (await subscription.get())["message"] == "New activity: view on Oats"
+        assert subscription.queue.empty()
+    run_db(body)
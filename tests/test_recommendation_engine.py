@@ -0,0 +1,122 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import numpy as np
+from sqlalchemy import update
+
+from backend.app.core.config import settings
+from backend.app.models.models import CatalogProduct
+from backend.app.services import batch_scoring
+from backend.app.services.recommendation_engine import RecommendationEngine, recommendation_engine
+from backend.database.database import async_session, async_write_session
+
+CATEGORIES = ["Books", "Fashion", "Garden", "Sports"]
+SEASONS = ["Winter", "Summer"]
+LOCATIONS = ["India", "Canada"]
+
+def _catalog(size=40, seed=7):
+    rng = np.random.default_rng(seed)
+    return [
+        SimpleNamespace(
+            product_id=f"P{i}",
+            brand=f"Brand {i % 5}",
+            category=CATEGORIES[i % len(CATEGORIES)],
+            price=float(rng.uniform(10, 500)),
+            average_rating=float(rng.uniform(1, 5)),
+            product_rating=float(rng.uniform(1, 5)),
+            review_sentiment_score=float(rng.uniform(0, 1)),
+            probability_of_recommendation=float(rng.uniform(0, 1)),
+            season=SEASONS[i % len(SEASONS)],
+            geographical_location=LOCATIONS[i % len(LOCATIONS)],
+        )
+        for i in range(size)
+    ]
+
+PROFILES = [
+    {"categories": {"Books": 1.0}, "budget": 100.0, "season": "Winter", "location": "India"},
+    {"categories": {"Garden": 0.5, "Sports": 1.0}, "budget": 400.0},
+    {},
+]
+
+def _engine(products=None):
+    engine = RecommendationEngine(initial_capacity=4)
+    engine.load(products or _catalog())
+    return engine
+
+def test_top_k_matches_a_full_sort_of_the_scores():
+    engine = _engine()
+    for profile in PROFILES:
+        scores = engine.score(**profile)
+        expected = sorted(range(len(scores)), key=lambda row: -scores[row])[:5]
+        top = engine.top_k(k=5, **profile)
+        assert [item["product_id"] for item in top] == [f"P{row}" for row in expected]
+        assert [item["match_score"] for item in top] == [round(float(scores[row]), 4) for row in expected]
+
+def test_batch_scoring_matches_single_profiles():
+    engine = _engine()
+    batch = engine.score_batch(PROFILES)
+    for row, profile in zip(batch, PROFILES):
+        np.testing.assert_allclose(row, engine.score(**profile))
+    assert engine.top_k_batch(PROFILES, k=3) == [engine.top_k(k=3, **profile) for profile in PROFILES]
+
+def test_profile_terms_raise_matching_products():
+    engine = _engine()
+    base = engine.score(budget=100.0)
+    in_season = engine.score(budget=100.0, season="Winter")
+    winter = np.array([product.season == "Winter" for product in _catalog()])
+    np.testing.assert_allclose(in_season[winter] - base[winter], RecommendationEngine.WEIGHTS["season"])
+    np.testing.assert_allclose(in_season[~winter], base[~winter])
+
+def test_k_larger_than_the_catalog_and_empty_engine():
+    engine = _engine(_catalog(size=3))
+    assert len(engine.top_k(k=10)) == 3
+    assert RecommendationEngine().top_k(k=5) == []
+
+def test_add_products_updates_in_place_and_appends():
+    engine = _engine(_catalog(size=3))
+    changed = SimpleNamespace(**dict(vars(_catalog(size=3)[0]), brand="Renamed", price=1.0))
+    added = SimpleNamespace(**dict(vars(_catalog(size=3)[1]), product_id="P-new"))
+    engine.add_products([changed, added])
+
+    assert len(engine) == 4
+    assert engine.lookup(["P0", "P-new", "missing"]) == [
+        {"product_id": "P0", "brand": "Renamed", "category": "Books", "price": 1.0},
+        {"product_id": "P-new", "brand": added.brand, "category": added.category, "price": added.price},
+    ]
+
+def _catalog_row(product_id, brand, updated_at):
+    return CatalogProduct(
+        product_id=product_id, brand=brand, category="Books", price=10.0,
+        season="Winter", geographical_location="India", updated_at=updated_at
+    )
+
+def test_ensure_catalog_loaded_applies_rows_written_after_the_first_load(run_db, monkeypatch):
+    monkeypatch.setattr(settings, "CATALOG_REFRESH_INTERVAL_SECONDS", 0)
+    monkeypatch.setitem(batch_scoring._catalog_state, "loaded_through", None)
+    recommendation_engine.load([])
+    loaded_at = datetime.utcnow() - timedelta(minutes=5)
+
+    async def body():
+        async with async_write_session() as db:
+            db.add_all([_catalog_row("P1", "Old", loaded_at), _catalog_row("P2", "Kept", loaded_at)])
+            await db.commit()
+        async with async_session() as db:
+            await batch_scoring.ensure_catalog_loaded(db)
+        assert len(recommendation_engine) == 2
+
+        # What a later loader batch looks like: an upserted row and a new one, stamped on write
+        async with async_write_session() as db:
+            await db.execute(update(CatalogProduct).where(CatalogProduct.product_id == "P1").values(
+                brand="New", updated_at=datetime.utcnow()
+            ))
+            db.add(_catalog_row("P3", "Added", datetime.utcnow()))
+            await db.commit()
+        async with async_session() as db:
+            await batch_scoring.ensure_catalog_loaded(db)
+
+        assert len(recommendation_engine) == 3
+        assert [item["brand"] for item in recommendation_engine.lookup(["P1", "P2", "P3"])] == ["New", "Kept", "Added"]
+    try:
+        run_db(body)
+    finally:
+        recommendation_engine.load([])
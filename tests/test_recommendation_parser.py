@@ -0,0 +1,63 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from backend.app.services.recommendation_parser import StreamingRecommendationParser
+
+PRODUCTS = [SimpleNamespace(id=product_id) for product_id in (1, 2, 3)]
+
+RESPONSE = (
+    '```json\n'
+    '[\n'
+    '  {"product_id": 1, "score": 0.9, "reasoning": "Pairs with {pasta} nights", "interest": "dinner"},\n'
+    '  {"product_id": 2, "score": 0.7, "reasoning": "Say \\"cheese\\" } ] {", "interest": "snacks"},\n'
+    '  {"product_id": 3, "score": 0.5, "reasoning": "Back\\\\slash", "interest": "misc"}\n'
+    ']\n'
+    '```'
+)
+
+def _parse(text, chunk_size):
+    parser = StreamingRecommendationParser(PRODUCTS)
+    results = []
+    for start in range(0, len(text), chunk_size):
+        results.extend(parser.feed(text[start:start + chunk_size]))
+    return results
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, len(RESPONSE)])
+def test_chunk_boundaries_do_not_change_the_result(chunk_size):
+    results = _parse(RESPONSE, chunk_size)
+    assert [(r["product_id"], r["score"], r["reasoning"], r["interest"]) for r in results] == [
+        (1, 0.9, "Pairs with {pasta} nights", "dinner"),
+        (2, 0.7, 'Say "cheese" } ] {', "snacks"),
+        (3, 0.5, "Back\\slash", "misc"),
+    ]
+    assert [r["product"] for r in results] == PRODUCTS
+
+def test_objects_are_returned_as_soon_as_they_close():
+    parser = StreamingRecommendationParser(PRODUCTS)
+    assert parser.feed('[{"product_id": 1, "score": 1') == []
+    first = parser.feed(', "reasoning": "a", "interest": "b"}, {"product_id": 2')
+    assert [r["product_id"] for r in first] == [1]
+    assert [r["product_id"] for r in parser.feed(', "score": 0.2}]')] == [2]
+
+def test_braces_in_a_preamble_are_ignored():
+    text = 'note: { "draft": 1 }\n' + json.dumps([{"product_id": 3, "score": 0.4}])
+    for chunk_size in (1, len(text)):
+        results = _parse(text, chunk_size)
+        assert [(r["product_id"], r["reasoning"], r["interest"]) for r in results] == [(3, "", "")]
+
+def test_unknown_and_malformed_objects_are_skipped():
+    text = (
+        '[{"product_id": 99, "score": 0.9},'
+        ' {"product_id": "x", "score": 0.9},'
+        ' {"score": 0.9},'
+        ' {"product_id": 1, "score": 0.9,},'
+        ' {"product_id": 2, "score": "0.8", "extra": {"nested": [1, 2]}}]'
+    )
+    results = _parse(text, 5)
+    assert [(r["product_id"], r["score"]) for r in results] == [(2, 0.8)]
+
+def test_text_after_the_array_is_ignored():
+    text = json.dumps([{"product_id": 1, "score": 0.9}]) + ' trailing {"product_id": 2, "score": 0.1}'
+    assert [r["product_id"] for r in _parse(text, 4)] == [1]
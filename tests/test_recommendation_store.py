@@ -0,0 +1,133 @@
+import asyncio
+from datetime import timedelta
+
+from sqlalchemy import func, select, update
+
+from backend.app.models.models import Behavior, Product, Recommendation
+from backend.app.services.recommendation_store import RecommendationStore
+from backend.database.database import async_session, async_write_session
+
+class CountingStore(RecommendationStore):
+    def __init__(self, **kwargs):
+        super().__init__(**{"ttl_seconds": 60, "max_stale_seconds": 3600, "generations_kept": 2, **kwargs})
+        self.user_loads = 0
+
+    async def load_user(self, db, user_id):
+        self.user_loads += 1
+        return await super().load_user(db, user_id)
+
+class Generator:
+    """Returns a new ranking on every call, so generations can be told apart."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def __call__(self, db, user):
+        self.calls += 1
+        return [
+            {"product_id": 1, "score": 0.5, "reasoning": f"call {self.calls}", "interest": "a"},
+            {"product_id": 2, "score": 0.9, "reasoning": f"call {self.calls}", "interest": "b"},
+        ]
+
+async def _seed_products():
+    async with async_write_session() as db:
+        db.add_all([Product(id=1, name="Milk", price=1.0), Product(id=2, name="Bread", price=2.0)])
+        await db.commit()
+
+async def _age_generations(user_id, by):
+    async with async_write_session() as db:
+        stamps = (await db.execute(select(Recommendation.created_at).filter(
+            Recommendation.user_id == user_id
+        ).distinct().order_by(Recommendation.created_at))).scalars().all()
+        for created_at in stamps:
+            await db.execute(update(Recommendation).where(
+                Recommendation.user_id == user_id, Recommendation.created_at == created_at
+            ).values(created_at=created_at - by))
+        await db.commit()
+
+async def _generations(user_id):
+    async with async_session() as db:
+        return await db.scalar(select(func.count(func.distinct(Recommendation.created_at))).filter(
+            Recommendation.user_id == user_id
+        ))
+
+def test_miss_generates_and_fresh_generation_is_served_as_is(run_db, sign_in):
+    async def body():
+        await _seed_products()
+        user_id, _ = await sign_in()
+        store, generate = CountingStore(), Generator()
+        async with async_session() as db:
+            rows = await store.get(db, user_id, generate)
+            again = await store.get(db, user_id, generate)
+        assert [(row.product_id, row.reason, row.context["interest"]) for row in rows] == [
+            (2, "call 1", "b"), (1, "call 1", "a")
+        ]
+        assert rows[0].product.name == "Bread"
+        assert [row.id for row in again] == [row.id for row in rows]
+        assert (generate.calls, store.user_loads) == (1, 1)
+    run_db(body)
+
+def test_missing_user_gets_nothing(run_db):
+    async def body():
+        store, generate = CountingStore(), Generator()
+        async with async_session() as db:
+            assert await store.get(db, 999, generate) == []
+        assert generate.calls == 0
+    run_db(body)
+
+def test_new_behavior_serves_the_stored_generation_and_refreshes_in_the_background(run_db, sign_in):
+    async def body():
+        await _seed_products()
+        user_id, _ = await sign_in()
+        store, generate = CountingStore(), Generator()
+        async with async_session() as db:
+            await store.get(db, user_id, generate)
+        await _age_generations(user_id, timedelta(seconds=1))
+        async with async_write_session() as db:
+            db.add(Behavior(user_id=user_id, product_id=1, action_type="view"))
+            await db.commit()
+
+        async with async_session() as db:
+            rows = await store.get(db, user_id, generate)
+            assert {row.reason for row in rows} == {"call 1"}
+            # A second stale read while the refresh runs does not start another
+            await store.get(db, user_id, generate)
+        assert len(store._refreshing) == 1
+        await asyncio.gather(*list(store._refreshing.values()))
+
+        async with async_session() as db:
+            rows, _ = await store.latest(db, user_id)
+        assert {row.reason for row in rows} == {"call 2"}
+        assert (generate.calls, store.user_loads) == (2, 2)
+        assert store._refreshing == {}
+    run_db(body)
+
+def test_generation_past_max_staleness_is_regenerated_before_returning(run_db, sign_in):
+    async def body():
+        await _seed_products()
+        user_id, _ = await sign_in()
+        store, generate = CountingStore(ttl_seconds=60, max_stale_seconds=120), Generator()
+        async with async_session() as db:
+            await store.get(db, user_id, generate)
+        await _age_generations(user_id, timedelta(minutes=5))
+        async with async_session() as db:
+            rows = await store.get(db, user_id, generate)
+        assert {row.reason for row in rows} == {"call 2"}
+        assert store._refreshing == {}
+    run_db(body)
+
+def test_save_keeps_only_the_newest_generations(run_db, sign_in):
+    async def body():
+        await _seed_products()
+        user_id, _ = await sign_in()
+        other_id, _ = await sign_in("other@example.com")
+        store, generate = CountingStore(generations_kept=2), Generator()
+        await store.save(other_id, await generate(None, None))
+        for _ in range(3):
+            await store.save(user_id, await generate(None, None))
+            await _age_generations(user_id, timedelta(seconds=1))
+        assert await _generations(user_id) == 2
+        assert await _generations(other_id) == 1
+        await store.save(user_id, [])
+        assert await _generations(user_id) == 2
+    run_db(body)
@@ -0,0 +1,114 @@
+from datetime import datetime
+
+from sqlalchemy import select
+
+from backend.app.models.models import (
+    Behavior, MoodState, Product, ShoppingList, ShoppingListItem,
+    UserDailyActivity, UserCategoryQuantity, UserDailyMood
+)
+from backend.app.services import rollups
+from backend.app.services.analytics import analytics_service
+from backend.database.database import async_session, async_write_session
+
+MONDAY = datetime(2024, 3, 4, 9, 30)
+TUESDAY = datetime(2024, 3, 5, 18, 0)
+
+async def _snapshot():
+    async with async_session() as db:
+        activity = (await db.execute(select(
+            UserDailyActivity.user_id, UserDailyActivity.day, UserDailyActivity.behavior_count
+        ))).all()
+        categories = (await db.execute(select(
+            UserCategoryQuantity.user_id, UserCategoryQuantity.category, UserCategoryQuantity.quantity
+        ))).all()
+        moods = (await db.execute(select(
+            UserDailyMood.user_id, UserDailyMood.day, UserDailyMood.intensity_sum, UserDailyMood.mood_count
+        ))).all()
+    return sorted(activity), sorted(categories), sorted(moods)
+
+def test_behaviors_are_counted_per_user_and_day(run_db):
+    async def body():
+        async with async_write_session() as db:
+            await rollups.record_behaviors(db, [
+                {"user_id": 1, "created_at": MONDAY},
+                {"user_id": 1, "created_at": MONDAY},
+                {"user_id": 2, "created_at": MONDAY},
+            ])
+            await rollups.record_behaviors(db, [
+                {"user_id": 1, "created_at": MONDAY},
+                {"user_id": 1, "created_at": TUESDAY},
+            ])
+            await rollups.record_behaviors(db, [])
+            await db.commit()
+        async with async_session() as db:
+            patterns = await analytics_service.shopping_patterns(db, 1, datetime(2024, 3, 1))
+            later = await analytics_service.shopping_patterns(db, 1, datetime(2024, 3, 5))
+        assert patterns == {"dates": ["2024-03-04", "2024-03-05"], "frequencies": [3, 1]}
+        assert later == {"dates": ["2024-03-05"], "frequencies": [1]}
+    run_db(body)
+
+def test_mood_readings_are_averaged_per_day(run_db):
+    async def body():
+        async with async_write_session() as db:
+            await rollups.record_mood(db, 1, 0.2, MONDAY)
+            await rollups.record_mood(db, 1, 0.6, MONDAY)
+            await rollups.record_mood(db, 1, 0.9, TUESDAY)
+            await db.commit()
+        async with async_session() as db:
+            trends = await analytics_service.mood_trends(db, 1, datetime(2024, 3, 1))
+        assert trends["dates"] == ["2024-03-04", "2024-03-05"]
+        assert trends["intensities"] == [0.4, 0.9]
+    run_db(body)
+
+def test_list_items_add_up_per_category(run_db):
+    async def body():
+        async with async_write_session() as db:
+            await rollups.record_list_item(db, 1, "Dairy", 2)
+            await rollups.record_list_item(db, 1, "Dairy", None)
+            await rollups.record_list_item(db, 1, "Bakery", 1)
+            await rollups.record_list_item(db, 1, None, 5)
+            await db.commit()
+        async with async_session() as db:
+            distribution = await analytics_service.categories_distribution(db, 1)
+        assert distribution == {
+            "total_items": 4,
+            "distribution": {
+                "Dairy": {"count": 3, "percentage": 75.0},
+                "Bakery": {"count": 1, "percentage": 25.0},
+            }
+        }
+    run_db(body)
+
+def test_backfill_matches_the_incremental_rollups(run_db):
+    async def body():
+        async with async_write_session() as db:
+            db.add_all([
+                Product(id=1, name="Milk", price=1.0, category="Dairy"),
+                Product(id=2, name="Bread", price=2.0, category="Bakery"),
+                ShoppingList(id=1, user_id=1, name="Weekly"),
+            ])
+            await db.flush()
+            db.add_all([
+                Behavior(user_id=1, product_id=1, action_type="view", created_at=MONDAY),
+                Behavior(user_id=1, product_id=2, action_type="view", created_at=MONDAY),
+                Behavior(user_id=1, product_id=2, action_type="view", created_at=TUESDAY),
+                MoodState(user_id=1, mood="happy", intensity=0.5, created_at=MONDAY),
+                MoodState(user_id=1, mood="tired", intensity=0.3, created_at=MONDAY),
+                ShoppingListItem(shopping_list_id=1, product_id=1, quantity=2),
+                ShoppingListItem(shopping_list_id=1, product_id=2, quantity=None),
+            ])
+            await rollups.record_behaviors(db, [
+                {"user_id": 1, "created_at": MONDAY},
+                {"user_id": 1, "created_at": MONDAY},
+                {"user_id": 1, "created_at": TUESDAY},
+            ])
+            await rollups.record_mood(db, 1, 0.5, MONDAY)
+            await rollups.record_mood(db, 1, 0.3, MONDAY)
+            await rollups.record_list_item(db, 1, "Dairy", 2)
+            await rollups.record_list_item(db, 1, "Bakery", None)
+            await db.commit()
+
+        incremental = await _snapshot()
+        await rollups.backfill()
+        assert await _snapshot() == incremental
+    run_db(body)
@@ -0,0 +1,55 @@
+from backend.app.core import security
+from backend.app.models.models import User
+from backend.database.database import async_session, async_write_session
+
+def _token(email):
+    return security.create_access_token({"sub": email})
+
+async def _add_user(email, is_active=True):
+    async with async_write_session() as db:
+        user = User(email=email, hashed_password="x", is_active=is_active)
+        db.add(user)
+        await db.commit()
+        return user
+
+def test_resolve_principal_reads_identity_columns_and_caches(run_db):
+    async def body():
+        security._principal_cache.clear()
+        user = await _add_user("a@example.com")
+        async with async_session() as db:
+            principal = await security.resolve_principal(_token(user.email), db)
+        assert (principal.id, principal.email, principal.is_active) == (user.id, "a@example.com", True)
+
+        # Served from the cache without touching the database
+        async with async_session() as db:
+            async def fail(*args, **kwargs):
+                raise AssertionError("database queried")
+            db.execute = fail
+            assert await security.resolve_principal(_token(user.email), db) == principal
+    run_db(body)
+
+def test_resolve_principal_rejects_bad_tokens(run_db):
+    async def body():
+        security._principal_cache.clear()
+        async with async_session() as db:
+            assert await security.resolve_principal("not-a-token", db) is None
+            assert await security.resolve_principal(_token("nobody@example.com"), db) is None
+    run_db(body)
+
+def test_deactivating_a_user_evicts_the_cached_principal(run_db):
+    async def body():
+        security._principal_cache.clear()
+        user = await _add_user("b@example.com")
+        async with async_session() as db:
+            await security.resolve_principal(_token(user.email), db)
+        assert "b@example.com" in security._principal_cache
+
+        async with async_write_session() as db:
+            stored = await db.get(User, user.id)
+            stored.is_active = False
+            await db.commit()
+        assert "b@example.com" not in security._principal_cache
+        async with async_session() as db:
+            principal = await security.resolve_principal(_token(user.email), db)
+        assert principal.is_active is False
+    run_db(body)
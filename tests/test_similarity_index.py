@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+from backend.app.core.config import settings
+from backend.app.models.models import Behavior, Product, ShoppingList, ShoppingListItem
+from backend.app.services import similarity_index
+from backend.app.services.similarity_index import SimilarityIndex, build_index, get_similarity_index
+from backend.database.database import async_write_session
+
+@pytest.fixture
+def index_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "SIMILARITY_INDEX_DIR", str(tmp_path))
+    similarity_index.reset_similarity_indexes()
+    yield tmp_path
+    similarity_index.reset_similarity_indexes()
+
+def _index(ids, k=2):
+    return SimilarityIndex(
+        np.asarray(ids, dtype=str),
+        np.full((len(ids), k), -1, dtype=np.int32),
+        np.zeros((len(ids), k), dtype=np.float32),
+    )
+
+def test_build_index_blends_content_and_cooccurrence():
+    index = build_index(
+        ids=["a", "b", "c", "d"],
+        quality=[0.1, 0.9, 0.5, float("nan")],
+        group_of=["x", "x", "y", None],
+        similar_groups=[["x"], ["x"], ["x"], ["x"]],
+        baskets=[[0, 2], [2, 0, 2]],
+        k=2,
+    )
+    # Same listed group scores 0.5; two shared baskets add 0.5 * 2 / (2 + 5)
+    assert index.similar("a") == [("b", 0.5), ("c", pytest.approx(0.5 * 2 / 7))]
+    assert index.similar("c") == [("a", pytest.approx(0.5 + 0.5 * 2 / 7)), ("b", 0.5)]
+    # Equal similarity goes to the higher-quality product; short rows are padded
+    assert index.similar("d") == [("b", 0.5), ("a", 0.5)]
+    assert index.similar("b", limit=5) == [("a", 0.5)]
+    assert index.similar("missing") == []
+
+def test_save_switches_current_and_keeps_the_previous_build(index_dir):
+    directory = index_dir / "products"
+    for ids in (["1"], ["1", "2"], ["1", "2", "3"]):
+        _index(ids).save(directory)
+    builds = sorted(directory.glob("build-*"))
+    assert len(builds) == 2
+    assert (directory / "CURRENT").read_text() == builds[-1].name
+    loaded = SimilarityIndex.load(builds[-1])
+    assert list(loaded.ids) == ["1", "2", "3"] and loaded.k == 2
+
+def test_lookup_is_none_until_built_and_reloads_after_a_rebuild(index_dir):
+    assert get_similarity_index("products") is None
+
+    _index(["1"]).save(index_dir / "products")
+    first = get_similarity_index("products")
+    assert len(first) == 1
+    assert get_similarity_index("products") is first
+
+    # Another process rebuilds; no reset needed to see it
+    _index(["1", "2"]).save(index_dir / "products")
+    second = get_similarity_index("products")
+    assert second is not first and "2" in second
+
+    (index_dir / "products" / "CURRENT").unlink()
+    assert get_similarity_index("products") is None
+
+def test_build_all_indexes_app_products_from_lists_and_behavior(run_db, index_dir):
+    async def body():
+        async with async_write_session() as db:
+            db.add_all([
+                Product(id=1, name="Milk", price=1.0, category="Dairy", average_rating=4.0),
+                Product(id=2, name="Cheese", price=5.0, category="Dairy", average_rating=2.0),
+                Product(id=3, name="Bread", price=2.0, category="Bakery"),
+                ShoppingList(id=1, user_id=1, name="Weekly"),
+            ])
+            await db.flush()
+            db.add_all([
+                ShoppingListItem(shopping_list_id=1, product_id=1),
+                ShoppingListItem(shopping_list_id=1, product_id=3),
+                Behavior(user_id=1, product_id=3, action_type="view"),
+                Behavior(user_id=1, product_id=1, action_type="view"),
+            ])
+            await db.commit()
+        await similarity_index.build_all(k=2)
+        index = get_similarity_index(similarity_index.PRODUCTS_INDEX)
+        # Same category outweighs two shared baskets; Bread is a neighbor only through them
+        assert [product_id for product_id, _ in index.similar("1")] == ["2", "3"]
+        assert [product_id for product_id, _ in index.similar("3")] == ["1"]
+        assert [product_id for product_id, _ in index.similar("2")] == ["1"]
+        assert len(get_similarity_index(similarity_index.CATALOG_INDEX)) == 0
+    run_db(body)
@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+
+from backend.app.services.single_flight import SingleFlight, request_key
+
+def test_request_key_hashes_inputs_independent_of_order():
+    assert request_key("story", 7, {"a": 1, "b": 2}) == request_key("story", 7, {"b": 2, "a": 1})
+    assert request_key("story", 7, {"a": 1}) != request_key("story", 7, {"a": 2})
+    assert request_key("story", 7).startswith("story:7:")
+
+def test_concurrent_calls_share_one_execution():
+    async def main():
+        flight, calls, release = SingleFlight(), [], asyncio.Event()
+
+        async def work():
+            calls.append(1)
+            await release.wait()
+            return ["result"]
+
+        waiters = [asyncio.ensure_future(flight.do("story:1:x", work)) for _ in range(5)]
+        other = asyncio.ensure_future(flight.do("story:2:x", work))
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*waiters, other)
+        assert len(calls) == 2
+        assert all(result is results[0] for result in results[:5])
+        assert flight._calls == {}
+
+        # The key is released once the work finishes, so a later call runs again
+        await flight.do("story:1:x", work)
+        assert len(calls) == 3
+    asyncio.run(main())
+
+def test_exceptions_reach_every_waiter():
+    async def main():
+        flight, release = SingleFlight(), asyncio.Event()
+
+        async def work():
+            await release.wait()
+            raise ValueError("model unavailable")
+
+        waiters = [asyncio.ensure_future(flight.do("chat:1:x", work)) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+        assert all(isinstance(result, ValueError) for result in results)
+        assert flight._calls == {}
+    asyncio.run(main())
+
+def test_a_cancelled_caller_does_not_cancel_the_others():
+    async def main():
+        flight, release = SingleFlight(), asyncio.Event()
+
+        async def work():
+            await release.wait()
+            return "done"
+
+        leaving = asyncio.ensure_future(flight.do("story:1:x", work))
+        staying = asyncio.ensure_future(flight.do("story:1:x", work))
+        await asyncio.sleep(0)
+        leaving.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leaving
+        release.set()
+        assert await staying == "done"
+    asyncio.run(main())
@@ -0,0 +1,66 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from backend.app.models.models import Behavior
+from backend.app.services.trending import TrendingService
+from backend.database.database import async_write_session
+
+async def _seed(events):
+    now = datetime.utcnow()
+    async with async_write_session() as db:
+        db.add_all([
+            Behavior(user_id=1, product_id=product_id, action_type="view", created_at=now - age)
+            for product_id, age in events
+        ])
+        await db.commit()
+
+def test_scores_decay_with_age_and_skip_old_events(run_db):
+    async def body():
+        await _seed([
+            (1, timedelta(minutes=30)),           # 4 + 2 + 1
+            (2, timedelta(hours=3)),              # 3 x (2 + 1)
+            (2, timedelta(hours=3)),
+            (2, timedelta(hours=3)),
+            (3, timedelta(days=3)),               # 2 x 1
+            (3, timedelta(days=3)),
+            (4, timedelta(days=10)),              # outside every window
+        ])
+        service = TrendingService(size=10)
+        assert await service.top(10) == [(2, 9.0), (1, 7.0), (3, 2.0)]
+        assert await service.top(1) == [(2, 9.0)]
+    run_db(body)
+
+def test_leaderboard_keeps_only_the_configured_size(run_db):
+    async def body():
+        await _seed([(product_id, timedelta(minutes=product_id)) for product_id in range(1, 6)])
+        service = TrendingService(size=2)
+        assert [product_id for product_id, _ in await service.top(5)] == [1, 2]
+    run_db(body)
+
+def test_reads_are_served_from_the_cached_ranking(run_db):
+    async def body():
+        await _seed([(1, timedelta(minutes=5))])
+        service = TrendingService(size=10)
+        assert service.age() == -1.0
+        assert await service.top() == [(1, 7.0)]
+        assert service.age() >= 0.0
+
+        await _seed([(2, timedelta(minutes=5)), (2, timedelta(minutes=5))])
+        assert await service.top() == [(1, 7.0)]
+        await service.refresh()
+        assert await service.top() == [(2, 14.0), (1, 7.0)]
+    run_db(body)
+
+def test_background_task_refreshes_until_stopped(run_db):
+    async def body():
+        await _seed([(1, timedelta(minutes=5))])
+        service = TrendingService(refresh_interval=0.01, size=10)
+        await service.start()
+        try:
+            while service.age() < 0:
+                await asyncio.sleep(0.01)
+        finally:
+            await service.stop()
+        assert service._task is None
+        assert await service.top() == [(1, 7.0)]
+    run_db(body)
@@ -0,0 +1,40 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from backend.app.models.models import Behavior, MoodState, Persona, Product, ShoppingList, ShoppingListItem
+from backend.app.services.user_context import (
+    load_latest_mood, load_persona, load_recent_behaviors, load_shopping_list
+)
+from backend.database.database import async_write_session
+
+def test_lookups_run_concurrently_on_their_own_sessions(run_db):
+    async def body():
+        now = datetime.utcnow()
+        async with async_write_session() as db:
+            db.add_all([
+                Product(id=1, name="Milk", price=1.0),
+                Persona(user_id=1, name="Planner"),
+                MoodState(user_id=1, mood="tired", intensity=0.3, created_at=now - timedelta(hours=1)),
+                MoodState(user_id=1, mood="happy", intensity=0.8, created_at=now),
+                MoodState(user_id=2, mood="angry", intensity=0.9, created_at=now + timedelta(hours=1)),
+                ShoppingList(id=1, user_id=1, name="Weekly"),
+            ] + [
+                Behavior(user_id=1, product_id=1, action_type=f"view-{i}", created_at=now - timedelta(minutes=i))
+                for i in range(7)
+            ])
+            await db.flush()
+            db.add(ShoppingListItem(shopping_list_id=1, product_id=1, quantity=2))
+            await db.commit()
+
+        persona, mood, behaviors, shopping_list, others_list = await asyncio.gather(
+            load_persona(1), load_latest_mood(1), load_recent_behaviors(1, limit=3),
+            load_shopping_list(1, 1), load_shopping_list(1, 2)
+        )
+        assert persona.name == "Planner"
+        assert mood.mood == "happy"
+        assert [behavior.action_type for behavior in behaviors] == ["view-0", "view-1", "view-2"]
+        # Items and products come loaded, so they are usable after the session closes
+        assert [(item.quantity, item.product.name) for item in shopping_list.items] == [(2, "Milk")]
+        assert others_list is None
+        assert await load_persona(2) is None
+    run_db(body)